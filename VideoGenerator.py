@@ -1,76 +1,52 @@
-import requests
-import time
+import os
+import sys
+import asyncio
 import webbrowser
 
-# === Configuration ===
-API_TOKEN = "MSi9Hu12HZcPVaH2sR6RHTHWEbD4e1Yp"
-TEMPLATE_ID = "default"  # You can change this if you have a specific template
-WEBHOOK_URL = "https://webhook.site/be52380a-4a44-4364-bad1-c06cdc2c5790" 
+from database.video_jobs import READY
+from services.video_renderer import VIDEO_WEBHOOK_PORT, VideoRenderService
 
-GENERATE_VIDEO_URL = "https://api.elai.io/api/video/render" 
-GET_VIDEO_URL = "https://api.elai.io/api/video/" 
+# === Configuration ===
+API_TOKEN = os.getenv("ELAI_API_TOKEN")  # Elai.io API key; required
+TEMPLATE_ID = os.getenv("VIDEO_TEMPLATE_ID", "default")  # You can change this if you have a specific template
+# Public URL forwarding to the local webhook receiver; without it, renders are polled
+WEBHOOK_URL = os.getenv("VIDEO_WEBHOOK_URL", "")
 
-HEADERS = {
-    "Authorization": f"Bearer {API_TOKEN}"
-}
+API_URL = os.getenv("ELAI_API_URL", "https://api.elai.io/api/video/")
 
-def generate_video_from_text(prompt):
-    payload = {
-        "template_id": TEMPLATE_ID,
-        "presentation_data": {
-            "slides": [
-                {
-                    "text": prompt
-                }
-            ]
-        },
-        "webhook": WEBHOOK_URL  # Optional, but good for production
-    }
 
-    print("📨 Sending request to Elai.io...")
-    response = requests.post(GENERATE_VIDEO_URL, headers=HEADERS, json=payload)
+def create_video_service() -> VideoRenderService:
+    service = VideoRenderService(api_url=API_URL, token=API_TOKEN, template_id=TEMPLATE_ID, webhook_url=WEBHOOK_URL)
+    if WEBHOOK_URL:
+        service.start_webhook_receiver(VIDEO_WEBHOOK_PORT)
+    return service
 
-    if response.status_code != 200:
-        raise Exception(f"❌ Failed to start video generation. Status code: {response.status_code}, Response: {response.text}")
 
-    video_id = response.json().get("videoId")
-    print(f"🎥 Video ID received: {video_id}")
-    return video_id
+async def generate_videos(prompts):
+    """Render every prompt concurrently and return the finished jobs in order."""
+    service = create_video_service()
+    print(f"📨 Sending {len(prompts)} request(s) to Elai.io...")
+    print("🔄 Waiting for videos to be generated (this may take 1-3 minutes)...")
+    try:
+        return await service.render_many(prompts)
+    finally:
+        await service.close()
 
 
-def wait_for_video_to_be_ready(video_id):
-    print("🔄 Waiting for video to be generated (this may take 1-3 minutes)...")
-    video_url = None
+if __name__ == "__main__":
+    if not API_TOKEN:
+        sys.exit("❌ ELAI_API_TOKEN is not set. Export your Elai.io API key to generate videos.")
 
-    for _ in range(60):  # Try up to 60 times with 5 sec delay = 5 min max
-        response = requests.get(f"{GET_VIDEO_URL}{video_id}", headers=HEADERS)
-        data = response.json()
+    # One video per argument, or a single description typed in
+    prompts = sys.argv[1:] or [input("📝 Enter your video description: ")]
 
-        status = data.get("status")
-        if status == "ready":
-            video_url = data.get("videoUrl")
-            break
-        elif status == "error":
-            raise Exception("❌ Error generating video: Video generation failed on server.")
+    jobs = asyncio.run(generate_videos(prompts))
+    for job in jobs:
+        if job.status == READY:
+            print(f"🎥 Final video URL: {job.video_url}")
         else:
-            print("⏳ Still processing...")
-
-        time.sleep(5)
-
-    if not video_url:
-        raise Exception("⏰ Timeout: Video was not generated within the expected time.")
-
-    return video_url
-
-
-if __name__ == "__main__":
-    user_prompt = input("📝 Enter your video description: ")
-
-    try:
-        video_id = generate_video_from_text(user_prompt)
-        video_url = wait_for_video_to_be_ready(video_id)
-        print(f"🎥 Final video URL: {video_url}")
+            print(f"💥 An error occurred for '{job.prompt[:40]}': {job.error}")
+    ready = [job for job in jobs if job.status == READY]
+    if len(ready) == 1:
         print("🌐 Opening video in your default browser...")
-        webbrowser.open(video_url)
-    except Exception as e:
-        print(f"💥 An error occurred: {e}")
\ No newline at end of file
+        webbrowser.open(ready[0].video_url)
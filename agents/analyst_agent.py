@@ -1,18 +1,16 @@
 # agents/analyst_agent.py
-from typing import Dict, List
+import asyncio
+from typing import Dict, List, Optional
 from pydantic_ai import Agent
 # import json
 
 from database.db_manager import DatabaseManager
 from models.response_models import AnalysisOutput
+from services.agent_runner import PartialCallback, run_agent
+from core.prompt_builder import PromptBuilder, render_details
+from services.telemetry import span
 
-class AnalystAgent:
-    def __init__(self, model, db_manager: DatabaseManager):
-        self.db_manager = db_manager
-        self.agent = Agent(
-            model=model,
-            output_type=AnalysisOutput,
-            system_prompt="""You are a Senior Marketing Data Analyst with expertise in campaign performance analysis,
+ANALYST_SYSTEM_PROMPT = """You are a Senior Marketing Data Analyst with expertise in campaign performance analysis,
              pattern recognition, and data-driven marketing insights. You excel at identifying success patterns from
              historical campaign data and translating them into actionable recommendations.
 
@@ -28,55 +26,72 @@ class AnalystAgent:
             - ROI and conversion optimization
 
             Provide data-driven, actionable insights that can directly improve campaign performance."""
+
+class AnalystAgent:
+    def __init__(self, model, db_manager: DatabaseManager, cache_ttl: float = None):
+        self.db_manager = db_manager
+        self.cache_ttl = cache_ttl
+        self.agent = Agent(
+            model=model,
+            output_type=AnalysisOutput,
+            system_prompt=ANALYST_SYSTEM_PROMPT
         )
 
-    async def analyze_campaign_patterns(self, campaign_objective: str, target_industry: str = None) -> AnalysisOutput:
+    async def load_campaign_data(self, target_industry: str = None) -> Dict:
+        """Gather historical campaign data; the three queries run concurrently off the event loop"""
+        with span("db.load_campaign_data", industry=target_industry):
+            successful_campaigns, channel_performance, industry_insights = await asyncio.gather(
+                self.db_manager.get_successful_campaigns(20),
+                self.db_manager.get_channel_performance(),
+                self.db_manager.get_industry_insights(target_industry),
+            )
+        return {
+            "successful_campaigns": successful_campaigns,
+            "channel_performance": channel_performance,
+            "industry_insights": industry_insights,
+        }
+
+    async def analyze_campaign_patterns(
+        self, campaign_objective: str, target_industry: str = None, campaign_data: Dict = None,
+        on_partial: Optional[PartialCallback] = None, revision_feedback: str = None
+    ) -> AnalysisOutput:
         """Analyze historical campaign data to identify success patterns"""
 
-        # Gather data from database
-        print("DEBUG: Loading successful campaigns...")
-        successful_campaigns = await self.db_manager.get_successful_campaigns(20)
-        print("DEBUG: Loaded successful campaigns.")
-        channel_performance = await self.db_manager.get_channel_performance()
-        print("DEBUG: Loaded channel performance.")
-        industry_insights = await self.db_manager.get_industry_insights(target_industry)
-        print("DEBUG: Loaded industry insights.")
+        # Gather data from database unless the caller already loaded it
+        if campaign_data is None:
+            campaign_data = await self.load_campaign_data(target_industry)
+        successful_campaigns = campaign_data["successful_campaigns"]
+        channel_performance = campaign_data["channel_performance"]
+        industry_insights = campaign_data["industry_insights"]
 
         # Prepare analysis prompt
-        analysis_prompt = f"""
-        Develop a comprehensive marketing strategy using historical performance insights:
-
-        CAMPAIGN OBJECTIVE: {campaign_objective}
-        TARGET INDUSTRY: {target_industry or "General"}
-
-        HISTORICAL SUCCESS DATA:
-
-        TOP PERFORMING CAMPAIGNS:
-        {self._format_campaign_data(successful_campaigns)}
-
-        CHANNEL PERFORMANCE ANALYSIS:
-        {self._format_channel_data(channel_performance)}
-
-        INDUSTRY INSIGHTS:
-        {self._format_industry_data(industry_insights)}
-
-        Based on this data, provide insights adhering strictly to the AnalysisOutput schema:
+        builder = PromptBuilder("analyst")
+        builder.add("Analyze historical campaign data to identify success patterns.")
+        builder.add(
+            render_details(campaign_objective=campaign_objective, target_industry=target_industry or "General"),
+            "CAMPAIGN"
+        )
+        builder.add(self._format_channel_data(channel_performance), "CHANNEL PERFORMANCE ANALYSIS", priority=60)
+        builder.add(self._format_campaign_data(successful_campaigns), "TOP PERFORMING CAMPAIGNS", priority=50)
+        builder.add(self._format_industry_data(industry_insights), "INDUSTRY INSIGHTS", priority=40)
+        builder.add("""Based on this data, provide insights adhering strictly to the AnalysisOutput schema:
         1.  `successful_patterns`: List of key success patterns.
-        2.  `channel_performance`: A JSON object (dictionary) where keys are channel names (e.g., "Social Media") and values are their average performance metrics (e.g., {{"avg_success_score": 8.5, "avg_roas": 7.2}}). Do NOT provide a list of descriptive strings.
+        2.  `channel_performance`: Average performance metrics per channel name, taken from the data above.
         3.  `audience_insights`: List of audience-related insights.
-        4.  `budget_recommendations`: A JSON object (dictionary) where keys are budget categories (e.g., "Low Budget", "High Budget") or specific channel names, and values are budget recommendations for them (e.g., {{"Social Media": "Invest more in video ads", "Content Marketing": "Allocate 20% of budget"}}). Do NOT provide a list of descriptive strings.
+        4.  `budget_recommendations`: Budget recommendation per budget category or channel name.
         5.  `creative_trends`: List of effective creative trends.
         6.  `key_success_factors`: List of critical factors.
         7.  `recommendations`: List of actionable recommendations.
 
-        Focus on actionable insights that can be directly applied to strategy and creative development.
-        """
+        Focus on actionable insights that can be directly applied to strategy and creative development.""")
+        if revision_feedback:
+            builder.add(f"REVISION REQUEST: {revision_feedback}\nRevise your output to address this feedback.")
+        analysis_prompt = builder.build()
 
-        print("DEBUG: Sending prompt to Azure OpenAI...")
-        result = await self.agent.run(analysis_prompt)
-
-        print("DEBUG: Received response from Azure OpenAI.")
-        return result.output
+        return await run_agent(
+            self.agent, analysis_prompt, name="analyst", system_prompt=ANALYST_SYSTEM_PROMPT, ttl=self.cache_ttl,
+            on_partial=on_partial
+        )
 
     def _format_campaign_data(self, campaigns: List[Dict]) -> str:
         """Format campaign data for analysis"""
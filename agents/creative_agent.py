@@ -1,13 +1,11 @@
 # agents/creative_agent.py
+from typing import Optional
 from pydantic_ai import Agent
 from models.response_models import AnalysisOutput, StrategyOutput, CreativeOutput
+from services.agent_runner import PartialCallback, run_agent
+from core.prompt_builder import PromptBuilder, render_details
 
-class CreativeAgent:
-    def __init__(self, model):
-        self.agent = Agent(
-            model=model,
-            output_type=CreativeOutput,
-            system_prompt="""You are a Creative Director known for breakthrough creative campaigns
+CREATIVE_SYSTEM_PROMPT = """You are a Creative Director known for breakthrough creative campaigns
              that emotionally connect with audiences. You specialize in developing memorable taglines,
              compelling ad copy, and cohesive visual directions that drive engagement.
 
@@ -16,6 +14,13 @@ class CreativeAgent:
 
                         Focus on creativity that converts, resonates with the target market, and follows successful patterns."""
 
+class CreativeAgent:
+    def __init__(self, model, cache_ttl: float = None):
+        self.cache_ttl = cache_ttl
+        self.agent = Agent(
+            model=model,
+            output_type=CreativeOutput,
+            system_prompt=CREATIVE_SYSTEM_PROMPT
         )
 
     async def develop_creative(
@@ -28,67 +33,47 @@ class CreativeAgent:
         campaign_timing: str = None,
         campaign_destination_url: str = None,
         media_objective: str = None,
-        media_target: str = None
+        media_target: str = None,
+        on_partial: Optional[PartialCallback] = None,
+        revision_feedback: str = None
     ) -> CreativeOutput:
         """Create compelling creative concepts using performance data and successful creative trends."""
-        prompt = f"""Create compelling creative concepts using performance data and successful creative trends:
-
-        CAMPAIGN OBJECTIVE: {campaign_objective}
-        TARGET INDUSTRY: {target_industry or "General"}
-        CAMPAIGN BUDGET: {campaign_budget or "Not specified"}
-        CAMPAIGN TIMING: {campaign_timing or "Not specified"}
-        CAMPAIGN DESTINATION URL: {campaign_destination_url or "Not specified"}
-        MEDIA OBJECTIVE: {media_objective or "Not specified"}
-        MEDIA (AUDIENCE) TARGET: {media_target or "Not specified"}
-
-        STRATEGY CONTEXT:
-        - Overall Strategy: {strategy_result.overall_strategy}
-        -Target Audience Deepdive: {strategy_result.target_audience_deep_dive}
-        - Key Messaging Pillars: {', '.join(strategy_result.key_messaging_pillars)}
-        - Recommended Channel & Tactics: {', '.join(strategy_result.recommended_channels_and_tactics)}
-        - Budget Allocation & Guidance: {', '.join(strategy_result.budget_allocation_guidance)}
-        - Measurement KPIs: {', '.join(strategy_result.measurement_kpis)}
-
-        
-        CREATIVE PERFORMANCE INSIGHTS:
-        CREATIVE TRENDS: {', '.join(analysis_result.creative_trends)}
-        SUCCESS PATTERNS: {', '.join(analysis_result.successful_patterns)}
-        CHANNEL PERFORMANCE: Focus on top-performing channels like {', '.join(list(analysis_result.channel_performance.keys())[:3]) if analysis_result.channel_performance else "various channels"}
-
-        Develop creative concepts that incorporate:
+        builder = PromptBuilder("creative")
+        builder.add("Create compelling creative concepts using performance data and successful creative trends.")
+        builder.add(
+            render_details(
+                campaign_objective=campaign_objective,
+                target_industry=target_industry or "General",
+                campaign_budget=campaign_budget,
+                campaign_timing=campaign_timing,
+                campaign_destination_url=campaign_destination_url,
+                media_objective=media_objective,
+                media_audience_target=media_target
+            ),
+            "CAMPAIGN"
+        )
+        builder.add_model("STRATEGY CONTEXT", strategy_result, priority=70, fields=(
+            "overall_strategy", "target_audience_deep_dive", "key_messaging_pillars",
+            "recommended_channels_and_tactics"
+        ))
+        builder.add_model("CREATIVE PERFORMANCE INSIGHTS", analysis_result, priority=50, fields=(
+            "creative_trends", "successful_patterns"
+        ))
+        if analysis_result.channel_performance:
+            builder.add(", ".join(list(analysis_result.channel_performance)[:3]), "TOP-PERFORMING CHANNELS", priority=50)
+        builder.add_model("MEASUREMENT", strategy_result, priority=20, fields=("measurement_kpis",))
+        builder.add("""Develop creative concepts that incorporate:
         - Campaign tagline inspired by successful patterns
         - Ad copy samples optimized for top-performing channels
         - Visual direction based on proven creative trends
         - Content themes aligned with successful campaigns
         - Brand voice and tone informed by performance data
-        - Creative insights explaining why these approaches work
-
-        """
-
-        prompt += """ 
-        Please return your response strictly in the following JSON format:
-            {
-            "creative_concept": "A campaign centered around empowering users through simplicity and clarity.",
-            "visual_direction": "Minimalist aesthetic with soft gradients, clean typography, and lifestyle imagery showing real people using the product effortlessly.",
-            "messaging_themes": [
-                "Empowerment through simplicity",
-                "Trusted solutions for everyday life",
-                "Designed with you in mind"
-            ],
-            "call_to_action_examples": [
-                "Start Your Free Trial Today",
-                "See How It Works",
-                "Join Thousands of Happy Users"
-            ],
-            "ad_format_recommendations": {
-                "social_media": ["video", "carousel", "static_image"],
-                "email": ["banner", "animated_gif"],
-                "search": ["text_ad"]
-            },
-            "tone_of_voice": "Friendly, approachable, and confident"
-            }
-
-            """
+        - Creative insights explaining why these approaches work""")
+        if revision_feedback:
+            builder.add(f"REVISION REQUEST: {revision_feedback}\nRevise your output to address this feedback.")
+        prompt = builder.build()
 
-        result = await self.agent.run(prompt)
-        return result.output
\ No newline at end of file
+        return await run_agent(
+            self.agent, prompt, name="creative", system_prompt=CREATIVE_SYSTEM_PROMPT, ttl=self.cache_ttl,
+            on_partial=on_partial
+        )
\ No newline at end of file
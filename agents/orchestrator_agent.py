@@ -1,25 +1,52 @@
 # agents/orchestrator_agent.py
+from typing import Collection, Optional
 from pydantic_ai import Agent
 from models.response_models import AnalysisOutput, StrategyOutput, CreativeOutput, CampaignBrief
-import json
+from services.agent_runner import PartialCallback, run_agent
+from core.prompt_builder import REQUIRED, PromptBuilder, render_details
 # from copy import deepcopy
 from datetime import datetime
+from functools import lru_cache
+from pydantic import BaseModel, create_model
 
-class OrchestratorAgent:
-    def __init__(self, model):
-        self.agent = Agent(
-            model=model,
-            output_type=CampaignBrief,
-            system_prompt=
-
-            """You are a Marketing Campaign Orchestrator AI. Synthesize insights and handle revisions with:
+ORCHESTRATOR_SYSTEM_PROMPT = """You are a Marketing Campaign Orchestrator AI. Synthesize insights and handle revisions with:
             - Data-driven decision making
             - Cross-functional integration
             - Version control awareness
             - Contextual understanding of revision requests"""
 
+# Brief fields owned by each revisable section; the executive summary follows any change
+SECTION_FIELDS = {
+    "analyst": ("analyst_insights",),
+    "strategy": ("strategy_overview", "target_audience", "success_metrics"),
+    "creative": ("creative_direction",),
+    "campaign": ("campaign_objective", "implementation_plan", "next_steps"),
+    "summary": ("executive_summary",),
+}
+
+def revision_fields(sections_to_update: dict) -> list:
+    """Brief fields to regenerate for the flagged sections, in brief order."""
+    flagged = {field for section, fields in SECTION_FIELDS.items() if sections_to_update.get(section) for field in fields}
+    if flagged:
+        flagged.add("executive_summary")
+    return [name for name in CampaignBrief.model_fields if name in flagged]
+
+@lru_cache(maxsize=None)
+def revision_model(fields: tuple) -> type:
+    """A CampaignBrief subset holding only `fields`, used as the revision output schema."""
+    return create_model(
+        "CampaignBriefRevision",
+        __base__=BaseModel,
+        **{name: (CampaignBrief.model_fields[name].annotation, CampaignBrief.model_fields[name]) for name in fields}
+    )
 
-
+class OrchestratorAgent:
+    def __init__(self, model, cache_ttl: float = None):
+        self.cache_ttl = cache_ttl
+        self.agent = Agent(
+            model=model,
+            output_type=CampaignBrief,
+            system_prompt=ORCHESTRATOR_SYSTEM_PROMPT
         )
         self.revision_history = []
 
@@ -35,138 +62,117 @@ class OrchestratorAgent:
         campaign_timing: str = None,
         campaign_destination_url: str = None,
         media_objective: str = None,
-        media_target: str = None
+        media_target: str = None,
+        on_partial: Optional[PartialCallback] = None
     ) -> CampaignBrief:
         """Create a comprehensive, data-driven campaign brief integrating strategy, creative, and analyst insights."""
-        prompt = f"""Create a comprehensive, data-driven campaign brief integrating strategy, creative, and analyst insights:
-
-        CAMPAIGN OBJECTIVE: {campaign_objective}
-        TARGET INDUSTRY: {target_industry or "General"}
-        CAMPAIGN BUDGET: {campaign_budget or "Not specified"}
-        CAMPAIGN TIMING: {campaign_timing or "Not specified"}
-        CAMPAIGN DESTINATION URL: {campaign_destination_url or "Not specified"}
-        MEDIA OBJECTIVE: {media_objective or "Not specified"}
-        MEDIA (AUDIENCE) TARGET: {media_target or "Not specified"}
-
-        ANALYST INSIGHTS SUMMARY:
-        - Success Patterns: {', '.join(analysis_result.successful_patterns[:3])}
-        - Top Channels: {', '.join(list(analysis_result.channel_performance.keys())[:3]) if analysis_result.channel_performance else "N/A"}
-        - Key Recommendations: {', '.join(analysis_result.recommendations[:3])}
-
-        STRATEGY DETAILS:
-        - Overall Strategy: {strategy_result.overall_strategy}
-        -Target Audience Deepdive: {strategy_result.target_audience_deep_dive}
-        - Key Messaging Pillars: {', '.join(strategy_result.key_messaging_pillars)}
-        - Recommended Channel & Tactics: {', '.join(strategy_result.recommended_channels_and_tactics)}
-        - Budget Allocation & Guidance: {', '.join(strategy_result.budget_allocation_guidance)}
-        - Measurement KPIs: {', '.join(strategy_result.measurement_kpis)}
-
-        CREATIVE DETAILS:
-        - Creative Concept: {creative_result.creative_concept}
-        - Visual Direction: {creative_result.visual_direction}
-        - Messaging Themes: {creative_result.messaging_themes}
-        - Call to Action Examples: {creative_result.call_to_action_examples}
-        - Ad format Recommendations: {creative_result.ad_format_recommendations}
-        - Tone of Voice: {creative_result.tone_of_voice}
-
-        Synthesize everything into a polished, data-driven campaign brief with:
+        builder = PromptBuilder("orchestrator")
+        builder.add("Create a comprehensive, data-driven campaign brief integrating strategy, creative, and analyst insights.")
+        builder.add(
+            render_details(
+                campaign_objective=campaign_objective,
+                target_industry=target_industry or "General",
+                campaign_budget=campaign_budget,
+                campaign_timing=campaign_timing,
+                campaign_destination_url=campaign_destination_url,
+                media_objective=media_objective,
+                media_audience_target=media_target
+            ),
+            "CAMPAIGN"
+        )
+        builder.add_model("STRATEGY DETAILS", strategy_result, priority=80)
+        builder.add_model("CREATIVE DETAILS", creative_result, priority=70)
+        builder.add_model("ANALYST INSIGHTS SUMMARY", analysis_result, priority=50, max_items=3, fields=(
+            "successful_patterns", "recommendations"
+        ))
+        if analysis_result.channel_performance:
+            builder.add(", ".join(list(analysis_result.channel_performance)[:3]), "TOP CHANNELS", priority=50)
+        builder.add("""Synthesize everything into a polished, data-driven campaign brief with:
         - Executive summary highlighting data-driven approach
         - Implementation roadmap based on successful patterns
         - Clear next steps incorporating analyst recommendations
         - Analyst insights section explaining the data foundation
 
-        Ensure each field in the CampaignBrief is populated logically and comprehensively.
-        
-        """
-
-        prompt += """
-                {
-                "executive_summary": "This campaign aims to drive awareness and conversions for a new line of eco-friendly home products by leveraging data-driven creative strategies across high-performing digital channels.",
-                "campaign_objective": "Increase brand awareness and generate 10,000 new product trial sign-ups within 8 weeks.",
-                "target_audience": "Environmentally-conscious millennials and Gen Z adults aged 24–38, primarily urban dwellers with a household income of $50k–$90k. They value sustainability, wellness, and ethical consumerism.",
-                "strategy_overview": "The strategy combines audience segmentation, behavioral targeting, and creative personalization. It leverages top-performing platforms like Instagram Reels, TikTok, and YouTube Shorts, supported by retargeting via Google Display Network and email nurturing.",
-                "creative_direction": "A vibrant, nature-inspired visual aesthetic with warm earth tones and dynamic storytelling. Messaging is upbeat, empowering, and solution-focused, using humor and relatable situations to highlight everyday benefits of sustainable living.",
-                "implementation_plan": "Phase 1: Creative development & platform setup (Weeks 1–2)\nPhase 2: Launch of awareness phase with video-first content (Weeks 3–5)\nPhase 3: Retargeting + conversion push (Weeks 6–7)\nPhase 4: Optimization & performance analysis (Ongoing)",
-                "success_metrics": [
-                    {
-                    "name": "Brand Awareness",
-                    "goal": "Reach 2 million impressions",
-                    "measurement_method": "Social media analytics and display ad reporting",
-                    "expected_result": "5% increase in branded search volume"
-                    },
-                    {
-                    "name": "Engagement Rate",
-                    "goal": "3.5%",
-                    "measurement_method": "Click-through rate on social and display ads",
-                    "expected_result": "Above industry benchmark"
-                    },
-                    {
-                    "name": "Conversion Rate",
-                    "goal": "4%",
-                    "measurement_method": "Landing page form submissions",
-                    "expected_result": "At least 10,000 qualified leads"
-                    }
-                ],
-                "analyst_insights": "Previous campaigns showed that video content under 15 seconds performs best on TikTok and Instagram Reels. Audiences respond positively to UGC-style testimonials and behind-the-scenes clips showing product impact. Email nurture sequences with personalized subject lines increased CTR by 22% in past A/B tests.",
-                "next_steps": [
-                    "Finalize creative assets and begin pre-launch testing",
-                    "Set up tracking pixels and conversion events across all platforms",
-                    "Schedule influencer partnerships for week 3",
-                    "Begin building email segments for post-click nurture"
-                ]
-                }
+        Ensure each field in the CampaignBrief is populated logically and comprehensively.""")
+        prompt = builder.build()
 
-                """
-        result = await self.agent.run(prompt)
-        return result.output
+        return await run_agent(
+            self.agent, prompt, name="orchestrator", system_prompt=ORCHESTRATOR_SYSTEM_PROMPT, ttl=self.cache_ttl,
+            on_partial=on_partial
+        )
     
     async def handle_revision(
         self,
         current_brief: CampaignBrief,
         feedback: str,
-        sections_to_update: dict
+        sections_to_update: dict,
+        analysis_result: AnalysisOutput = None,
+        strategy_result: StrategyOutput = None,
+        creative_result: CreativeOutput = None,
+        regenerated: Collection[str] = ()
     ) -> CampaignBrief:
-        """Handle campaign revisions with version control and context awareness"""
-        revision_prompt = f"""**Campaign Revision Request**
-        
-        Current Campaign State:
-        {json.dumps(current_brief.dict(), indent=2)}
-
-        User Feedback: {feedback}
-        
-        Required Updates: {sections_to_update}
+        """Regenerate only the brief fields owned by the flagged sections; the rest are kept verbatim.
 
-        Revision Rules:
-        1. Maintain consistent brand voice and strategy
-        2. Preserve unchanged sections unless explicitly modified
-        3. Track changes in 'revision_history'
-        4. Validate against original business objectives
-
-        Generate updated campaign brief with these changes:
+        Upstream outputs passed in are given as context for the flagged sections.
+        Only the sections in `regenerated` (agents that were actually re-run) are
+        labelled as revised; the others are presented as current.
         """
+        fields = revision_fields(sections_to_update)
+        if not fields:
+            return current_brief
+
+        builder = PromptBuilder("revision")
+        builder.add("**Campaign Revision Request**")
+        builder.add(feedback, "User Feedback")
+        builder.add_model("Fields to revise (current values)", current_brief, priority=REQUIRED, fields=fields)
+        for section, title, output in (
+            ("analyst", "analysis", analysis_result),
+            ("strategy", "strategy", strategy_result),
+            ("creative", "creative", creative_result),
+        ):
+            if sections_to_update.get(section):
+                label = "Revised" if section in regenerated else "Current"
+                builder.add_model(f"{label} {title}", output, priority=60)
+        builder.add_model(
+            "Unchanged context", current_brief, priority=40,
+            fields=[name for name in ("campaign_objective", "target_audience") if name not in fields]
+        )
+        builder.add("""Revision Rules:
+        1. Maintain consistent brand voice and strategy
+        2. Rewrite only the listed fields, addressing the feedback
+        3. Keep the executive summary consistent with the revised fields
+        4. Validate against original business objectives""")
+        revision_prompt = builder.build()
+
+        revision_agent = Agent(
+            model=self.agent.model,
+            output_type=revision_model(tuple(fields)),
+            system_prompt=ORCHESTRATOR_SYSTEM_PROMPT
+        )
+        revised = await run_agent(
+            revision_agent, revision_prompt, name="revision", system_prompt=ORCHESTRATOR_SYSTEM_PROMPT,
+            ttl=self.cache_ttl
+        )
+        new_brief = current_brief.model_copy(update=revised.model_dump())
 
-        updated_brief = await self.agent.run(revision_prompt)
-        new_brief = updated_brief.output
-        
         # Track changes
         self._track_changes(current_brief, new_brief)
         return new_brief
 
     def _track_changes(self, old: CampaignBrief, new: CampaignBrief):
         changes = {}
-        for section in ['strategy', 'creative', 'analyst', 'campaign']:
-            old_dict = old.dict().get(section, {})
-            new_dict = new.dict().get(section, {})
+        old_dict, new_dict = old.model_dump(), new.model_dump()
+        for section, section_fields in SECTION_FIELDS.items():
             section_changes = {
-                field: {"old": old_dict.get(field), "new": new_dict.get(field)}
-                for field in new_dict
-                if old_dict.get(field) != new_dict.get(field)
+                field: {"old": old_dict[field], "new": new_dict[field]}
+                for field in section_fields
+                if old_dict[field] != new_dict[field]
             }
             if section_changes:
                 changes[section] = section_changes
-        
+
         if changes:
             self.revision_history.append({
                 "timestamp": datetime.now().isoformat(),
                 "changes": changes
-            })
\ No newline at end of file
+            })
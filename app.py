@@ -23,7 +23,10 @@ from core.pipeline import run_pipeline_from_ui
 from agents.orchestrator_agent import OrchestratorAgent
 from services.openai_config import create_azure_openai_model
 from core.pipeline import detect_sections_to_update
+from services.telemetry import start_telemetry
 
+# Serve /metrics and /traces (once per process; CAMPAIGN_METRICS_PORT=0 disables)
+start_telemetry()
 
 # Set page config
 st.set_page_config(layout="wide", page_title="CampAIgn Studio", page_icon="🚀")
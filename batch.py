@@ -0,0 +1,281 @@
+# batch.py
+"""Generate many campaign briefs from a JSONL or CSV file of campaign specs.
+
+    python batch.py specs.jsonl -o briefs.jsonl
+    python batch.py specs.csv -o briefs.jsonl --concurrency 4 --store
+
+Each spec is one row/object with `campaign_objective` (or `objective`) and any of
+`target_industry`/`industry`, `campaign_budget`/`budget`, `campaign_timing`/`timing`,
+`campaign_destination_url`/`url`, `media_objective`, `media_target` and an optional `id`.
+Every finished brief is appended to the output as one JSON line straight away, so an
+interrupted batch picks up where it stopped when re-run with the same output file.
+With --restart every spec is generated again and the old output is moved aside first.
+"""
+import os
+import sys
+import csv
+import json
+import time
+import random
+import asyncio
+import argparse
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+import httpx
+from dotenv import load_dotenv
+from openai import APIConnectionError
+
+project_root = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, project_root)
+load_dotenv()
+
+from core.pipeline import EnhancedMarketingCampaignPipeline
+from database.db_manager import DatabaseManager
+from database.result_store import input_hash, get_result_store
+from services.openai_config import create_azure_openai_model
+from services.rate_limiter import BATCH, request_priority
+from services.telemetry import start_telemetry
+
+# Briefs generated at once
+BATCH_CONCURRENCY = int(os.getenv("CAMPAIGN_BATCH_CONCURRENCY", "3"))
+# Attempts per brief when an API call failed after the client's own retries (see services/rate_limiter.py)
+BATCH_MAX_ATTEMPTS = int(os.getenv("CAMPAIGN_BATCH_MAX_ATTEMPTS", "2"))
+# First backoff delay in seconds; doubles per attempt, with jitter
+BATCH_BACKOFF = float(os.getenv("CAMPAIGN_BATCH_BACKOFF", "2.0"))
+BATCH_MAX_BACKOFF = float(os.getenv("CAMPAIGN_BATCH_MAX_BACKOFF", "60.0"))
+
+DETAIL_FIELDS = (
+    "campaign_objective", "target_industry", "campaign_budget", "campaign_timing",
+    "campaign_destination_url", "media_objective", "media_target",
+)
+FIELD_ALIASES = {
+    "objective": "campaign_objective",
+    "industry": "target_industry",
+    "budget": "campaign_budget",
+    "timing": "campaign_timing",
+    "url": "campaign_destination_url",
+    "destination_url": "campaign_destination_url",
+}
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+
+def normalize_spec(raw: Dict[str, Any], line: int) -> Dict[str, Any]:
+    """Campaign details in the pipeline's field names, plus a stable `id`."""
+    details = dict.fromkeys(DETAIL_FIELDS)
+    for key, value in raw.items():
+        if key is None:
+            continue
+        name = key.strip().lower().replace(" ", "_")
+        name = FIELD_ALIASES.get(name, name)
+        if name in details and value is not None and str(value).strip():
+            details[name] = str(value).strip()
+    if not details["campaign_objective"]:
+        raise ValueError(f"line {line}: campaign_objective is required")
+    spec_id = str(raw.get("id") or "").strip() or input_hash(details)[:12]
+    return {"id": spec_id, "campaign_details": details}
+
+
+def load_specs(path: str) -> List[Dict[str, Any]]:
+    """Specs from a .csv file (header row) or a JSON-lines file."""
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        if path.lower().endswith(".csv"):
+            rows = list(csv.DictReader(f))
+            first_line = 2
+        else:
+            rows = [json.loads(line) for line in f if line.strip()]
+            first_line = 1
+    specs = [normalize_spec(row, first_line + i) for i, row in enumerate(rows)]
+    seen = set()
+    for spec in specs:
+        if spec["id"] in seen:
+            raise ValueError(f"duplicate spec id {spec['id']!r} in {path}")
+        seen.add(spec["id"])
+    return specs
+
+
+def completed_ids(output_path: str) -> Set[str]:
+    """Ids already written as finished to the output file; a torn last line is ignored."""
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if record.get("status") == "done":
+                done.add(record["id"])
+    return done
+
+
+def _status_code(error: BaseException) -> Optional[int]:
+    """HTTP status of an API error, looking through wrapped exceptions."""
+    while error is not None:
+        status = getattr(error, "status_code", None)
+        if isinstance(status, int):
+            return status
+        error = error.__cause__ or error.__context__
+    return None
+
+
+def _transport_gave_up(error: BaseException) -> bool:
+    """True for API failures the rate-limited transport retried and gave up on; other errors fail the spec."""
+    status = _status_code(error)
+    if status is not None:
+        return status in RETRYABLE_STATUS
+    while error is not None:
+        if isinstance(error, (APIConnectionError, httpx.TransportError)):
+            return True
+        error = error.__cause__ or error.__context__
+    return False
+
+
+def _retry_after(error: BaseException) -> Optional[float]:
+    while error is not None:
+        response = getattr(error, "response", None)
+        value = getattr(response, "headers", {}).get("retry-after") if response is not None else None
+        if value:
+            try:
+                return float(value)
+            except ValueError:
+                return None
+        error = error.__cause__ or error.__context__
+    return None
+
+
+class BatchRunner:
+    """Runs specs through one shared pipeline with bounded concurrency.
+
+    A rate-limited request pauses the start of every further request until its
+    backoff has passed, instead of letting each worker hammer the API on its own.
+    """
+
+    def __init__(self, pipeline: EnhancedMarketingCampaignPipeline, output_path: str,
+                 concurrency: int = BATCH_CONCURRENCY, max_attempts: int = BATCH_MAX_ATTEMPTS,
+                 store_results: bool = False):
+        self.pipeline = pipeline
+        self.output_path = output_path
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.store_results = store_results
+        self._slots = asyncio.Semaphore(concurrency)
+        self._write_lock = asyncio.Lock()
+        self._resume_at = 0.0
+        self.counts = {"done": 0, "failed": 0}
+
+    async def _wait_for_cooldown(self):
+        while True:
+            delay = self._resume_at - time.monotonic()
+            if delay <= 0:
+                return
+            await asyncio.sleep(delay)
+
+    def _backoff(self, attempt: int, error: BaseException) -> float:
+        delay = _retry_after(error) or min(BATCH_MAX_BACKOFF, BATCH_BACKOFF * 2 ** (attempt - 1))
+        return delay * random.uniform(1.0, 1.5)
+
+    async def _write(self, record: Dict[str, Any]):
+        async with self._write_lock:
+            with open(self.output_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+    async def _generate(self, spec: Dict[str, Any]) -> Dict[str, Any]:
+        details = spec["campaign_details"]
+        for attempt in range(1, self.max_attempts + 1):
+            await self._wait_for_cooldown()
+            try:
+                return await self.pipeline.run_campaign_graph(
+                    details["campaign_objective"],
+                    details["target_industry"],
+                    status_callback=lambda message: None,
+                    **{k: v for k, v in details.items() if k not in ("campaign_objective", "target_industry")}
+                )
+            except Exception as e:
+                if attempt == self.max_attempts or not _transport_gave_up(e):
+                    raise
+                status = _status_code(e)
+                delay = self._backoff(attempt, e)
+                if status == 429:
+                    self._resume_at = max(self._resume_at, time.monotonic() + delay)
+                print(f"⏳ {spec['id']}: attempt {attempt} failed ({status or type(e).__name__}), "
+                      f"retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+    async def run_spec(self, spec: Dict[str, Any], position: str):
+        async with self._slots:
+            start = time.perf_counter()
+            print(f"🚀 [{position}] {spec['id']}: {spec['campaign_details']['campaign_objective'][:60]}")
+            record = {"id": spec["id"], "campaign_details": spec["campaign_details"]}
+            try:
+                results = await self._generate(spec)
+                record.update(
+                    status="done",
+                    final_campaign=results["final_campaign"].model_dump(mode="json"),
+                    timings={step: round(t["duration"], 3) for step, t in results.get("timings", {}).items()},
+                )
+                if self.store_results:
+                    await asyncio.to_thread(get_result_store().save, spec["id"], spec["campaign_details"], results)
+                self.counts["done"] += 1
+                print(f"✅ [{position}] {spec['id']} done in {time.perf_counter() - start:.1f}s")
+            except Exception as e:
+                record.update(status="failed", error=str(e))
+                self.counts["failed"] += 1
+                print(f"❌ [{position}] {spec['id']} failed: {e}")
+            record["duration"] = round(time.perf_counter() - start, 3)
+            await self._write(record)
+
+    async def run(self, specs: Iterable[Dict[str, Any]]):
+        specs = list(specs)
+        await asyncio.gather(*(
+            self.run_spec(spec, f"{i}/{len(specs)}") for i, spec in enumerate(specs, 1)
+        ))
+        return self.counts
+
+
+async def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("specs", help="JSONL or CSV file of campaign specs")
+    parser.add_argument("-o", "--output", default="briefs.jsonl", help="JSONL file briefs are appended to")
+    parser.add_argument("--concurrency", type=int, default=BATCH_CONCURRENCY, help="briefs generated at once")
+    parser.add_argument("--max-attempts", type=int, default=BATCH_MAX_ATTEMPTS, help="attempts per brief")
+    parser.add_argument("--store", action="store_true", help="also save runs to the result store (open with ?job=<id>)")
+    parser.add_argument("--restart", action="store_true",
+                        help="regenerate every brief, moving the existing output file aside")
+    args = parser.parse_args(argv)
+
+    specs = load_specs(args.specs)
+    done = set() if args.restart else completed_ids(args.output)
+    pending = [spec for spec in specs if spec["id"] not in done]
+    print(f"📋 {len(specs)} specs, {len(specs) - len(pending)} already done, {len(pending)} to generate")
+    if not pending:
+        return
+
+    azure_model = create_azure_openai_model()
+    if not azure_model:
+        print("❌ Model creation failed. Exiting.")
+        return
+    if args.restart and os.path.exists(args.output):
+        # Appending would leave two records per id in the same file
+        rotated = f"{args.output}.{time.strftime('%Y%m%d-%H%M%S')}"
+        os.replace(args.output, rotated)
+        print(f"🗂️ Moved the previous output to {rotated}")
+    start_telemetry()
+    db_manager = DatabaseManager(os.path.join(project_root, "campaigns.xlsx"))
+    try:
+        pipeline = EnhancedMarketingCampaignPipeline(azure_model, db_manager)
+        runner = BatchRunner(pipeline, args.output, args.concurrency, args.max_attempts, args.store)
+        start = time.perf_counter()
+        # Batch briefs yield to interactive chat and UI pipelines when the quota runs short
+        with request_priority(BATCH):
+            counts = await runner.run(pending)
+        print(f"\n🎉 Batch finished in {time.perf_counter() - start:.1f}s: "
+              f"{counts['done']} done, {counts['failed']} failed → {args.output}")
+    finally:
+        await db_manager.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
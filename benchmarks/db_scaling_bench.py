@@ -0,0 +1,156 @@
+# benchmarks/db_scaling_bench.py
+"""Scaling curves of the campaign data layer on synthetic tables.
+
+    python -m benchmarks.db_scaling_bench
+    python -m benchmarks.db_scaling_bench --rows 10000 100000 1000000 10000000 --formats parquet csv
+    python -m benchmarks.db_scaling_bench --baseline --json db_scaling.json
+
+For each size and file format this times reading the file, decoding the channel
+lists, building each snapshot table, writing and re-reading the snapshot, and
+serving each DatabaseManager query. --baseline also times the original pandas
+queries (channels explode/groupby, per-group `list(set(x))`) on the same data.
+The last column is the log-log slope between the two largest sizes (1.0 = linear).
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import resource
+import tempfile
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic_campaigns import XLSX_MAX_ROWS, write_campaigns
+from database.db_manager import CampaignSnapshot, decode_channels, load_campaign_frame
+from services import telemetry
+
+
+def timed(func, *args, repeats: int = 1):
+    """(result, median seconds) over `repeats` calls."""
+    timings, result = [], None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = func(*args)
+        timings.append(time.perf_counter() - start)
+    return result, statistics.median(timings)
+
+
+def baseline_channel_performance(df: pd.DataFrame) -> dict:
+    """The original query: parse list cells, explode, groupby channel, iterrows."""
+    df = df.copy()
+    df['channels'] = df['channels'].astype(object).apply(
+        lambda x: eval(x) if isinstance(x, str) and x.startswith("[") else [x] if isinstance(x, str) else x
+    )
+    grouped = df.explode('channels').groupby('channels').agg(
+        avg_success_score=('success_score', 'mean'),
+        avg_roas=('roas', 'mean'),
+        avg_ctr=('ctr', 'mean'),
+        avg_conversion_rate=('conversion_rate', 'mean'),
+        campaign_count=('campaign_id', 'count')
+    ).reset_index()
+    return {row['channels']: dict(row) for _, row in grouped.iterrows()}
+
+
+def baseline_industry_insights(df: pd.DataFrame) -> list:
+    """The original query: groupby industry with per-group `list(set(x))` aggregations."""
+    df = df.astype({'industry': object, 'creative_type': object, 'messaging_tone': object})
+    return df.groupby('industry').agg(
+        avg_success_score=('success_score', 'mean'),
+        avg_budget=('budget', 'mean'),
+        avg_duration=('duration_days', 'mean'),
+        popular_creative_types=('creative_type', lambda x: list(set(x))),
+        popular_tones=('messaging_tone', lambda x: list(set(x))),
+        campaign_count=('campaign_id', 'count')
+    ).reset_index().to_dict(orient='records')
+
+
+def span_duration(name: str) -> float:
+    return sum(record["duration"] for record in telemetry.RECENT_SPANS if record["name"] == name)
+
+
+def measure(path: str, repeats: int, baseline: bool) -> dict:
+    result = {"file_mb": os.path.getsize(path) / 1e6}
+    df, result["read"] = timed(load_campaign_frame, path)
+    bridge, result["decode_channels"] = timed(decode_channels, df['channels'])
+
+    telemetry.RECENT_SPANS.clear()
+    snapshot, result["build_total"] = timed(CampaignSnapshot.build, "bench", df, bridge)
+    for stage in ("ranking", "channels", "industries"):
+        result[f"build_{stage}"] = span_duration(f"db.build_{stage}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        _, result["snapshot_write"] = timed(snapshot.write, directory)
+        snapshot, result["snapshot_read"] = timed(CampaignSnapshot.read, directory, "bench")
+
+    _, result["query_successful_campaigns"] = timed(snapshot.successful_campaigns, 20, repeats=repeats)
+    _, result["query_channel_performance"] = timed(snapshot.channel_performance, repeats=repeats)
+    _, result["query_industry_insights"] = timed(snapshot.industry_insights, None, repeats=repeats)
+    _, result["query_industry_insights_filtered"] = timed(snapshot.industry_insights, "retail", repeats=repeats)
+
+    if baseline:
+        _, result["baseline_channel_performance"] = timed(baseline_channel_performance, df)
+        _, result["baseline_industry_insights"] = timed(baseline_industry_insights, df)
+    result["peak_rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return result
+
+
+def slope(sizes, values) -> float:
+    """Log-log slope between the two largest sizes."""
+    if len(sizes) < 2 or min(values[-2:]) <= 0:
+        return float("nan")
+    return float(np.log(values[-1] / values[-2]) / np.log(sizes[-1] / sizes[-2]))
+
+
+def print_curves(fmt: str, sizes, results):
+    print(f"\n📈 {fmt}")
+    print(f"   {'stage':<34}" + "".join(f"{size:>12,}" for size in sizes) + f"{'slope':>8}")
+    for metric in results[0]:
+        values = [r[metric] for r in results]
+        if metric in ("file_mb", "peak_rss_mb"):
+            cells = "".join(f"{v:>10.1f}MB" for v in values)
+        else:
+            cells = "".join(f"{v * 1e3:>10.2f}ms" for v in values)
+        print(f"   {metric:<34}{cells}{slope(sizes, values):>8.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000, 1_000_000], help="table sizes")
+    parser.add_argument("--formats", nargs="+", default=["parquet", "csv", "xlsx"], choices=["parquet", "csv", "xlsx"])
+    parser.add_argument("--xlsx-max-rows", type=int, default=100_000, help="skip larger xlsx files (slow to write)")
+    parser.add_argument("--repeats", type=int, default=20, help="timed calls per served query")
+    parser.add_argument("--baseline", action="store_true", help="also time the original pandas queries")
+    parser.add_argument("--workdir", help="keep generated files here (default: a temp dir)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    report = {"settings": vars(args), "formats": {}}
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = args.workdir or tmp
+        for fmt in args.formats:
+            limit = min(XLSX_MAX_ROWS, args.xlsx_max_rows) if fmt == "xlsx" else None
+            sizes = sorted(size for size in args.rows if limit is None or size <= limit)
+            results = []
+            for size in sizes:
+                path = os.path.join(workdir, f"campaigns_{size}.{fmt}")
+                if not os.path.exists(path):
+                    _, generated = timed(write_campaigns, path, size, args.seed)
+                    print(f"🧪 Generated {size:,} rows as {fmt} in {generated:.1f}s")
+                results.append(measure(path, args.repeats, args.baseline))
+            if results:
+                print_curves(fmt, sizes, results)
+                report["formats"][fmt] = [{"rows": size, **result} for size, result in zip(sizes, results)]
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
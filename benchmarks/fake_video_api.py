@@ -0,0 +1,151 @@
+# benchmarks/fake_video_api.py
+"""Local stand-in for the Elai.io video API: renders "finish" after a delay.
+
+    python -m benchmarks.fake_video_api --port 8766 --render-seconds 20
+    ELAI_API_URL=http://127.0.0.1:8766/api/video/ ELAI_API_TOKEN=local python VideoGenerator.py
+
+POST /api/video/render returns {"videoId": ...}; GET /api/video/<id> reports
+{"status": "rendering"} until the render time has passed, then "ready" with a
+videoUrl. If the request carried a "webhook" URL, the finished video is also
+POSTed there, except for the share given by --drop-webhooks (exercises polling).
+"""
+import os
+import sys
+import json
+import time
+import uuid
+import heapq
+import random
+import argparse
+import threading
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+API_PREFIX = "/api/video/"
+
+
+class FakeVideoAPI(ThreadingHTTPServer):
+    daemon_threads = True
+    # The default backlog of 5 resets connections when many renders are submitted at once
+    request_queue_size = 128
+
+    def __init__(self, address, render_seconds: float = 5.0, jitter: float = 0.0, fail_rate: float = 0.0,
+                 drop_webhooks: float = 0.0, seed: int = 0):
+        super().__init__(address, _VideoAPIHandler)
+        self.render_seconds = render_seconds
+        self.jitter = jitter
+        self.fail_rate = fail_rate
+        self.drop_webhooks = drop_webhooks
+        self.videos = {}  # video id -> {"ready_at", "failed", "webhook"}
+        self.counts = {"render": 0, "status": 0, "webhooks_sent": 0}
+        self._lock = threading.Lock()
+        self._rng = random.Random(seed)
+        # Pending callbacks, sent by one dispatcher thread rather than a timer per video
+        self._webhooks = []  # heap of (due, video id, url)
+        self._webhooks_ready = threading.Condition(self._lock)
+        threading.Thread(target=self._dispatch_webhooks, name="fake-video-webhooks", daemon=True).start()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}{API_PREFIX}"
+
+    def start_render(self, webhook: str = None) -> str:
+        video_id = uuid.uuid4().hex[:24]
+        with self._lock:
+            self.counts["render"] += 1
+            delay = max(0.0, self.render_seconds + self._rng.uniform(-self.jitter, self.jitter))
+            failed = self._rng.random() < self.fail_rate
+            send_webhook = webhook and self._rng.random() >= self.drop_webhooks
+            self.videos[video_id] = {"ready_at": time.monotonic() + delay, "failed": failed}
+            if send_webhook:
+                heapq.heappush(self._webhooks, (time.monotonic() + delay, video_id, webhook))
+                self._webhooks_ready.notify()
+        return video_id
+
+    def _dispatch_webhooks(self):
+        while True:
+            with self._webhooks_ready:
+                while not self._webhooks or self._webhooks[0][0] > time.monotonic():
+                    self._webhooks_ready.wait(self._webhooks[0][0] - time.monotonic() if self._webhooks else None)
+                _, video_id, url = heapq.heappop(self._webhooks)
+            self._send_webhook(url, video_id)
+
+    def status(self, video_id: str) -> dict:
+        with self._lock:
+            self.counts["status"] += 1
+            video = self.videos.get(video_id)
+        if video is None:
+            return None
+        if time.monotonic() < video["ready_at"]:
+            return {"_id": video_id, "status": "rendering"}
+        if video["failed"]:
+            return {"_id": video_id, "status": "error"}
+        return {"_id": video_id, "status": "ready", "videoUrl": f"https://videos.example.com/{video_id}.mp4"}
+
+    def _send_webhook(self, url: str, video_id: str):
+        body = json.dumps({"videoId": video_id, **self.status(video_id)}).encode("utf-8")
+        request = urllib.request.Request(url, data=body, headers={"Content-Type": "application/json"})
+        try:
+            urllib.request.urlopen(request, timeout=10).close()
+            with self._lock:
+                self.counts["webhooks_sent"] += 1
+        except OSError as e:
+            print(f"⚠️ Webhook to {url} failed: {e}")
+
+
+class _VideoAPIHandler(BaseHTTPRequestHandler):
+    def _send_json(self, status: int, data: dict):
+        payload = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_POST(self):
+        if self.path != API_PREFIX + "render":
+            self.send_error(404)
+            return
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        self._send_json(200, {"videoId": self.server.start_render(body.get("webhook"))})
+
+    def do_GET(self):
+        if not self.path.startswith(API_PREFIX):
+            self.send_error(404)
+            return
+        status = self.server.status(self.path[len(API_PREFIX):])
+        if status is None:
+            self._send_json(404, {"error": "video not found"})
+        else:
+            self._send_json(200, status)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_fake_video_api(port: int = 0, **settings) -> FakeVideoAPI:
+    """Serve the fake API on a background thread; port 0 picks a free port."""
+    server = FakeVideoAPI(("127.0.0.1", port), **settings)
+    threading.Thread(target=server.serve_forever, name="fake-video-api", daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--render-seconds", type=float, default=20.0)
+    parser.add_argument("--jitter", type=float, default=5.0, help="± seconds added to each render")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="share of renders that end in error")
+    parser.add_argument("--drop-webhooks", type=float, default=0.0, help="share of finished renders not called back")
+    args = parser.parse_args()
+    server = FakeVideoAPI(("127.0.0.1", args.port), render_seconds=args.render_seconds, jitter=args.jitter,
+                          fail_rate=args.fail_rate, drop_webhooks=args.drop_webhooks)
+    print(f"🎬 Fake video API at {server.base_url}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
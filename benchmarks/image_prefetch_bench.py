@@ -0,0 +1,61 @@
+# benchmarks/image_prefetch_bench.py
+"""Image loading for the asset page against the local stand-in image server.
+
+    python -m benchmarks.image_prefetch_bench
+    python -m benchmarks.image_prefetch_bench --images 10 --latency 2 --concurrency 6
+
+Times fetching `--images` variation images one after another (the old page
+behaviour), in parallel into an empty cache, and again from the warm cache.
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.image_server import start_image_server
+from services.image_cache import ImageCache, ImagePrefetcher
+
+
+async def timed_prefetch(prefetcher: ImagePrefetcher, prompts, serial: bool) -> float:
+    start = time.perf_counter()
+    if serial:
+        for prompt in prompts:
+            await prefetcher.fetch(prompt)
+    else:
+        images = await prefetcher.prefetch(prompts)
+        missing = [prompt for prompt, image in images.items() if image is None]
+        if missing:
+            print(f"⚠️ {len(missing)} images missing")
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--images", type=int, default=10, help="variation images per page")
+    parser.add_argument("--latency", type=float, default=1.0, help="stand-in server seconds per render")
+    parser.add_argument("--concurrency", type=int, default=6, help="parallel downloads")
+    parser.add_argument("--size", type=int, default=1024, help="rendered image width and height")
+    args = parser.parse_args()
+
+    server = start_image_server(latency=args.latency, size=args.size)
+    prompts = [f"Variation {i}: bold summer launch for young families" for i in range(args.images)]
+    with tempfile.TemporaryDirectory() as serial_dir, tempfile.TemporaryDirectory() as parallel_dir:
+        serial = ImagePrefetcher(ImageCache(serial_dir), base_url=server.base_url, concurrency=1)
+        parallel = ImagePrefetcher(ImageCache(parallel_dir), base_url=server.base_url, concurrency=args.concurrency)
+        timings = {
+            "serial, cold cache": asyncio.run(timed_prefetch(serial, prompts, serial=True)),
+            "parallel, cold cache": asyncio.run(timed_prefetch(parallel, prompts, serial=False)),
+            "parallel, warm cache": asyncio.run(timed_prefetch(parallel, prompts, serial=False)),
+        }
+    server.shutdown()
+    print(f"\n🖼️ {args.images} images, {args.latency:.1f}s per render, {server.requests} server requests")
+    for label, seconds in timings.items():
+        print(f"   {label:<24}{seconds:>8.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+# benchmarks/image_server.py
+"""Local stand-in for the text-to-image endpoint: renders a placeholder image per prompt.
+
+    python -m benchmarks.image_server --port 8765 --latency 2
+    IMAGE_BASE_URL=http://127.0.0.1:8765/prompt/ streamlit run app.py
+
+GET /prompt/<url-encoded prompt> returns a JPEG whose colour is derived from the
+prompt, after `latency` seconds. Requests are served on their own threads, so
+parallel fetches overlap like they do against the remote service.
+"""
+import io
+import os
+import sys
+import time
+import random
+import hashlib
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image, ImageDraw
+
+
+def render_placeholder(prompt: str, size: int = 1024) -> bytes:
+    """A JPEG coloured by the prompt's hash, with the prompt written on it."""
+    digest = hashlib.sha256(prompt.encode("utf-8")).digest()
+    image = Image.new("RGB", (size, size), tuple(digest[:3]))
+    ImageDraw.Draw(image).multiline_text((24, 24), "\n".join(prompt[i:i + 60] for i in range(0, len(prompt), 60)),
+                                         fill=(255, 255, 255))
+    buffer = io.BytesIO()
+    image.save(buffer, "JPEG", quality=90)
+    return buffer.getvalue()
+
+
+class ImageServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, latency: float = 0.0, jitter: float = 0.0, size: int = 1024,
+                 fail_every: int = 0):
+        super().__init__(address, _ImageHandler)
+        self.latency = latency
+        self.jitter = jitter
+        self.size = size
+        self.fail_every = fail_every  # every Nth request answers 503 (exercises retries)
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._rng = random.Random(0)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/prompt/"
+
+    def next_request(self):
+        """(request number, delay) for an incoming request."""
+        with self._lock:
+            self.requests += 1
+            delay = max(0.0, self.latency + self._rng.uniform(-self.jitter, self.jitter))
+            return self.requests, delay
+
+
+class _ImageHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        path = urlparse(self.path).path
+        if not path.startswith("/prompt/"):
+            self.send_error(404)
+            return
+        number, delay = self.server.next_request()
+        time.sleep(delay)
+        if self.server.fail_every and number % self.server.fail_every == 0:
+            self.send_error(503)
+            return
+        payload = render_placeholder(unquote(path[len("/prompt/"):]), self.server.size)
+        self.send_response(200)
+        self.send_header("Content-Type", "image/jpeg")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_image_server(port: int = 0, **settings) -> ImageServer:
+    """Serve placeholder images on a background thread; port 0 picks a free port."""
+    server = ImageServer(("127.0.0.1", port), **settings)
+    threading.Thread(target=server.serve_forever, name="image-server", daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=2.0, help="seconds per render")
+    parser.add_argument("--jitter", type=float, default=0.0, help="± seconds added to each render")
+    parser.add_argument("--size", type=int, default=1024, help="image width and height")
+    parser.add_argument("--fail-every", type=int, default=0, help="answer every Nth request with 503")
+    args = parser.parse_args()
+    server = ImageServer(("127.0.0.1", args.port), latency=args.latency, jitter=args.jitter, size=args.size,
+                         fail_every=args.fail_every)
+    print(f"🖼️ Placeholder images at {server.base_url}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+# benchmarks/mock_llm.py
+"""Deterministic stand-in for the Azure model: canned structured outputs after a configurable delay."""
+import json
+import random
+import asyncio
+from typing import Any, AsyncIterator, Dict, List
+
+from pydantic_ai.messages import ModelMessage, ModelResponse, ToolCallPart
+from pydantic_ai.models.function import AgentInfo, DeltaToolCall, DeltaToolCalls, FunctionModel
+
+WORDS = (
+    "audience growth brand awareness conversion social video loyalty premium launch engagement "
+    "retention value community trust digital search creative seasonal mobile family"
+).split()
+
+
+def canned_value(schema: Dict[str, Any], defs: Dict[str, Any], rng: random.Random, words: int) -> Any:
+    """A value satisfying a JSON schema node, built from seeded random words and numbers."""
+    if "$ref" in schema:
+        return canned_value(defs[schema["$ref"].split("/")[-1]], defs, rng, words)
+    if "anyOf" in schema:
+        options = [option for option in schema["anyOf"] if option.get("type") != "null"]
+        return canned_value(options[0], defs, rng, words) if options else None
+    kind = schema.get("type")
+    if kind == "object":
+        properties = schema.get("properties")
+        if properties:
+            return {name: canned_value(prop, defs, rng, words) for name, prop in properties.items()}
+        values = schema.get("additionalProperties") or {"type": "string"}
+        return {rng.choice(WORDS).title(): canned_value(values, defs, rng, words) for _ in range(3)}
+    if kind == "array":
+        return [canned_value(schema.get("items", {"type": "string"}), defs, rng, max(4, words // 4)) for _ in range(4)]
+    if kind == "number":
+        return round(rng.uniform(0.01, 10), 3)
+    if kind == "integer":
+        return rng.randint(1, 50)
+    if kind == "boolean":
+        return rng.random() < 0.5
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def canned_args(schema: Dict[str, Any], seed: int, words: int) -> Dict[str, Any]:
+    return canned_value(schema, schema.get("$defs", {}), random.Random(seed), words)
+
+
+class MockLLM:
+    """Builds a pydantic-ai FunctionModel that answers every structured-output call locally.
+
+    Each call waits `latency` seconds (± `jitter`, seeded) and returns arguments
+    generated from the output tool's schema, so any output type works, including
+    the partial models used for revisions.
+    """
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, words: int = 40, chunk_size: int = 64,
+                 seed: int = 0):
+        self.latency = latency
+        self.jitter = jitter
+        self.words = words
+        self.chunk_size = chunk_size
+        self._rng = random.Random(seed)
+        self.calls = 0
+
+    def _delay(self) -> float:
+        return max(0.0, self.latency + self._rng.uniform(-self.jitter, self.jitter))
+
+    def _args(self, info: AgentInfo):
+        tool = info.output_tools[0]
+        self.calls += 1
+        return tool.name, canned_args(tool.parameters_json_schema, self.calls, self.words)
+
+    async def respond(self, messages: List[ModelMessage], info: AgentInfo) -> ModelResponse:
+        await asyncio.sleep(self._delay())
+        name, args = self._args(info)
+        return ModelResponse(parts=[ToolCallPart(name, args)])
+
+    async def stream(self, messages: List[ModelMessage], info: AgentInfo) -> AsyncIterator[DeltaToolCalls]:
+        name, args = self._args(info)
+        payload = json.dumps(args)
+        chunks = range(0, len(payload), self.chunk_size)
+        # First token after half the delay, the rest spread over the other half
+        delay = self._delay()
+        await asyncio.sleep(delay / 2)
+        yield {0: DeltaToolCall(name=name, tool_call_id="mock")}
+        for start in chunks:
+            await asyncio.sleep(delay / 2 / len(chunks))
+            yield {0: DeltaToolCall(json_args=payload[start:start + self.chunk_size])}
+
+    def model(self) -> FunctionModel:
+        return FunctionModel(self.respond, stream_function=self.stream, model_name="mock-llm")
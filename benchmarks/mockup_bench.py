@@ -0,0 +1,61 @@
+# benchmarks/mockup_bench.py
+"""Batch rendering of ad mockups (variations x formats) with the local Pillow renderer.
+
+    python -m benchmarks.mockup_bench
+    python -m benchmarks.mockup_bench --variations 10 --workers 1 4 8
+
+Renders every variation in every format in-process, then with a process pool of
+each `--workers` size into an empty cache, and finally from the warm cache.
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.mock_llm import WORDS
+from services.mockup_renderer import FORMAT_SIZES, MockupCache, MockupSpec, render_batch
+
+
+def sample_specs(variations: int):
+    specs = []
+    for i in range(variations):
+        headline = " ".join(WORDS[(i + j) % len(WORDS)] for j in range(4)).title()
+        body = " ".join(WORDS[(i * 3 + j) % len(WORDS)] for j in range(24)).capitalize() + "."
+        specs += [MockupSpec(fmt, headline, body, "Shop Now") for fmt in FORMAT_SIZES]
+    return specs
+
+
+def timed_batch(specs, directory: str, pool=None) -> float:
+    start = time.perf_counter()
+    render_batch(specs, MockupCache(directory), pool=pool)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--variations", type=int, default=10, help="variations, each rendered in every format")
+    parser.add_argument("--workers", type=int, nargs="+", default=[os.cpu_count() or 1], help="pool sizes")
+    args = parser.parse_args()
+
+    specs = sample_specs(args.variations)
+    timings = {}
+    with tempfile.TemporaryDirectory() as directory:
+        timings["in-process, cold cache"] = timed_batch(specs, os.path.join(directory, "inline"))
+        for workers in args.workers:
+            with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+                pool.submit(int).result()  # start the workers before timing
+                timings[f"{workers} workers, cold cache"] = timed_batch(specs, os.path.join(directory, str(workers)), pool)
+        timings["warm cache"] = timed_batch(specs, os.path.join(directory, "inline"))
+    print(f"\n🎨 {len(specs)} mockups ({args.variations} variations x {len(FORMAT_SIZES)} formats), "
+          f"{os.cpu_count()} CPUs")
+    for label, seconds in timings.items():
+        print(f"   {label:<26}{seconds:>8.3f}s{len(specs) / seconds:>10.0f}/s")
+
+
+if __name__ == "__main__":
+    main()
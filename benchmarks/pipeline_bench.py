@@ -0,0 +1,182 @@
+# benchmarks/pipeline_bench.py
+"""Offline benchmark of the full campaign pipeline against a mock LLM (no network).
+
+    python -m benchmarks.pipeline_bench
+    python -m benchmarks.pipeline_bench --rows 100 10000 100000 --concurrency 1 8 32 --latency 0.5
+    python -m benchmarks.pipeline_bench --stream --json pipeline_bench.json
+
+Every scenario runs `--briefs` pipelines and `--revisions` revisions on a workbook of
+the given size, at most `--concurrency` at a time, and reports throughput, brief
+latency, CPU time and peak RSS plus p50/p95 wall and CPU time per stage (from the
+telemetry spans). CPU per stage is process CPU while the stage ran, so it is only
+exact at concurrency 1.
+"""
+import io
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import resource
+import tempfile
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# No LLM cache (every call must reach the mock) and room for every span of a scenario
+os.environ.setdefault("LLM_CACHE_TTL", "0")
+os.environ.setdefault("CAMPAIGN_TRACE_BUFFER", "200000")
+
+from benchmarks.mock_llm import MockLLM
+from benchmarks.section_classifier_bench import percentile
+from benchmarks.synthetic_campaigns import write_campaigns
+from core.pipeline import EnhancedMarketingCampaignPipeline
+from database import db_manager
+from database.db_manager import DatabaseManager
+from services import telemetry
+
+STAGE_PREFIXES = ("pipeline.", "step.", "db.", "prompt.", "agent.")
+REVISION_SECTIONS = {"analyst": False, "strategy": False, "creative": True, "campaign": True}
+
+
+def scaled_workbook(rows: int, directory: str, seed: int = 0) -> str:
+    """A synthetic workbook of `rows` campaigns (generated once per directory)."""
+    path = os.path.join(directory, f"campaigns_{rows}.xlsx")
+    if not os.path.exists(path):
+        write_campaigns(path, rows, seed)
+    return path
+
+
+def peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def time_store_load(path: str) -> dict:
+    """Cold load from the workbook (building the snapshot), then from the snapshot alone."""
+    timings = {}
+    for label in ("workbook", "snapshot"):
+        db_manager._STORES.pop(os.path.abspath(path), None)
+        start = time.perf_counter()
+        db_manager.get_campaign_store(path)
+        timings[label] = time.perf_counter() - start
+    return timings
+
+
+def stage_stats(spans) -> dict:
+    by_stage = {}
+    for record in spans:
+        if record["name"].startswith(STAGE_PREFIXES):
+            by_stage.setdefault(record["name"], []).append(record)
+    return {
+        name: {
+            "count": len(records),
+            "p50": percentile([r["duration"] for r in records], 0.5),
+            "p95": percentile([r["duration"] for r in records], 0.95),
+            "cpu_p50": percentile([r["cpu"] for r in records], 0.5),
+        }
+        for name, records in sorted(by_stage.items())
+    }
+
+
+async def run_scenario(model, workbook: str, concurrency: int, briefs: int, revisions: int, stream: bool) -> dict:
+    telemetry.RECENT_SPANS.clear()
+    db = DatabaseManager(workbook)
+    pipeline = EnhancedMarketingCampaignPipeline(model, db)
+    slots = asyncio.Semaphore(concurrency)
+    partial_callback = (lambda step, fields: None) if stream else None
+    latencies, revision_latencies, results = [], [], []
+
+    async def brief(i: int):
+        async with slots:
+            start = time.perf_counter()
+            results.append(await pipeline.run_campaign_graph(
+                f"Benchmark objective {i}", "Retail", status_callback=lambda message: None,
+                partial_callback=partial_callback, campaign_budget="50000", media_target="Parents"
+            ))
+            latencies.append(time.perf_counter() - start)
+
+    async def revise(i: int):
+        async with slots:
+            start = time.perf_counter()
+            with telemetry.span("pipeline.revise"):
+                await pipeline.revise_campaign(
+                    results[i % len(results)], "Make the tagline punchier and move the launch to Q3",
+                    REVISION_SECTIONS, {"campaign_objective": f"Benchmark objective {i}", "target_industry": "Retail"},
+                    status_callback=lambda message: None
+                )
+            revision_latencies.append(time.perf_counter() - start)
+
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+    await asyncio.gather(*(brief(i) for i in range(briefs)))
+    brief_wall = time.perf_counter() - wall_start
+    if revisions:
+        await asyncio.gather(*(revise(i) for i in range(revisions)))
+    wall = time.perf_counter() - wall_start
+    await db.close()
+    return {
+        "wall": wall,
+        "cpu": time.process_time() - cpu_start,
+        "throughput": briefs / brief_wall,
+        "brief_p50": percentile(latencies, 0.5),
+        "brief_p95": percentile(latencies, 0.95),
+        "revision_p50": percentile(revision_latencies, 0.5) if revision_latencies else None,
+        "revision_p95": percentile(revision_latencies, 0.95) if revision_latencies else None,
+        "peak_rss_mb": peak_rss_mb(),
+        "stages": stage_stats(telemetry.RECENT_SPANS),
+    }
+
+
+def print_scenario(rows: int, concurrency: int, result: dict):
+    print(f"\n📊 rows={rows:,} concurrency={concurrency}: {result['throughput']:.2f} briefs/s, "
+          f"brief p50 {result['brief_p50']:.3f}s p95 {result['brief_p95']:.3f}s, "
+          f"CPU {result['cpu']:.2f}s, peak RSS {result['peak_rss_mb']:.0f} MB")
+    if result["revision_p50"] is not None:
+        print(f"   revision p50 {result['revision_p50']:.3f}s p95 {result['revision_p95']:.3f}s")
+    print(f"   {'stage':<28}{'count':>6}{'p50 ms':>10}{'p95 ms':>10}{'cpu p50 ms':>12}")
+    for name, stats in result["stages"].items():
+        print(f"   {name:<28}{stats['count']:>6}{stats['p50'] * 1e3:>10.2f}{stats['p95'] * 1e3:>10.2f}"
+              f"{stats['cpu_p50'] * 1e3:>12.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[100, 10_000], help="workbook sizes")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8], help="pipelines run at once")
+    parser.add_argument("--briefs", type=int, default=8, help="briefs per scenario")
+    parser.add_argument("--revisions", type=int, default=4, help="revisions per scenario")
+    parser.add_argument("--latency", type=float, default=0.05, help="mock LLM seconds per call")
+    parser.add_argument("--jitter", type=float, default=0.0, help="± seconds added to each call")
+    parser.add_argument("--words", type=int, default=40, help="words per generated text field")
+    parser.add_argument("--stream", action="store_true", help="stream agent outputs like the UI does")
+    parser.add_argument("--workdir", help="where generated workbooks are kept (default: a temp dir)")
+    parser.add_argument("--json", help="also write the results to this file")
+    parser.add_argument("--verbose", action="store_true", help="show the pipeline's own status output")
+    args = parser.parse_args()
+
+    mock = MockLLM(latency=args.latency, jitter=args.jitter, words=args.words)
+    model = mock.model()
+    report = {"settings": vars(args), "scenarios": []}
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = args.workdir or tmp
+        for rows in args.rows:
+            workbook = scaled_workbook(rows, workdir)
+            load = time_store_load(workbook)
+            print(f"\n🗄️ {rows:,} rows: cold load {load['workbook']:.3f}s from workbook, "
+                  f"{load['snapshot']:.3f}s from snapshot")
+            for concurrency in args.concurrency:
+                with redirect_stdout(sys.stdout if args.verbose else io.StringIO()):
+                    result = asyncio.run(
+                        run_scenario(model, workbook, concurrency, args.briefs, args.revisions, args.stream)
+                    )
+                print_scenario(rows, concurrency, result)
+                report["scenarios"].append({"rows": rows, "concurrency": concurrency, "store_load": load, **result})
+    print(f"\n🤖 {mock.calls} mock LLM calls")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+# benchmarks/section_classifier_bench.py
+"""Latency/accuracy of the local section classifier against the LLM detector.
+
+    python -m benchmarks.section_classifier_bench            # local classifier only
+    python -m benchmarks.section_classifier_bench --llm      # also call Azure OpenAI
+
+Corpus rows without a "set" were written alongside the keyword list; the
+"holdout" rows (plurals, inflections and negations) were not, so their
+confident-accuracy line is the less optimistic figure.
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.section_classifier import SECTIONS, classify_sections
+
+CORPUS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "section_feedback.jsonl")
+
+
+def load_corpus(path: str = CORPUS_PATH):
+    with open(path, encoding="utf-8") as f:
+        rows = [json.loads(line) for line in f if line.strip()]
+    corpus = [(row["feedback"], {section: section in row["sections"] for section in SECTIONS}) for row in rows]
+    return corpus, [row.get("set", "tuning") for row in rows]
+
+
+def percentile(values, q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+def score(predictions, corpus) -> dict:
+    exact = sum(pred == truth for pred, (_, truth) in zip(predictions, corpus))
+    per_section = {}
+    for section in SECTIONS:
+        tp = sum(p[section] and t[section] for p, (_, t) in zip(predictions, corpus))
+        fp = sum(p[section] and not t[section] for p, (_, t) in zip(predictions, corpus))
+        fn = sum(t[section] and not p[section] for p, (_, t) in zip(predictions, corpus))
+        precision = tp / (tp + fp) if tp + fp else 1.0
+        recall = tp / (tp + fn) if tp + fn else 1.0
+        per_section[section] = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return {"exact_match": exact / len(corpus), "f1": per_section}
+
+
+def report(name: str, predictions, latencies, corpus):
+    result = score(predictions, corpus)
+    f1 = ", ".join(f"{section} {value:.2f}" for section, value in result["f1"].items())
+    print(f"{name:<8} exact match {result['exact_match']:.0%} | F1 {f1}")
+    print(f"{'':<8} latency p50 {percentile(latencies, 0.5) * 1e6:,.1f}µs, p95 {percentile(latencies, 0.95) * 1e6:,.1f}µs")
+
+
+def bench_local(corpus, sets, repeats: int):
+    latencies, predictions = [], []
+    for feedback, _ in corpus:
+        timings = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            prediction = classify_sections(feedback)
+            timings.append(time.perf_counter() - start)
+        latencies.append(statistics.median(timings))
+        predictions.append(prediction)
+    report("local", [p.flags for p in predictions], latencies, corpus)
+
+    for name in dict.fromkeys(sets):
+        rows = [(p, row) for p, row, s in zip(predictions, corpus, sets) if s == name]
+        confident = [(p, row) for p, row in rows if p.confident]
+        if confident:
+            accuracy = sum(p.flags == truth for p, (_, truth) in confident) / len(confident)
+            print(f"{'':<8} {name}: confident on {len(confident)}/{len(rows)} ({len(confident) / len(rows):.0%}), "
+                  f"exact match when confident {accuracy:.0%}")
+    return predictions
+
+
+async def bench_llm(corpus, local_predictions):
+    from core.pipeline import detect_sections_with_llm
+
+    latencies, predictions = [], []
+    for feedback, _ in corpus:
+        start = time.perf_counter()
+        predictions.append(await detect_sections_with_llm(feedback, ""))
+        latencies.append(time.perf_counter() - start)
+    report("llm", predictions, latencies, corpus)
+
+    # Hybrid: the local answer when confident, otherwise the LLM's
+    hybrid = [local.flags if local.confident else llm for local, llm in zip(local_predictions, predictions)]
+    hybrid_latencies = [0.0 if local.confident else t for local, t in zip(local_predictions, latencies)]
+    report("hybrid", hybrid, hybrid_latencies, corpus)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", default=CORPUS_PATH, help="JSONL of {feedback, sections}")
+    parser.add_argument("--repeats", type=int, default=200, help="timed runs per feedback for the local path")
+    parser.add_argument("--llm", action="store_true", help="also benchmark the Azure OpenAI detector")
+    args = parser.parse_args()
+
+    corpus, sets = load_corpus(args.corpus)
+    print(f"📋 {len(corpus)} labelled feedback examples")
+    local_predictions = bench_local(corpus, sets, args.repeats)
+    if args.llm:
+        os.environ.setdefault("LLM_CACHE_TTL_SECTION_DETECTION", "0")
+        asyncio.run(bench_llm(corpus, local_predictions))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+# benchmarks/synthetic_campaigns.py
+"""Synthetic campaign tables with the schema and distributions of campaigns.xlsx.
+
+    python -m benchmarks.synthetic_campaigns 100000 -o data/campaigns_100k.parquet
+    python -m benchmarks.synthetic_campaigns 1000000 -o data/campaigns_1m.csv --seed 7
+
+The format follows the file extension (.xlsx, .csv or .parquet). Rows are generated
+in chunks, so CSV and Parquet files of 10^7 rows fit in modest memory; xlsx is
+limited to one worksheet (1,048,575 rows).
+"""
+import os
+import sys
+import argparse
+from typing import Iterator
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+XLSX_MAX_ROWS = 1_048_575
+CHUNK_ROWS = 500_000
+
+# Category labels and relative frequencies as in campaigns.xlsx
+INDUSTRIES = {
+    "Retail": 14, "Technology": 14, "Education": 11, "Healthcare": 10, "Food & Beverage": 10, "Finance": 9,
+    "Automotive": 8, "Entertainment": 8, "Travel": 8, "Fashion": 5, "Baby Care": 2, "Sustainability": 1,
+}
+CREATIVE_TYPES = {
+    "Interactive": 15, "Carousel": 12, "Animation": 12, "Video": 11, "Static Image": 11, "Blog Post": 10,
+    "Story": 9, "Infographic": 9, "User Generated": 6, "Podcast": 5,
+}
+MESSAGING_TONES = {
+    "Professional": 15, "Inspirational": 12, "Caring": 12, "Emotional": 11, "Humorous": 10, "Bold": 10,
+    "Urgent": 8, "Innovative": 8, "Informative": 7, "Casual": 6, "Premium": 1,
+}
+CHANNELS = {
+    "Email Marketing": 44, "Content Marketing": 42, "Influencer Marketing": 38, "Programmatic": 37, "Google Ads": 36,
+    "TV": 36, "Outdoor": 36, "Social Media": 35, "Radio": 26, "Print": 24,
+}
+CHANNELS_PER_CAMPAIGN = {2: 15, 3: 37, 4: 27, 5: 21}
+AUDIENCES = [
+    "New parents (25-35)", "Affluent parents with infants", "Parents with school-age children",
+    "Health-conscious new parents", "Parents of toddlers (1-3 years)", "Millennial parents",
+    "Budget-conscious families", "Environmentally conscious parents", "First-time parents", "Small business owners",
+    "College students", "Health-conscious consumers", "Tech enthusiasts", "Luxury consumers",
+    "Senior citizens (55+)", "Young professionals (25-35)", "Millennials",
+]
+NAME_PREFIXES = ["Digital", "Seasonal", "Summer", "Holiday", "Back-to-School", "Premium", "Smart", "Global", "Local", "Spring"]
+NAME_SUFFIXES = ["Awareness", "Launch", "Campaign", "Promotion", "Drive", "Challenge", "Showcase", "Rewards", "Sale", "Push"]
+LAUNCH_START, LAUNCH_END = pd.Timestamp("2023-01-01"), pd.Timestamp("2025-06-30")
+CREATED_AT = pd.Timestamp("2025-06-08 22:14:08")
+
+
+def _choice(rng: np.random.Generator, labels: dict, size: int) -> np.ndarray:
+    weights = np.array(list(labels.values()), dtype="float64")
+    return rng.choice(np.array(list(labels), dtype=object), size=size, p=weights / weights.sum())
+
+
+def _channel_cells(rng: np.random.Generator, size: int) -> pd.Series:
+    """Postgres-array cells like {"Social Media",TV}: 2-5 distinct channels drawn by popularity."""
+    names = np.array([f'"{name}"' if " " in name else name for name in CHANNELS], dtype=object)
+    weights = np.log(np.array(list(CHANNELS.values()), dtype="float64"))
+    # Gumbel-top-k: weighted sampling without replacement for every row at once
+    order = np.argsort(-(weights + rng.gumbel(size=(size, len(names)))), axis=1)
+    counts = _choice(rng, CHANNELS_PER_CAMPAIGN, size).astype("int64")
+    cells = pd.Series(names[order[:, 0]])
+    for position in range(1, max(CHANNELS_PER_CAMPAIGN)):
+        cells = cells.where(counts <= position, cells + "," + names[order[:, position]])
+    return "{" + cells + "}"
+
+
+def generate_chunk(rng: np.random.Generator, start: int, size: int, id_width: int) -> pd.DataFrame:
+    industry = _choice(rng, INDUSTRIES, size)
+    # Latent campaign quality drives the correlated performance metrics
+    industry_effect = pd.Series(industry).map(
+        {name: offset for name, offset in zip(INDUSTRIES, np.random.default_rng(0).normal(0, 0.3, len(INDUSTRIES)))}
+    ).to_numpy()
+    quality = rng.normal(0, 1, size) + industry_effect
+
+    def noisy(weight: float) -> np.ndarray:
+        return weight * quality + np.sqrt(max(0.0, 1 - weight ** 2)) * rng.normal(0, 1, size)
+
+    launch_days = (LAUNCH_END - LAUNCH_START).days
+    df = pd.DataFrame({
+        "campaign_id": [f"CAMP_{i:0{id_width}d}" for i in range(start + 1, start + size + 1)],
+        "campaign_name": pd.Series(rng.choice(NAME_PREFIXES, size)) + " " + industry + " " + rng.choice(NAME_SUFFIXES, size),
+        "industry": industry,
+        "target_audience": rng.choice(np.array(AUDIENCES, dtype=object), size),
+        "channels": _channel_cells(rng, size),
+        "budget": np.clip(np.exp(rng.normal(np.log(180_000), 0.7, size)), 5_000, 500_000).round(2),
+        "duration_days": rng.integers(7, 91, size),
+        "ctr": np.clip(0.0388 + 0.0064 * noisy(0.4), 0.005, None).round(4),
+        "conversion_rate": np.exp(np.log(0.064) + 0.32 * noisy(0.85)).round(4),
+        "roas": np.clip(7.05 + 1.62 * noisy(0.6), 0.5, None).round(2),
+        "engagement_rate": np.clip(0.116 + 0.018 * noisy(0.6), 0.01, None).round(4),
+        "brand_lift": np.exp(np.log(0.18) + 0.26 * noisy(0.8)).round(4),
+        # Right-skewed like the workbook: median ~3, about 10% at or above the success threshold
+        "success_score": np.clip(0.8 + np.exp(0.8 + 0.8 * noisy(0.9)), 0, 10.5).round(2),
+        "creative_type": _choice(rng, CREATIVE_TYPES, size),
+        "messaging_tone": _choice(rng, MESSAGING_TONES, size),
+        "launch_date": LAUNCH_START + pd.to_timedelta(rng.integers(0, launch_days, size), unit="D"),
+        "created_at": CREATED_AT + pd.to_timedelta(rng.integers(0, 60_000, size), unit="ms"),
+    })
+    return df
+
+
+def generate_campaigns(rows: int, seed: int = 0, chunk_rows: int = CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """Chunks of a reproducible synthetic campaign table of `rows` rows."""
+    rng = np.random.default_rng(seed)
+    id_width = max(3, len(str(rows)))
+    for start in range(0, rows, chunk_rows):
+        yield generate_chunk(rng, start, min(chunk_rows, rows - start), id_width)
+
+
+def write_campaigns(path: str, rows: int, seed: int = 0) -> str:
+    """Write a synthetic table in the format given by the extension of `path`."""
+    extension = os.path.splitext(path)[1].lower()
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    if extension == ".xlsx":
+        if rows > XLSX_MAX_ROWS:
+            raise ValueError(f"xlsx holds at most {XLSX_MAX_ROWS:,} rows; use .csv or .parquet")
+        pd.concat(generate_campaigns(rows, seed), ignore_index=True).to_excel(path, index=False)
+    elif extension == ".csv":
+        for i, chunk in enumerate(generate_campaigns(rows, seed)):
+            chunk.to_csv(path, mode="w" if i == 0 else "a", header=i == 0, index=False)
+    elif extension == ".parquet":
+        if pq is None:
+            raise ImportError("Writing Parquet needs pyarrow (pip install pyarrow)")
+        writer = None
+        try:
+            for chunk in generate_campaigns(rows, seed):
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                writer = writer or pq.ParquetWriter(path, table.schema)
+                writer.write_table(table)
+        finally:
+            if writer is not None:
+                writer.close()
+    else:
+        raise ValueError(f"Unsupported format '{extension}'; use .xlsx, .csv or .parquet")
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("rows", type=int, help="number of campaigns")
+    parser.add_argument("-o", "--output", required=True, help="output file (.xlsx, .csv or .parquet)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    write_campaigns(args.output, args.rows, args.seed)
+    print(f"✅ {args.rows:,} synthetic campaigns written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+# benchmarks/video_bench.py
+"""Concurrent video renders against the local fake video API.
+
+    python -m benchmarks.video_bench
+    python -m benchmarks.video_bench --videos 50 --render-seconds 5 --drop-webhooks 0.2
+
+Submits `--videos` renders at once through one VideoRenderService with its
+webhook receiver running, and reports wall time, how each video was completed
+(webhook or fallback poll), status requests made and the peak thread count.
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_video_api import start_fake_video_api
+from database.video_jobs import READY, VideoJobStore
+from services.video_renderer import VIDEO_WEBHOOK_PATH, VideoRenderService
+
+
+async def run(args, api, store_path: str) -> dict:
+    service = VideoRenderService(
+        api_url=api.base_url, token="bench", store=VideoJobStore(store_path),
+        poll_interval=args.poll_interval, webhook_grace=args.webhook_grace, timeout=args.timeout
+    )
+    if not args.no_webhook:
+        server = service.start_webhook_receiver(port=0)
+        service.webhook_url = f"http://127.0.0.1:{server.server_address[1]}{VIDEO_WEBHOOK_PATH}"
+
+    peak_threads = threading.active_count()
+
+    async def watch_threads():
+        nonlocal peak_threads
+        while True:
+            peak_threads = max(peak_threads, threading.active_count())
+            await asyncio.sleep(0.05)
+
+    watcher = asyncio.create_task(watch_threads())
+    start = time.perf_counter()
+    jobs = await service.render_many([f"Campaign video {i}" for i in range(args.videos)])
+    wall = time.perf_counter() - start
+    watcher.cancel()
+    await service.close()
+    return {
+        "wall": wall,
+        "ready": sum(job.status == READY for job in jobs),
+        "failed": sum(job.status != READY for job in jobs),
+        "by_webhook": sum(job.completed_by == "webhook" for job in jobs),
+        "by_poll": sum(job.completed_by == "poll" for job in jobs),
+        "polls": sum(job.polls for job in jobs),
+        "peak_threads": peak_threads,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--videos", type=int, default=30)
+    parser.add_argument("--render-seconds", type=float, default=3.0)
+    parser.add_argument("--jitter", type=float, default=1.0)
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    parser.add_argument("--drop-webhooks", type=float, default=0.1, help="share of callbacks the fake API skips")
+    parser.add_argument("--no-webhook", action="store_true", help="poll only")
+    parser.add_argument("--poll-interval", type=float, default=1.0)
+    parser.add_argument("--webhook-grace", type=float, default=5.0)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    args = parser.parse_args()
+
+    api = start_fake_video_api(render_seconds=args.render_seconds, jitter=args.jitter, fail_rate=args.fail_rate,
+                               drop_webhooks=args.drop_webhooks)
+    with tempfile.TemporaryDirectory() as directory:
+        result = asyncio.run(run(args, api, os.path.join(directory, "video_jobs.sqlite3")))
+    api.shutdown()
+    print(f"\n🎬 {args.videos} videos, {args.render_seconds:.1f}s ± {args.jitter:.1f}s render: "
+          f"{result['wall']:.2f}s wall")
+    print(f"   ready {result['ready']}, failed {result['failed']}; "
+          f"completed by webhook {result['by_webhook']}, by poll {result['by_poll']}")
+    print(f"   {result['polls']} status polls, {api.counts['webhooks_sent']} webhooks sent, "
+          f"peak {result['peak_threads']} threads")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+# core/events.py
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class EventBus:
+    """Append-only event log for one pipeline run; readers block until something new is published."""
+
+    def __init__(self):
+        self._events: List[Dict[str, Any]] = []
+        self._condition = threading.Condition()
+        self.closed = False
+
+    def publish(self, event: Dict[str, Any]):
+        with self._condition:
+            self._events.append(event)
+            self._condition.notify_all()
+
+    def close(self):
+        """Mark the run finished and wake every waiting reader."""
+        with self._condition:
+            self.closed = True
+            self._condition.notify_all()
+
+    def wait(self, cursor: int, timeout: Optional[float] = None) -> Tuple[List[Dict[str, Any]], int]:
+        """Events published after `cursor` and the new cursor; blocks until there are some,
+        the bus is closed or `timeout` seconds pass."""
+        with self._condition:
+            self._condition.wait_for(lambda: len(self._events) > cursor or self.closed, timeout)
+            return self._events[cursor:], len(self._events)
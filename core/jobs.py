@@ -0,0 +1,147 @@
+# core/jobs.py
+import os
+import time
+import uuid
+import asyncio
+import threading
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from core.events import EventBus
+
+# Pipelines allowed to run at once; the rest wait in the queue
+JOB_CONCURRENCY = int(os.getenv("CAMPAIGN_JOB_CONCURRENCY", "4"))
+# Queued plus running jobs before new submissions are refused
+JOB_QUEUE_SIZE = int(os.getenv("CAMPAIGN_JOB_QUEUE_SIZE", "32"))
+# A job whose page stops checking in for this many seconds is cancelled; 0 disables
+JOB_HEARTBEAT_TIMEOUT = float(os.getenv("CAMPAIGN_JOB_HEARTBEAT_TIMEOUT", "60"))
+# How long finished jobs (and their results) are kept
+JOB_RESULT_TTL = float(os.getenv("CAMPAIGN_JOB_RESULT_TTL", "3600"))
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = "queued", "running", "done", "failed", "cancelled"
+
+
+class JobQueueFull(RuntimeError):
+    """Raised when the job queue has no room for another submission."""
+
+
+@dataclass
+class Job:
+    id: str
+    name: str
+    status: str = QUEUED
+    bus: EventBus = field(default_factory=EventBus)
+    result: Any = None
+    error: Optional[str] = None
+    created: float = field(default_factory=time.time)
+    finished: Optional[float] = None
+    last_seen: float = field(default_factory=time.monotonic)
+    future: Optional[Future] = None
+
+    @property
+    def active(self) -> bool:
+        return self.status in (QUEUED, RUNNING)
+
+
+class JobRunner:
+    """Runs async jobs on one long-lived event loop thread with bounded concurrency."""
+
+    def __init__(self, concurrency: int = JOB_CONCURRENCY, queue_size: int = JOB_QUEUE_SIZE):
+        self.concurrency = concurrency
+        self.queue_size = queue_size
+        self.jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run_loop, name="campaign-jobs", daemon=True)
+        self._thread.start()
+        self._slots = self.run_sync(self._make_semaphore())
+        asyncio.run_coroutine_threadsafe(self._reap_forever(), self.loop)
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    async def _make_semaphore(self) -> asyncio.Semaphore:
+        return asyncio.Semaphore(self.concurrency)
+
+    def submit(self, name: str, func: Callable[[Job], Awaitable[Any]]) -> Job:
+        """Queue `func(job)` and return the job; its events are published on `job.bus`."""
+        with self._lock:
+            pending = sum(1 for job in self.jobs.values() if job.active)
+            if pending >= self.queue_size:
+                raise JobQueueFull(f"{pending} jobs are already queued or running; try again shortly")
+            job = Job(id=uuid.uuid4().hex[:12], name=name)
+            self.jobs[job.id] = job
+        job.future = asyncio.run_coroutine_threadsafe(self._run_job(job, func), self.loop)
+        print(f"📥 Job {job.id} ({name}) queued")
+        return job
+
+    async def _run_job(self, job: Job, func: Callable[[Job], Awaitable[Any]]):
+        try:
+            async with self._slots:
+                job.status = RUNNING
+                job.result = await func(job)
+                job.status = DONE
+                job.bus.publish({"result": job.id})
+        except asyncio.CancelledError:
+            job.status = CANCELLED
+            job.error = "Job was cancelled"
+            job.bus.publish({"error": job.error})
+        except Exception as e:
+            job.status = FAILED
+            job.error = str(e)
+            job.bus.publish({"error": job.error})
+        finally:
+            job.finished = time.time()
+            job.bus.publish({"done": True})
+            job.bus.close()
+            print(f"📤 Job {job.id} ({job.name}) {job.status}")
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self.jobs.get(job_id)
+
+    def heartbeat(self, job_id: str):
+        """Record that a page is still following the job."""
+        job = self.jobs.get(job_id)
+        if job:
+            job.last_seen = time.monotonic()
+
+    def cancel(self, job_id: str) -> bool:
+        job = self.jobs.get(job_id)
+        if not job or not job.active or job.future is None:
+            return False
+        return job.future.cancel()
+
+    def run_sync(self, coro: Awaitable[Any], timeout: Optional[float] = None) -> Any:
+        """Run a coroutine on the runner's loop and wait for its result from a regular thread."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result(timeout)
+
+    async def _reap_forever(self, interval: float = 5.0):
+        while True:
+            await asyncio.sleep(interval)
+            self.reap()
+
+    def reap(self):
+        """Cancel jobs nobody is following any more and forget expired results."""
+        now = time.monotonic()
+        with self._lock:
+            for job in list(self.jobs.values()):
+                if job.active and job.future and JOB_HEARTBEAT_TIMEOUT and now - job.last_seen > JOB_HEARTBEAT_TIMEOUT:
+                    print(f"🛑 Job {job.id} abandoned, cancelling")
+                    job.future.cancel()
+                elif job.finished and time.time() - job.finished > JOB_RESULT_TTL:
+                    del self.jobs[job.id]
+
+
+_RUNNER: Optional[JobRunner] = None
+_RUNNER_LOCK = threading.Lock()
+
+
+def get_job_runner() -> JobRunner:
+    """Process-wide job runner, started on first use."""
+    global _RUNNER
+    with _RUNNER_LOCK:
+        if _RUNNER is None:
+            _RUNNER = JobRunner()
+        return _RUNNER
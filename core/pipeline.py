@@ -245,26 +245,153 @@
 #         }
 
 
-from services.openai_config import create_azure_openai_model
+from services.openai_config import create_azure_openai_model, start_model_warmup
+from services.agent_runner import run_agent
+from services.telemetry import span
 from database.db_manager import DatabaseManager
 from agents.analyst_agent import AnalystAgent
 from agents.strategy_agent import StrategyAgent
 from agents.creative_agent import CreativeAgent
 from agents.orchestrator_agent import OrchestratorAgent
 from models.response_models import CampaignBrief
+from core.task_graph import TaskGraph
+from core.jobs import get_job_runner
+from core.section_classifier import SECTIONS, classify_sections
 import json
 import streamlit as st
 import asyncio
 import os
-from typing import Callable, Optional
+from typing import Any, Callable, Dict, Optional
+from pydantic_ai import Agent
+
+# Status messages for each pipeline step: (on start, on completion)
+STEP_MESSAGES = {
+    "campaign_data": ("🗄️ Loading historical campaign data...", "✅ Campaign data loaded"),
+    "analysis_result": ("📊 Step 1: AnalystAgent - Analyzing Historical Campaign Data...", "✅ AnalystAgent: Analysis completed!"),
+    "strategy_result": ("🎯 Step 2: StrategyAgent - Developing Data-Driven Strategy...", "✅ StrategyAgent: Data-driven strategy completed!"),
+    "creative_result": ("🎨 Step 3: CreativeAgent - Creating Performance-Optimized Creative...", "✅ CreativeAgent: Performance-optimized creative completed!"),
+    "final_campaign": ("🎬 Step 4: OrchestratorAgent - Finalizing Data-Enhanced Campaign Brief...", "✅ OrchestratorAgent: Campaign brief finalized!"),
+}
+
+# Streaming mode: receives (step name, partially validated fields) as agent output arrives
+PartialStepCallback = Callable[[str, Dict[str, Any]], None]
 
 class EnhancedMarketingCampaignPipeline:
-    def __init__(self, model, db_manager: DatabaseManager):
+    def __init__(self, model, db_manager: DatabaseManager, cache_ttl: float = None):
+        """`cache_ttl` overrides every agent's LLM cache TTL; 0 always calls the model."""
+        self.model = model
         self.db_manager = db_manager
-        self.analyst_agent = AnalystAgent(model, db_manager)
-        self.strategy_agent = StrategyAgent(model)
-        self.creative_agent = CreativeAgent(model)
-        self.orchestrator_agent = OrchestratorAgent(model)
+        self.analyst_agent = AnalystAgent(model, db_manager, cache_ttl=cache_ttl)
+        self.strategy_agent = StrategyAgent(model, cache_ttl=cache_ttl)
+        self.creative_agent = CreativeAgent(model, cache_ttl=cache_ttl)
+        self.orchestrator_agent = OrchestratorAgent(model, cache_ttl=cache_ttl)
+
+    def build_campaign_graph(
+        self,
+        campaign_objective: str,
+        target_industry: str = None,
+        campaign_budget: str = None,
+        campaign_timing: str = None,
+        campaign_destination_url: str = None,
+        media_objective: str = None,
+        media_target: str = None,
+        partial_callback: Optional[PartialStepCallback] = None
+    ) -> TaskGraph:
+        """Express the pipeline as a dependency graph so independent steps overlap.
+
+        Campaign data loads first and the agent steps then follow their data
+        dependencies. With `partial_callback` the agent outputs are streamed and
+        reported per step as fields arrive.
+        """
+        def stream_to(step: str):
+            if partial_callback is None:
+                return None
+            return lambda fields: partial_callback(step, fields)
+
+        brief_details = dict(
+            campaign_budget=campaign_budget,
+            campaign_timing=campaign_timing,
+            campaign_destination_url=campaign_destination_url,
+            media_objective=media_objective,
+            media_target=media_target
+        )
+        graph = TaskGraph()
+        graph.add("campaign_data", lambda r: self.analyst_agent.load_campaign_data(target_industry))
+        graph.add(
+            "analysis_result",
+            lambda r: self.analyst_agent.analyze_campaign_patterns(
+                campaign_objective, target_industry, campaign_data=r["campaign_data"],
+                on_partial=stream_to("analysis_result")
+            ),
+            deps=("campaign_data",)
+        )
+        graph.add(
+            "strategy_result",
+            lambda r: self.strategy_agent.develop_strategy(
+                campaign_objective, target_industry, r["analysis_result"], **brief_details,
+                on_partial=stream_to("strategy_result")
+            ),
+            deps=("analysis_result",)
+        )
+        graph.add(
+            "creative_result",
+            lambda r: self.creative_agent.develop_creative(
+                campaign_objective, target_industry, r["strategy_result"], r["analysis_result"], **brief_details,
+                on_partial=stream_to("creative_result")
+            ),
+            deps=("strategy_result", "analysis_result")
+        )
+        graph.add(
+            "final_campaign",
+            lambda r: self.orchestrator_agent.finalize_campaign_brief(
+                campaign_objective, target_industry, r["analysis_result"], r["strategy_result"],
+                r["creative_result"], **brief_details, on_partial=stream_to("final_campaign")
+            ),
+            deps=("analysis_result", "strategy_result", "creative_result")
+        )
+        return graph
+
+    async def run_campaign_graph(
+        self,
+        campaign_objective: str,
+        target_industry: str = None,
+        status_callback: Optional[Callable[[str], None]] = None,
+        partial_callback: Optional[PartialStepCallback] = None,
+        **campaign_details
+    ) -> Dict[str, Any]:
+        """Run every pipeline step; returns each step's output plus per-step `timings`."""
+
+        def update_status(message: str):
+            if status_callback:
+                status_callback(message)
+            print(message)
+
+        def on_start(step: str):
+            message = STEP_MESSAGES.get(step, (None, None))[0]
+            if message:
+                update_status(message)
+
+        def on_done(step: str, duration: float):
+            message = STEP_MESSAGES.get(step, (None, None))[1]
+            if message:
+                update_status(f"{message} ({duration:.1f}s)")
+
+        # Opens the model connection while campaign data loads, on this loop's first run only
+        start_model_warmup(self.model)
+        graph = self.build_campaign_graph(
+            campaign_objective, target_industry, partial_callback=partial_callback, **campaign_details
+        )
+        try:
+            with span("pipeline.run", industry=target_industry, streamed=partial_callback is not None):
+                results = await graph.run(on_start=on_start, on_done=on_done)
+        except Exception as e:
+            update_status(f"❌ Pipeline execution failed: {str(e)}")
+            raise
+        results["timings"] = graph.timings
+        print("⏱️ Step timings: " + ", ".join(
+            f"{step} {timing['duration']:.2f}s" for step, timing in graph.timings.items()
+        ))
+        return results
 
     async def run_enhanced_campaign(
         self, 
@@ -277,62 +404,106 @@ class EnhancedMarketingCampaignPipeline:
         media_objective: str = None, 
         media_target: str = None
     ) -> CampaignBrief:
-
+        results = await self.run_campaign_graph(
+            campaign_objective,
+            target_industry,
+            status_callback=status_callback,
+            campaign_budget=campaign_budget,
+            campaign_timing=campaign_timing,
+            campaign_destination_url=campaign_destination_url,
+            media_objective=media_objective,
+            media_target=media_target
+        )
+        return results["final_campaign"]
+
+    async def revise_campaign(
+        self,
+        results: Dict[str, Any],
+        feedback: str,
+        sections_to_update: Dict[str, bool],
+        campaign_details: Dict[str, Any],
+        status_callback: Optional[Callable[[str], None]] = None
+    ) -> Dict[str, Any]:
+        """Re-run only the flagged agents and regenerate only their brief fields.
+
+        Outputs of agents that were not flagged are reused as they are; a re-run
+        agent gets the latest outputs of the agents before it.
+        """
         def update_status(message: str):
             if status_callback:
                 status_callback(message)
             print(message)
 
-        try:
-            update_status("📊 Step 1: AnalystAgent - Analyzing Historical Campaign Data...")    
-            analysis_result = await self.analyst_agent.analyze_campaign_patterns(
-                campaign_objective, target_industry
-            )
-            update_status("✅ AnalystAgent: Analysis completed!")
-
-            update_status("🎯 Step 2: StrategyAgent - Developing Data-Driven Strategy...")
-            strategy_result = await self.strategy_agent.develop_strategy(
-                campaign_objective, target_industry, analysis_result,
-                campaign_budget=campaign_budget,
-                campaign_timing=campaign_timing,
-                campaign_destination_url=campaign_destination_url,
-                media_objective=media_objective,
-                media_target=media_target
+        results = dict(results)
+        regenerated = set()
+        campaign_objective = campaign_details.get("campaign_objective")
+        target_industry = campaign_details.get("target_industry")
+        brief_details = {
+            key: campaign_details.get(key)
+            for key in ("campaign_budget", "campaign_timing", "campaign_destination_url", "media_objective", "media_target")
+        }
+
+        if sections_to_update.get("analyst") and results.get("analysis_result") is not None:
+            update_status("📊 Revising analysis...")
+            results["analysis_result"] = await self.analyst_agent.analyze_campaign_patterns(
+                campaign_objective, target_industry, revision_feedback=feedback
             )
-            update_status("✅ StrategyAgent: Data-driven strategy completed!")
-
-            update_status("🎨 Step 3: CreativeAgent - Creating Performance-Optimized Creative...")
-            creative_result = await self.creative_agent.develop_creative(
-                campaign_objective, target_industry, strategy_result, analysis_result,
-                campaign_budget=campaign_budget,
-                campaign_timing=campaign_timing,
-                campaign_destination_url=campaign_destination_url,
-                media_objective=media_objective,
-                media_target=media_target
+            regenerated.add("analyst")
+        if sections_to_update.get("strategy") and results.get("analysis_result") is not None:
+            update_status("🎯 Revising strategy...")
+            results["strategy_result"] = await self.strategy_agent.develop_strategy(
+                campaign_objective, target_industry, results["analysis_result"], **brief_details,
+                revision_feedback=feedback
             )
-            update_status("✅ CreativeAgent: Performance-optimized creative completed!")
-
-            update_status("🎬 Step 4: OrchestratorAgent - Finalizing Data-Enhanced Campaign Brief...")
-            final_result = await self.orchestrator_agent.finalize_campaign_brief(
-                campaign_objective, target_industry, analysis_result, strategy_result, creative_result,
-                campaign_budget=campaign_budget,
-                campaign_timing=campaign_timing,
-                campaign_destination_url=campaign_destination_url,
-                media_objective=media_objective,
-                media_target=media_target
+            regenerated.add("strategy")
+        if sections_to_update.get("creative") and results.get("strategy_result") is not None:
+            update_status("🎨 Revising creative...")
+            results["creative_result"] = await self.creative_agent.develop_creative(
+                campaign_objective, target_industry, results["strategy_result"], results["analysis_result"],
+                **brief_details, revision_feedback=feedback
             )
-            update_status("✅ OrchestratorAgent: Campaign brief finalized!")
-
-            return final_result
+            regenerated.add("creative")
+
+        update_status("🎬 Updating the affected brief sections...")
+        results["final_campaign"] = await self.orchestrator_agent.handle_revision(
+            current_brief=results["final_campaign"],
+            feedback=feedback,
+            sections_to_update=sections_to_update,
+            analysis_result=results.get("analysis_result"),
+            strategy_result=results.get("strategy_result"),
+            creative_result=results.get("creative_result"),
+            regenerated=regenerated
+        )
+        return results
 
-        except Exception as e:
-            update_status(f"❌ Pipeline execution failed: {str(e)}")
-            raise
+async def revise_campaign_from_ui(
+    results: Dict[str, Any],
+    feedback: str,
+    sections_to_update: Dict[str, bool],
+    campaign_details: Dict[str, Any],
+    status_callback: Optional[Callable[[str], None]] = None
+) -> Dict[str, Any]:
+    azure_model = create_azure_openai_model()
+    if not azure_model:
+        raise Exception("Azure OpenAI model not initialized")
+    excel_path = os.path.join(os.path.dirname(__file__), "..", "campaigns.xlsx")
+    db_manager = DatabaseManager(excel_path)
+    try:
+        pipeline = EnhancedMarketingCampaignPipeline(azure_model, db_manager)
+        with span("pipeline.revise", sections=",".join(s for s, flag in sections_to_update.items() if flag)):
+            return await pipeline.revise_campaign(
+                results, feedback, sections_to_update, campaign_details or {}, status_callback=status_callback
+            )
+    finally:
+        await db_manager.close()
 
 async def run_pipeline_from_ui(
     campaign_details: dict, 
-    status_callback: Optional[Callable[[str], None]] = None
-) -> CampaignBrief:
+    status_callback: Optional[Callable[[str], None]] = None,
+    partial_callback: Optional[PartialStepCallback] = None,
+    cache_ttl: Optional[float] = None
+) -> Dict[str, Any]:
+    """Run the full pipeline for the UI; `cache_ttl=0` regenerates every step instead of using the LLM cache."""
     def update_status(message: str):
         if status_callback:
             status_callback(message)
@@ -368,11 +539,12 @@ async def run_pipeline_from_ui(
         # No-op for Excel
 
         update_status("🎉 Starting enhanced campaign generation...")
-        pipeline = EnhancedMarketingCampaignPipeline(azure_model, db_manager)
-        final_campaign = await pipeline.run_enhanced_campaign(
+        pipeline = EnhancedMarketingCampaignPipeline(azure_model, db_manager, cache_ttl=cache_ttl)
+        results = await pipeline.run_campaign_graph(
             campaign_objective, 
             target_industry, 
             status_callback=status_callback,
+            partial_callback=partial_callback,
             campaign_budget=campaign_budget,
             campaign_timing=campaign_timing,
             campaign_destination_url=campaign_destination_url,
@@ -380,7 +552,8 @@ async def run_pipeline_from_ui(
             media_target=media_target
         )
         update_status("✅ Campaign pipeline execution complete!")
-        return final_campaign
+        # The UI keeps the intermediate outputs for revisions alongside the final brief
+        return results
 
     except Exception as e:
         error_msg = f"Pipeline execution failed: {str(e)}"
@@ -393,65 +566,64 @@ async def run_pipeline_from_ui(
             update_status("✅ Database connection closed.")
 
 # --- Helper: Use Azure OpenAI to detect which sections to update ---
-async def detect_sections_to_update_async(feedback, campaign_brief):
+SECTION_DETECTION_PROMPT = (
+    "You are an assistant that helps identify which sections of a marketing campaign brief need updates. "
+    "Sections and their triggers:\n"
+    "- 'analyst': market data, research, competitor analysis, insights\n"
+    "- 'strategy': targeting, positioning, channels, budget allocation\n"
+    "- 'creative': taglines, visuals, ad copy, brand voice, slogans\n"
+    "- 'campaign': timelines, objectives, URLs, media planning\n"
+    "Respond ONLY with JSON: {\"analyst\": bool, \"strategy\": bool, \"creative\": bool, \"campaign\": bool}"
+)
+
+# "hybrid" asks the LLM only when the local classifier is unsure; "local" or "llm" force one path
+SECTION_CLASSIFIER_MODE = os.getenv("CAMPAIGN_SECTION_CLASSIFIER", "hybrid")
+
+_SECTION_AGENT: Optional[Agent] = None
+
+def section_detection_agent(model) -> Agent:
+    """One detection agent for the shared model, instead of a new Agent per feedback."""
+    global _SECTION_AGENT
+    if _SECTION_AGENT is None or _SECTION_AGENT.model is not model:
+        _SECTION_AGENT = Agent(model=model, output_type=str, system_prompt=SECTION_DETECTION_PROMPT)
+    return _SECTION_AGENT
+
+async def detect_sections_with_llm(feedback, campaign_brief) -> Dict[str, bool]:
+    azure_model = create_azure_openai_model()
+    if not azure_model:
+        raise Exception("Azure OpenAI model creation failed. Check your configuration.")
+    user_prompt = (
+        f"User feedback: \"{feedback}\"\n"
+        f"Current campaign brief summary: {str(campaign_brief)[:500]}...\n"
+        "Analyze the feedback and return which sections need updates as a JSON object."
+    )
+    output = await run_agent(
+        section_detection_agent(azure_model), user_prompt, name="section_detection",
+        system_prompt=SECTION_DETECTION_PROMPT
+    )
     try:
-        azure_model = create_azure_openai_model()
-        from pydantic_ai import Agent
-        system_prompt = (
-            "You are an assistant that helps identify which sections of a marketing campaign brief need updates. "
-            "Sections and their triggers:\n"
-            "- 'analyst': market data, research, competitor analysis, insights\n"
-            "- 'strategy': targeting, positioning, channels, budget allocation\n"
-            "- 'creative': taglines, visuals, ad copy, brand voice, slogans\n"
-            "- 'campaign': timelines, objectives, URLs, media planning\n"
-            "Respond ONLY with JSON: {\"analyst\": bool, \"strategy\": bool, \"creative\": bool, \"campaign\": bool}"
-        )
-        user_prompt = (
-            f"User feedback: \"{feedback}\"\n"
-            f"Current campaign brief summary: {str(campaign_brief)[:500]}...\n"
-            "Analyze the feedback and return which sections need updates as a JSON object."
-        )
-        agent = Agent(
-            model=azure_model,
-            output_type=str,
-            system_prompt=system_prompt
-        )
-        result = await agent.run(user_prompt)
-        try:
-            parsed_result = json.loads(result.output)
-        except (json.JSONDecodeError, AttributeError):
-            import re
-            json_match = re.search(r'\{[^}]+\}', str(result.output))
-            if json_match:
-                parsed_result = json.loads(json_match.group())
-            else:
-                raise ValueError("Could not parse JSON from response")
-        section_flags = {
-            'analyst': bool(parsed_result.get('analyst', False)),
-            'strategy': bool(parsed_result.get('strategy', False)),
-            'creative': bool(parsed_result.get('creative', False)),
-            'campaign': bool(parsed_result.get('campaign', False))
-        }
-        return section_flags
-    except Exception as e:
-        st.error(f"Error in section detection: {str(e)}")
-        feedback_lower = feedback.lower()
-        return {
-            'analyst': any(word in feedback_lower for word in ['data', 'analysis', 'insight', 'research', 'competitor']),
-            'strategy': any(word in feedback_lower for word in ['strategy', 'target', 'position', 'channel', 'budget']),
-            'creative': any(word in feedback_lower for word in ['creative', 'tagline', 'visual', 'copy', 'slogan', 'brand', 'message']),
-            'campaign': any(word in feedback_lower for word in ['timeline', 'schedule', 'url', 'landing page', 'media plan'])
-        }
+        parsed_result = json.loads(output)
+    except (json.JSONDecodeError, AttributeError):
+        import re
+        json_match = re.search(r'\{[^}]+\}', str(output))
+        if json_match:
+            parsed_result = json.loads(json_match.group())
+        else:
+            raise ValueError("Could not parse JSON from response")
+    return {section: bool(parsed_result.get(section, False)) for section in SECTIONS}
+
+async def detect_sections_to_update_async(feedback, campaign_brief):
+    """Sections the feedback asks to change; LLM errors propagate for the caller to report."""
+    prediction = classify_sections(feedback)
+    if SECTION_CLASSIFIER_MODE == "local" or (SECTION_CLASSIFIER_MODE == "hybrid" and prediction.confident):
+        print(f"⚡ Sections detected locally: {prediction.flags}")
+        return prediction.flags
+    return await detect_sections_with_llm(feedback, campaign_brief)
 
 def detect_sections_to_update(feedback, campaign_brief):
+    """Streamlit entry point: shows detection errors on the page and falls back to the local classifier."""
     try:
-        return asyncio.run(detect_sections_to_update_async(feedback, campaign_brief))
+        return get_job_runner().run_sync(detect_sections_to_update_async(feedback, campaign_brief))
     except Exception as e:
-        st.error(f"Error in section detection wrapper: {str(e)}")
-        feedback_lower = feedback.lower()
-        return {
-            'analyst': any(word in feedback_lower for word in ['data', 'analysis', 'insight', 'research', 'competitor']),
-            'strategy': any(word in feedback_lower for word in ['strategy', 'target', 'position', 'approach']),
-            'creative': any(word in feedback_lower for word in ['creative', 'message', 'brand', 'voice', 'visual', 'content', 'copy']),
-            'campaign': any(word in feedback_lower for word in ['budget', 'timing', 'objective', 'goal'])
-        }
\ No newline at end of file
+        st.error(f"Error in section detection: {str(e)}")
+        return classify_sections(feedback).flags
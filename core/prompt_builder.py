@@ -0,0 +1,137 @@
+# core/prompt_builder.py
+import os
+import re
+import inspect
+from dataclasses import dataclass
+from typing import Any, Iterable, List, Optional
+
+from pydantic import BaseModel
+
+from services.telemetry import span
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+# Input token budget per agent prompt (system prompt excluded); PROMPT_BUDGET_<NAME> overrides
+DEFAULT_PROMPT_BUDGETS = {
+    "analyst": 3000,
+    "strategy": 1800,
+    "creative": 1800,
+    "orchestrator": 2400,
+    "revision": 1500,
+}
+# Sections at or above this priority are never truncated
+REQUIRED = 100
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_ENCODING = None
+
+
+def estimate_tokens(text: str) -> int:
+    """Token count with tiktoken when installed, otherwise ~4 characters per token."""
+    global _ENCODING
+    if tiktoken is not None:
+        if _ENCODING is None:
+            _ENCODING = tiktoken.get_encoding("cl100k_base")
+        return len(_ENCODING.encode(text))
+    return (len(text) + 3) // 4
+
+
+def prompt_budget(name: str) -> int:
+    value = os.getenv(f"PROMPT_BUDGET_{name.upper()}")
+    return int(value) if value else DEFAULT_PROMPT_BUDGETS.get(name, 2000)
+
+
+def compact(value: Any, max_items: Optional[int] = None) -> str:
+    """Canonical one-line rendering: collapsed strings, '; '-joined lists, 'key: value' dicts."""
+    if isinstance(value, BaseModel):
+        value = value.model_dump(exclude_none=True)
+    if isinstance(value, dict):
+        items = list(value.items())[:max_items]
+        return "; ".join(f"{key}: {compact(item)}" for key, item in items)
+    if isinstance(value, (list, tuple)):
+        items = list(value)[:max_items]
+        return "; ".join(compact(item) for item in items)
+    if isinstance(value, float):
+        return f"{value:.4g}"
+    return _WHITESPACE_RE.sub(" ", str(value)).strip()
+
+
+def render_model(model: BaseModel, fields: Optional[Iterable[str]] = None, max_items: Optional[int] = None) -> str:
+    """One '- Field Name: value' line per non-empty field of a pydantic model."""
+    names = list(fields) if fields is not None else list(type(model).model_fields)
+    lines = []
+    for name in names:
+        value = getattr(model, name, None)
+        if value in (None, "", [], {}):
+            continue
+        lines.append(f"- {name.replace('_', ' ').title()}: {compact(value, max_items)}")
+    return "\n".join(lines)
+
+
+def render_details(**details: Any) -> str:
+    """'- Label: value' lines for the campaign inputs that were actually given."""
+    return "\n".join(
+        f"- {label.replace('_', ' ').title()}: {compact(value)}"
+        for label, value in details.items()
+        if value not in (None, "")
+    )
+
+
+@dataclass
+class PromptSection:
+    title: Optional[str]
+    body: str
+    priority: int
+
+
+class PromptBuilder:
+    """Assembles prompt sections in order, truncating the least important ones to fit a token budget."""
+
+    def __init__(self, name: str, budget: Optional[int] = None):
+        self.name = name
+        self.budget = budget if budget is not None else prompt_budget(name)
+        self.sections: List[PromptSection] = []
+
+    def add(self, body: str, title: Optional[str] = None, priority: int = REQUIRED) -> "PromptBuilder":
+        if body and body.strip():
+            self.sections.append(PromptSection(title, inspect.cleandoc(body), priority))
+        return self
+
+    def add_model(self, title: str, model: Optional[BaseModel], priority: int, fields: Optional[Iterable[str]] = None,
+                  max_items: Optional[int] = None) -> "PromptBuilder":
+        if model is not None:
+            self.add(render_model(model, fields, max_items), title, priority)
+        return self
+
+    @staticmethod
+    def _render(section: PromptSection) -> str:
+        return f"{section.title}:\n{section.body}" if section.title else section.body
+
+    def build(self) -> str:
+        with span("prompt.build", prompt=self.name, budget=self.budget) as current:
+            prompt = self._build()
+            current.set("prompt_estimated_tokens", estimate_tokens(prompt))
+            return prompt
+
+    def _build(self) -> str:
+        sections = [PromptSection(s.title, s.body, s.priority) for s in self.sections]
+        total = sum(estimate_tokens(self._render(s)) for s in sections)
+        # Trim whole lines from the lowest-priority sections (latest first) until the prompt fits
+        order = sorted(range(len(sections)), key=lambda i: (sections[i].priority, -i))
+        for section in (sections[i] for i in order):
+            if total <= self.budget or section.priority >= REQUIRED:
+                break
+            lines = section.body.split("\n")
+            while lines and total > self.budget:
+                removed = lines.pop()
+                total -= estimate_tokens(removed) + 1
+            section.body = "\n".join(lines)
+            if not lines:
+                total -= estimate_tokens(section.title or "")
+        prompt = "\n\n".join(self._render(s) for s in sections if s.body)
+        if total > self.budget:
+            print(f"⚠️ {self.name} prompt is ~{estimate_tokens(prompt)} tokens, over its {self.budget} budget")
+        return prompt
@@ -0,0 +1,117 @@
+# core/section_classifier.py
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, Tuple
+
+SECTIONS = ("analyst", "strategy", "creative", "campaign")
+
+# Keyword weights per section: 1.0 terms flag a section on their own, weaker terms need support.
+# Keys may be phrases; both keys and feedback are stemmed the same way before matching.
+SECTION_KEYWORDS: Dict[str, Dict[str, float]] = {
+    "analyst": {
+        "data": 1.0, "analysis": 1.0, "analyze": 1.0, "analyse": 1.0, "analyst": 1.0, "insight": 1.0,
+        "research": 1.0, "competitor": 1.0, "competition": 1.0, "competitive": 1.0, "benchmark": 1.0,
+        "historical": 1.0, "statistic": 1.0, "evidence": 1.0, "finding": 1.0, "roas": 1.0, "ctr": 1.0,
+        "market size": 1.0, "market trend": 1.0, "numbers": 0.5, "trend": 0.5, "market": 0.5, "performance": 0.5,
+    },
+    "strategy": {
+        "strategy": 1.0, "strategic": 1.0, "target": 1.0, "targeting": 1.0, "audience": 1.0, "segment": 1.0,
+        "demographic": 1.0, "persona": 1.0, "position": 1.0, "positioning": 1.0, "reposition": 1.0,
+        "channel": 1.0, "budget": 1.0, "allocation": 1.0, "spend": 1.0, "kpi": 1.0, "kpis": 1.0, "metric": 1.0,
+        "tactic": 1.0, "success metric": 1.0,
+        "approach": 0.5, "reach": 0.5, "focus": 0.5, "age": 0.5,
+    },
+    "creative": {
+        "creative": 1.0, "tagline": 1.0, "slogan": 1.0, "visual": 1.0, "imagery": 1.0, "image": 1.0,
+        "copy": 1.0, "headline": 1.0, "brand voice": 1.0, "tone": 1.0, "messaging": 1.0, "cta": 1.0,
+        "call to action": 1.0, "colour": 1.0, "color": 1.0, "wording": 1.0, "catchy": 1.0, "punchy": 1.0,
+        "font": 1.0, "concept": 1.0, "aesthetic": 1.0, "playful": 1.0, "emotional": 1.0,
+        "message": 0.5, "voice": 0.5, "design": 0.5, "brand": 0.5, "fun": 0.5, "style": 0.5,
+    },
+    "campaign": {
+        "timeline": 1.0, "schedule": 1.0, "launch": 1.0, "deadline": 1.0, "url": 1.0, "landing page": 1.0,
+        "link": 1.0, "media plan": 1.0, "objective": 1.0, "goal": 1.0, "phase": 1.0, "rollout": 1.0,
+        "next step": 1.0, "implementation": 1.0, "milestone": 1.0, "q1": 1.0, "q2": 1.0, "q3": 1.0, "q4": 1.0,
+        "date": 0.5, "week": 0.5, "month": 0.5, "plan": 0.5, "timing": 0.5,
+    },
+}
+
+# Score at which a section is flagged; scores between 0 and this are ambiguous
+FLAG_THRESHOLD = 1.0
+# Words that can invert or scope a request ("keep the tagline", "don't touch the budget"); stemmed like keywords
+HEDGE_WORDS = {
+    "not", "no", "never", "dont", "don't", "doesnt", "doesn't", "keep", "leave", "except", "without",
+    "unchanged", "same", "only",
+}
+
+_TOKEN_RE = re.compile(r"[a-z0-9']+")
+
+
+def _stem(token: str) -> str:
+    """Light stemmer shared by feedback, keywords and hedge words.
+
+    Drops plural and verb endings, then a trailing "e", so "image", "images"
+    and "imaging" all become "imag", and "unchanged" stays a hedge word.
+    """
+    if len(token) > 4 and token.endswith("ies"):
+        token = token[:-3] + "y"
+    elif len(token) > 3 and token.endswith("s") and not token.endswith(("ss", "us", "is")):
+        token = token[:-1]
+    for suffix in ("ing", "ed"):
+        if len(token) > len(suffix) + 3 and token.endswith(suffix):
+            token = token[: -len(suffix)]
+            break
+    if len(token) > 3 and token.endswith("e"):
+        token = token[:-1]
+    return token
+
+
+def _tokens(text: str) -> Tuple[str, ...]:
+    return tuple(_stem(token) for token in _TOKEN_RE.findall(text.lower()))
+
+
+@lru_cache(maxsize=1)
+def _keyword_index() -> Dict[Tuple[str, ...], Tuple[Tuple[str, float], ...]]:
+    """Stemmed keyword (as a token tuple) -> ((section, weight), ...)"""
+    index: Dict[Tuple[str, ...], Dict[str, float]] = {}
+    for section, keywords in SECTION_KEYWORDS.items():
+        for keyword, weight in keywords.items():
+            # Keywords of one section that share a stem ("message", "messaging") count once
+            weights = index.setdefault(_tokens(keyword), {})
+            weights[section] = max(weight, weights.get(section, 0.0))
+    return {key: tuple(weights.items()) for key, weights in index.items()}
+
+
+@lru_cache(maxsize=1)
+def _hedge_stems() -> frozenset:
+    return frozenset(_stem(word) for word in HEDGE_WORDS)
+
+
+@dataclass
+class SectionPrediction:
+    flags: Dict[str, bool]
+    scores: Dict[str, float] = field(default_factory=dict)
+    confident: bool = False
+
+
+def classify_sections(feedback: str) -> SectionPrediction:
+    """Deterministic keyword scoring of revision feedback into brief sections.
+
+    Not confident when nothing matched, when a section only partly matched or
+    when the feedback contains hedging words that keywords cannot interpret.
+    """
+    tokens = _tokens(feedback)
+    index = _keyword_index()
+    scores = dict.fromkeys(SECTIONS, 0.0)
+    longest = max(len(key) for key in index)
+    for start in range(len(tokens)):
+        for length in range(1, min(longest, len(tokens) - start) + 1):
+            for section, weight in index.get(tokens[start:start + length], ()):
+                scores[section] += weight
+
+    flags = {section: scores[section] >= FLAG_THRESHOLD for section in SECTIONS}
+    ambiguous = any(0 < score < FLAG_THRESHOLD for score in scores.values())
+    hedged = any(token in _hedge_stems() for token in tokens)
+    confident = any(flags.values()) and not ambiguous and not hedged
+    return SectionPrediction(flags=flags, scores=scores, confident=confident)
@@ -0,0 +1,77 @@
+# core/task_graph.py
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from services.telemetry import span
+
+
+@dataclass
+class TaskNode:
+    name: str
+    func: Callable[[Dict[str, Any]], Awaitable[Any]]  # receives the results of finished nodes
+    deps: Tuple[str, ...] = ()
+    optional: bool = False  # a failing optional node yields None instead of failing the graph
+
+
+class TaskGraph:
+    """Dependency graph of async steps, each started as soon as its dependencies finish."""
+
+    def __init__(self):
+        self.nodes: Dict[str, TaskNode] = {}
+        # name -> {"started", "finished", "duration"} in seconds relative to the graph start
+        self.timings: Dict[str, Dict[str, float]] = {}
+
+    def add(self, name: str, func: Callable[[Dict[str, Any]], Awaitable[Any]], deps=(), optional: bool = False):
+        # Dependencies must be added first, which also rules out cycles
+        missing = [d for d in deps if d not in self.nodes]
+        if missing:
+            raise ValueError(f"Node '{name}' depends on unknown node(s): {', '.join(missing)}")
+        if name in self.nodes:
+            raise ValueError(f"Duplicate node '{name}'")
+        self.nodes[name] = TaskNode(name, func, tuple(deps), optional)
+        return self
+
+    async def run(
+        self,
+        on_start: Optional[Callable[[str], None]] = None,
+        on_done: Optional[Callable[[str, float], None]] = None
+    ) -> Dict[str, Any]:
+        results: Dict[str, Any] = {}
+        tasks: Dict[str, asyncio.Task] = {}
+        graph_start = time.perf_counter()
+
+        async def run_node(node: TaskNode):
+            if node.deps:
+                await asyncio.gather(*(tasks[d] for d in node.deps))
+            if on_start:
+                on_start(node.name)
+            started = time.perf_counter()
+            try:
+                with span(f"step.{node.name}"):
+                    results[node.name] = await node.func(results)
+            except Exception as e:
+                if not node.optional:
+                    raise
+                print(f"⚠️ Optional step '{node.name}' failed: {e}")
+                results[node.name] = None
+            finished = time.perf_counter()
+            self.timings[node.name] = {
+                "started": started - graph_start,
+                "finished": finished - graph_start,
+                "duration": finished - started,
+            }
+            if on_done:
+                on_done(node.name, finished - started)
+
+        for node in self.nodes.values():
+            tasks[node.name] = asyncio.create_task(run_node(node), name=node.name)
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            raise
+        return results
@@ -240,63 +240,422 @@
 #             await self.connection_pool.close()
 
 
+import os
+import asyncio
+import shutil
+import tempfile
+import threading
+import contextvars
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 import pandas as pd
-from typing import Dict, Any, List, Optional
+from typing import Callable, Dict, Any, List, Optional
+
+from services.telemetry import span
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:  # Falls back to pandas string methods
+    pa = pc = None
+
+# Columns with a small set of repeating labels are held as categoricals
+CATEGORICAL_COLUMNS = ['industry', 'creative_type', 'messaging_tone']
+# Metric columns are held as contiguous float64 arrays
+FLOAT_COLUMNS = ['budget', 'duration_days', 'ctr', 'conversion_rate', 'roas',
+                 'engagement_rate', 'brand_lift', 'success_score']
+DATE_COLUMNS = ['launch_date', 'created_at']
+# Bump when the layout of the persisted snapshot tables changes
+SNAPSHOT_FORMAT = 2
+SUCCESS_THRESHOLD = 7.0
+# Upper bound on threads doing blocking pandas/openpyxl work for queries
+QUERY_WORKERS = int(os.getenv("CAMPAIGN_DB_WORKERS", "4"))
+
+
+def data_version(path: str) -> str:
+    """Identify one version of the source file by its mtime and size."""
+    stat = os.stat(path)
+    return f"{stat.st_mtime_ns}-{stat.st_size}"
+
+
+def snapshot_dir(path: str) -> str:
+    """Sidecar directory next to the source file, e.g. campaigns.xlsx -> campaigns.snapshot/"""
+    return os.path.splitext(path)[0] + ".snapshot"
+
+
+def read_campaign_file(path: str) -> pd.DataFrame:
+    """Raw campaign table from an .xlsx, .csv or .parquet file."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".parquet":
+        return pd.read_parquet(path)
+    if extension == ".csv":
+        return pd.read_csv(path, parse_dates=DATE_COLUMNS, engine="pyarrow" if pa is not None else "c")
+    return pd.read_excel(path)
+
+
+def load_campaign_frame(path: str) -> pd.DataFrame:
+    print(f"📂 Loading campaign data from {os.path.basename(path)}...")
+    df = read_campaign_file(path)
+    first = df['channels'].dropna().head(1)
+    if len(first) and isinstance(first.iloc[0], (list, tuple, np.ndarray)):
+        # List-typed channel columns (e.g. from Parquet) are held as comma-separated text
+        df['channels'] = [
+            ",".join(map(str, cell)) if isinstance(cell, (list, tuple, np.ndarray)) else cell for cell in df['channels']
+        ]
+    for column in CATEGORICAL_COLUMNS:
+        df[column] = df[column].astype('category')
+    for column in FLOAT_COLUMNS:
+        df[column] = df[column].astype('float64')
+    return df
+
+
+def decode_channels(values: pd.Series) -> pd.DataFrame:
+    """Decode channel-list cells into a (row, channel) bridge table without evaluating them.
+
+    Accepts Python list literals (['A', 'B']), Postgres arrays ({"A",B}) and plain
+    comma-separated text. `row` is the cell's position in `values`; `channel` is a
+    categorical whose codes drive the per-channel reductions.
+    """
+    if pc is not None:
+        cells = pa.array(values.astype('string'), type=pa.string(), from_pandas=True)
+        lists = pc.split_pattern(pc.utf8_trim(cells, '[]{} '), ',')
+        rows = pc.list_parent_indices(lists).to_numpy()
+        items = pc.utf8_trim(pc.utf8_trim(pc.list_flatten(lists), ' \'"'), ' ')
+        keep = pc.not_equal(items, '').to_numpy(zero_copy_only=False)
+        encoded = pc.dictionary_encode(items.filter(pa.array(keep)))
+        channel = pd.Categorical.from_codes(encoded.indices.to_numpy(), encoded.dictionary.to_pylist())
+        channel = channel.set_categories(sorted(channel.categories))
+        return pd.DataFrame({'row': rows[keep].astype('int64'), 'channel': channel})
+
+    items = (
+        values.astype('string')
+        .str.strip()
+        .str.strip('[]{}')
+        .str.split(',')
+        .reset_index(drop=True)
+        .explode()
+        .str.strip()
+        .str.strip('\'"')
+        .str.strip()
+    )
+    items = items[items.notna() & (items != '')]
+    return pd.DataFrame({
+        'row': items.index.to_numpy(dtype='int64'),
+        'channel': pd.Categorical(items.to_numpy(dtype=object)),
+    })
+
+
+def _channel_lists(bridge: pd.DataFrame, rows) -> List[List[str]]:
+    """Channel lists for the given row positions, in their original cell order."""
+    # The bridge is ordered by row, so each row's channels form one contiguous slice
+    bridge_rows = bridge['row'].to_numpy()
+    names = bridge['channel'].cat.categories.astype(str).to_numpy(dtype=object)[bridge['channel'].cat.codes.to_numpy()]
+    starts = np.searchsorted(bridge_rows, rows, side='left')
+    ends = np.searchsorted(bridge_rows, rows, side='right')
+    return [names[start:end].tolist() for start, end in zip(starts, ends)]
+
+
+def _as_lists(records: List[Dict], columns: List[str]) -> List[Dict]:
+    # Parquet hands list columns back as numpy arrays
+    for record in records:
+        for column in columns:
+            if column in record and not isinstance(record[column], list) and hasattr(record[column], '__iter__') and not isinstance(record[column], str):
+                record[column] = list(record[column])
+    return records
+
+
+class CampaignSnapshot:
+    """Precomputed analytics tables for one version of the campaign data."""
+
+    TABLES = ('ranking', 'channels', 'industries')
+
+    def __init__(self, version: str, ranking: pd.DataFrame, channels: pd.DataFrame, industries: pd.DataFrame):
+        self.version = version
+        # Successful campaigns pre-sorted by success score, then ROAS
+        self.ranking = ranking
+        # One row per channel, indexed by channel name
+        self.channels = channels
+        # One row per industry, with distinct creative types and tones
+        self.industries = industries
+
+    @classmethod
+    def build(cls, version: str, df: pd.DataFrame, bridge: pd.DataFrame) -> "CampaignSnapshot":
+        with span("db.build_ranking"):
+            ranking = cls._build_ranking(df, bridge)
+        with span("db.build_channels"):
+            channels = cls._build_channels(df, bridge)
+        with span("db.build_industries"):
+            industries = cls._build_industries(df)
+        return cls(version, ranking, channels, industries)
+
+    @staticmethod
+    def _build_ranking(df: pd.DataFrame, bridge: pd.DataFrame) -> pd.DataFrame:
+        ranked_rows = np.flatnonzero(df['success_score'].to_numpy() >= SUCCESS_THRESHOLD)
+        ranking = df.iloc[ranked_rows].copy()
+        ranking['channels'] = _channel_lists(bridge, ranked_rows)
+        return ranking.sort_values(['success_score', 'roas'], ascending=[False, False]).reset_index(drop=True)
+
+    @staticmethod
+    def _build_channels(df: pd.DataFrame, bridge: pd.DataFrame) -> pd.DataFrame:
+        # Single grouped reduction over the bridge table's integer channel codes
+        codes = bridge['channel'].cat.codes.to_numpy()
+        rows = bridge['row'].to_numpy()
+        n_channels = len(bridge['channel'].cat.categories)
+        counts = np.bincount(codes, minlength=n_channels)
+        metrics = {}
+        for name, column in [('avg_success_score', 'success_score'), ('avg_roas', 'roas'),
+                             ('avg_ctr', 'ctr'), ('avg_conversion_rate', 'conversion_rate')]:
+            values = df[column].to_numpy(dtype='float64')[rows]
+            # Missing metrics are skipped, matching pandas' mean()
+            present = ~np.isnan(values)
+            sums = np.bincount(codes[present], weights=values[present], minlength=n_channels)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                metrics[name] = sums / np.bincount(codes[present], minlength=n_channels)
+        channels = pd.DataFrame(metrics, index=pd.Index(bridge['channel'].cat.categories.astype(str), name='channels'))
+        channels['campaign_count'] = counts
+        return channels[counts > 0]
+
+    @staticmethod
+    def _build_industries(df: pd.DataFrame) -> pd.DataFrame:
+        # Grouped reductions over the industry codes; distinct creative types and tones come
+        # from an (industry, label) presence matrix instead of a Python set per group
+        industry = df['industry'].astype('category')
+        names = industry.cat.categories.astype(str)
+        codes = industry.cat.codes.to_numpy().astype('int64')
+        known = codes >= 0
+        n_industries = len(names)
+
+        def group_mean(column: str) -> np.ndarray:
+            values = df[column].to_numpy(dtype='float64')
+            present = known & ~np.isnan(values)
+            sums = np.bincount(codes[present], weights=values[present], minlength=n_industries)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                return sums / np.bincount(codes[present], minlength=n_industries)
+
+        def distinct_labels(column: str) -> List[List[str]]:
+            labels = df[column].astype('category')
+            label_codes = labels.cat.codes.to_numpy().astype('int64')
+            label_names = np.asarray(labels.cat.categories.astype(str), dtype=object)
+            present = known & (label_codes >= 0)
+            seen = np.bincount(
+                codes[present] * len(label_names) + label_codes[present], minlength=n_industries * len(label_names)
+            ).reshape(n_industries, len(label_names)) > 0
+            return [label_names[row].tolist() for row in seen]
+
+        industries = pd.DataFrame({
+            'industry': np.asarray(names, dtype=object),
+            'avg_success_score': group_mean('success_score'),
+            'avg_budget': group_mean('budget'),
+            'avg_duration': group_mean('duration_days'),
+            'popular_creative_types': distinct_labels('creative_type'),
+            'popular_tones': distinct_labels('messaging_tone'),
+            'campaign_count': np.bincount(codes[known & df['campaign_id'].notna().to_numpy()], minlength=n_industries),
+        })
+        return industries[np.bincount(codes[known], minlength=n_industries) > 0].reset_index(drop=True)
+
+    @classmethod
+    def read(cls, directory: str, version: str) -> Optional["CampaignSnapshot"]:
+        version_dir = os.path.join(directory, f"v{SNAPSHOT_FORMAT}-{version}")
+        if not os.path.isdir(version_dir):
+            return None
+        try:
+            tables = {name: pd.read_parquet(os.path.join(version_dir, f"{name}.parquet")) for name in cls.TABLES}
+        except Exception as e:
+            print(f"⚠️ Ignoring unreadable campaign snapshot: {e}")
+            return None
+        return cls(version, **tables)
+
+    def write(self, directory: str):
+        """Persist the tables; the version directory appears atomically once complete."""
+        os.makedirs(directory, exist_ok=True)
+        version_dir = os.path.join(directory, f"v{SNAPSHOT_FORMAT}-{self.version}")
+        tmp_dir = tempfile.mkdtemp(prefix=".tmp-", dir=directory)
+        try:
+            for name in self.TABLES:
+                getattr(self, name).to_parquet(os.path.join(tmp_dir, f"{name}.parquet"))
+            os.rename(tmp_dir, version_dir)
+        except OSError:
+            # Another process published this version first
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            return
+        except Exception:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+        # Drop snapshots of previous data versions
+        for entry in os.listdir(directory):
+            if entry != os.path.basename(version_dir) and not entry.startswith(".tmp-"):
+                shutil.rmtree(os.path.join(directory, entry), ignore_errors=True)
+
+    def successful_campaigns(self, limit: int = 20) -> List[Dict]:
+        return _as_lists(self.ranking.head(limit).to_dict(orient='records'), ['channels'])
+
+    def channel_performance(self) -> Dict[str, Dict]:
+        return self.channels.to_dict(orient='index')
+
+    def industry_insights(self, industry: Optional[str] = None) -> List[Dict]:
+        df = self.industries
+        if industry:
+            df = df[df['industry'].str.contains(industry, case=False, na=False)]
+        return _as_lists(df.to_dict(orient='records'), ['popular_creative_types', 'popular_tones'])
+
+
+class CampaignStore:
+    """Shared, in-memory campaign data for one source file, served from its snapshot."""
+
+    def __init__(self, path: str, version: str, snapshot: CampaignSnapshot,
+                 df: Optional[pd.DataFrame] = None, bridge: Optional[pd.DataFrame] = None):
+        self.path = path
+        self.version = version
+        self.snapshot = snapshot
+        self._df = df
+        self._bridge = bridge
+
+    @classmethod
+    def load(cls, path: str, version: str) -> "CampaignStore":
+        with span("db.load_store", source=os.path.basename(path)) as current:
+            directory = snapshot_dir(path)
+            snapshot = CampaignSnapshot.read(directory, version)
+            current.set("snapshot_hit", snapshot is not None)
+            if snapshot is not None:
+                print(f"⚡ Loaded campaign snapshot {version} for {os.path.basename(path)}")
+                return cls(path, version, snapshot)
+
+            with span("db.read_source"):
+                df = load_campaign_frame(path)
+            bridge = decode_channels(df['channels'])
+            snapshot = CampaignSnapshot.build(version, df, bridge)
+            try:
+                snapshot.write(directory)
+            except Exception as e:
+                # Persisting is an optimisation only (e.g. pyarrow missing or read-only volume)
+                print(f"⚠️ Could not persist campaign snapshot: {e}")
+            return cls(path, version, snapshot, df, bridge)
+
+    @property
+    def df(self) -> pd.DataFrame:
+        """Full campaign table; only read from the source file when actually needed."""
+        if self._df is None:
+            self._df = load_campaign_frame(self.path)
+        return self._df
+
+    @property
+    def channel_bridge(self) -> pd.DataFrame:
+        """(row, channel) pairs decoded from the `channels` column of `df`."""
+        if self._bridge is None:
+            self._bridge = decode_channels(self.df['channels'])
+        return self._bridge
+
+    def successful_campaigns(self, limit: int = 20) -> List[Dict]:
+        return self.snapshot.successful_campaigns(limit)
+
+    def channel_performance(self) -> Dict[str, Dict]:
+        return self.snapshot.channel_performance()
+
+    def industry_insights(self, industry: Optional[str] = None) -> List[Dict]:
+        return self.snapshot.industry_insights(industry)
+
+
+# Process-wide store cache keyed by absolute file path
+_STORES: Dict[str, CampaignStore] = {}
+_STORES_LOCK = threading.Lock()
+
+
+def get_campaign_store(path: str) -> CampaignStore:
+    """Return the shared store for `path`, rebuilding it only when the data version changes."""
+    path = os.path.abspath(path)
+    version = data_version(path)
+    store = _STORES.get(path)
+    if store is not None and store.version == version:
+        return store
+    with _STORES_LOCK:
+        # Another session may have reloaded while we waited for the lock
+        store = _STORES.get(path)
+        if store is None or store.version != version:
+            store = CampaignStore.load(path, version)
+            _STORES[path] = store
+        return store
+
+
+class CampaignBackend(ABC):
+    """Where DatabaseManager reads campaign analytics from.
+
+    Methods are blocking; DatabaseManager runs them in its query pool.
+    """
+
+    @abstractmethod
+    def successful_campaigns(self, limit: int = 20) -> List[Dict]:
+        ...
+
+    @abstractmethod
+    def channel_performance(self) -> Dict[str, Dict]:
+        ...
+
+    @abstractmethod
+    def industry_insights(self, industry: Optional[str] = None) -> List[Dict]:
+        ...
+
+    def close(self):
+        pass
+
+
+class ExcelBackend(CampaignBackend):
+    """Serves queries from the shared in-memory store of a workbook (or its snapshot)."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    @property
+    def store(self) -> CampaignStore:
+        return get_campaign_store(self.path)
+
+    def successful_campaigns(self, limit: int = 20) -> List[Dict]:
+        return self.store.successful_campaigns(limit)
+
+    def channel_performance(self) -> Dict[str, Dict]:
+        return self.store.channel_performance()
+
+    def industry_insights(self, industry: Optional[str] = None) -> List[Dict]:
+        return self.store.industry_insights(industry)
+
+
+def create_backend(excel_path: str) -> CampaignBackend:
+    """Pick the backend from CAMPAIGN_DB_BACKEND ('excel' by default, or 'sqlite')."""
+    kind = os.getenv("CAMPAIGN_DB_BACKEND", "excel").lower()
+    if kind == "excel":
+        return ExcelBackend(excel_path)
+    if kind == "sqlite":
+        from database.sqlite_backend import SQLiteBackend, default_db_path, ensure_imported
+        db_path = os.getenv("CAMPAIGN_DB_PATH") or default_db_path(excel_path)
+        ensure_imported(excel_path, db_path)
+        return SQLiteBackend(db_path)
+    raise ValueError(f"Unknown CAMPAIGN_DB_BACKEND: {kind}")
+
+
+# Shared by every DatabaseManager so concurrent sessions can't oversubscribe the CPU
+_QUERY_EXECUTOR = ThreadPoolExecutor(max_workers=QUERY_WORKERS, thread_name_prefix="campaign-db")
+
 
 class DatabaseManager:
-    def __init__(self, excel_path: str):
+    def __init__(self, excel_path: Optional[str] = None, backend: Optional[CampaignBackend] = None):
         self.excel_path = excel_path
+        self.backend = backend or create_backend(excel_path)
 
-    async def _load_df(self):
-        return pd.read_excel(self.excel_path)
-    
+    async def _run(self, name: str, query: Callable[[CampaignBackend], Any]):
+        """Run a backend query in the bounded pool, keeping the event loop free."""
+        with span(f"db.{name}", backend=type(self.backend).__name__):
+            # Carry the current span into the worker thread so store loads nest under the query
+            context = contextvars.copy_context()
+            return await asyncio.get_running_loop().run_in_executor(_QUERY_EXECUTOR, context.run, query, self.backend)
 
     async def get_successful_campaigns(self, limit: int = 20) -> List[Dict]:
-        df = await self._load_df()
-        df = df[df['success_score'] >= 7.0]
-        df = df.sort_values(['success_score', 'roas'], ascending=[False, False])
-        return df.head(limit).to_dict(orient='records')
+        return await self._run("successful_campaigns", lambda backend: backend.successful_campaigns(limit))
 
     async def get_channel_performance(self) -> Dict[str, Dict]:
-        df = await self._load_df()
-        # Ensure channels column is a list
-        if df['channels'].dtype == object:
-            df['channels'] = df['channels'].apply(lambda x: eval(x) if isinstance(x, str) and x.startswith("[") else [x] if isinstance(x, str) else x)
-        # Explode channels for aggregation
-        exploded = df.explode('channels')
-        grouped = exploded.groupby('channels').agg(
-            avg_success_score=('success_score', 'mean'),
-            avg_roas=('roas', 'mean'),
-            avg_ctr=('ctr', 'mean'),
-            avg_conversion_rate=('conversion_rate', 'mean'),
-            campaign_count=('campaign_id', 'count')
-        ).reset_index()
-        # Convert to dict
-        channel_stats = {}
-        for _, row in grouped.iterrows():
-            channel_stats[row['channels']] = {
-                'avg_success_score': row['avg_success_score'],
-                'avg_roas': row['avg_roas'],
-                'avg_ctr': row['avg_ctr'],
-                'avg_conversion_rate': row['avg_conversion_rate'],
-                'campaign_count': row['campaign_count']
-            }
-        return channel_stats
-    
+        return await self._run("channel_performance", lambda backend: backend.channel_performance())
+
     async def get_industry_insights(self, industry: Optional[str] = None) -> List[Dict]:
-        df = await self._load_df()
-        if industry:
-            df = df[df['industry'].str.contains(industry, case=False, na=False)]
-        grouped = df.groupby('industry').agg(
-            avg_success_score=('success_score', 'mean'),
-            avg_budget=('budget', 'mean'),
-            avg_duration=('duration_days', 'mean'),
-            popular_creative_types=('creative_type', lambda x: list(set(x))),
-            popular_tones=('messaging_tone', lambda x: list(set(x))),
-            campaign_count=('campaign_id', 'count')
-        ).reset_index()
-        return grouped.to_dict(orient='records')
-    
+        return await self._run("industry_insights", lambda backend: backend.industry_insights(industry))
+
     async def close(self):
-        # No resources to clean up for Excel
-        pass
\ No newline at end of file
+        self.backend.close()
@@ -0,0 +1,150 @@
+# database/result_store.py
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from contextlib import closing
+from typing import Any, Dict, List, Optional
+
+from models.response_models import AnalysisOutput, StrategyOutput, CreativeOutput, CampaignBrief
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULT_STORE_PATH = os.getenv("CAMPAIGN_RESULT_STORE_PATH", os.path.join(PROJECT_ROOT, "campaign_results.sqlite3"))
+
+# Pipeline outputs kept per run, with the model each is stored as
+RESULT_MODELS = {
+    "analysis_result": AnalysisOutput,
+    "strategy_result": StrategyOutput,
+    "creative_result": CreativeOutput,
+    "final_campaign": CampaignBrief,
+}
+
+SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS campaign_results (
+    job_id TEXT PRIMARY KEY,
+    input_hash TEXT NOT NULL,
+    campaign_details TEXT NOT NULL,
+    analysis_result TEXT,
+    strategy_result TEXT,
+    creative_result TEXT,
+    final_campaign TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_campaign_results_input ON campaign_results(input_hash, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_campaign_results_created ON campaign_results(created_at DESC);
+"""
+
+
+def input_hash(campaign_details: Dict[str, Any]) -> str:
+    """Stable hash of the form inputs; blank fields count as missing."""
+    normalized = {k: str(v).strip() for k, v in campaign_details.items() if v is not None and str(v).strip()}
+    return hashlib.sha256(json.dumps(normalized, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def _serialize(results: Dict[str, Any]) -> Dict[str, Optional[str]]:
+    return {
+        name: results[name].model_dump_json() if results.get(name) is not None else None
+        for name in RESULT_MODELS
+    }
+
+
+class ResultStore:
+    """Finished pipeline runs, stored as serialized pydantic models and indexed by job id and inputs."""
+
+    def __init__(self, path: str = RESULT_STORE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.executescript(SCHEMA_SQL)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def save(self, job_id: str, campaign_details: Dict[str, Any], results: Dict[str, Any]):
+        now = time.time()
+        outputs = _serialize(results)
+        with self._lock, closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO campaign_results (job_id, input_hash, campaign_details, analysis_result, "
+                "strategy_result, creative_result, final_campaign, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    job_id, input_hash(campaign_details), json.dumps(campaign_details),
+                    outputs["analysis_result"], outputs["strategy_result"], outputs["creative_result"],
+                    outputs["final_campaign"], now, now
+                )
+            )
+
+    def update_results(self, job_id: str, results: Dict[str, Any]):
+        """Store revised outputs in place of the run's current ones."""
+        outputs = _serialize(results)
+        with self._lock, closing(self._connect()) as conn, conn:
+            conn.execute(
+                "UPDATE campaign_results SET analysis_result = ?, strategy_result = ?, creative_result = ?, "
+                "final_campaign = ?, updated_at = ? WHERE job_id = ?",
+                (
+                    outputs["analysis_result"], outputs["strategy_result"], outputs["creative_result"],
+                    outputs["final_campaign"], time.time(), job_id
+                )
+            )
+
+    def load(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """A stored run shaped like the pipeline's results dict, or None."""
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT * FROM campaign_results WHERE job_id = ?", (job_id,)).fetchone()
+        return self._from_row(row) if row else None
+
+    def find_by_inputs(self, campaign_details: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """The most recent run with the same inputs, or None."""
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT * FROM campaign_results WHERE input_hash = ? ORDER BY created_at DESC LIMIT 1",
+                (input_hash(campaign_details),)
+            ).fetchone()
+        return self._from_row(row) if row else None
+
+    def recent(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """Job id, objective and timestamps of the latest runs, newest first."""
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT job_id, campaign_details, created_at, updated_at FROM campaign_results "
+                "ORDER BY created_at DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return [
+            {
+                "job_id": row["job_id"],
+                "campaign_objective": json.loads(row["campaign_details"]).get("campaign_objective"),
+                "created_at": row["created_at"],
+                "updated_at": row["updated_at"],
+            }
+            for row in rows
+        ]
+
+    @staticmethod
+    def _from_row(row: sqlite3.Row) -> Dict[str, Any]:
+        results = {
+            name: model.model_validate_json(row[name]) if row[name] else None
+            for name, model in RESULT_MODELS.items()
+        }
+        results["job_id"] = row["job_id"]
+        results["campaign_details"] = json.loads(row["campaign_details"])
+        return results
+
+
+_STORE: Optional[ResultStore] = None
+_STORE_LOCK = threading.Lock()
+
+
+def get_result_store() -> ResultStore:
+    global _STORE
+    with _STORE_LOCK:
+        if _STORE is None:
+            _STORE = ResultStore()
+        return _STORE
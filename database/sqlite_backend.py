@@ -0,0 +1,247 @@
+# database/sqlite_backend.py
+import os
+import sys
+import sqlite3
+import tempfile
+import threading
+from contextlib import closing
+from typing import Dict, List, Optional
+
+from database.db_manager import (
+    CampaignBackend, SUCCESS_THRESHOLD, data_version, decode_channels, load_campaign_frame
+)
+
+SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS campaigns (
+    id INTEGER PRIMARY KEY,
+    campaign_id TEXT NOT NULL,
+    campaign_name TEXT,
+    industry TEXT NOT NULL,
+    target_audience TEXT,
+    budget REAL,
+    duration_days REAL,
+    ctr REAL,
+    conversion_rate REAL,
+    roas REAL,
+    engagement_rate REAL,
+    brand_lift REAL,
+    success_score REAL,
+    creative_type TEXT,
+    messaging_tone TEXT,
+    launch_date TEXT,
+    created_at TEXT
+);
+
+-- One row per (campaign, channel), in the order the channels were listed
+CREATE TABLE IF NOT EXISTS campaign_channels (
+    campaign_row INTEGER NOT NULL REFERENCES campaigns(id),
+    position INTEGER NOT NULL,
+    channel TEXT NOT NULL,
+    PRIMARY KEY (campaign_row, position)
+) WITHOUT ROWID;
+
+-- Distinct industry names, so substring filters scan this instead of campaigns
+CREATE TABLE IF NOT EXISTS industries (
+    name TEXT PRIMARY KEY
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS metadata (
+    key TEXT PRIMARY KEY,
+    value TEXT
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_campaigns_success_score ON campaigns(success_score DESC, roas DESC);
+CREATE INDEX IF NOT EXISTS idx_campaigns_roas ON campaigns(roas);
+CREATE INDEX IF NOT EXISTS idx_campaigns_industry ON campaigns(industry);
+CREATE INDEX IF NOT EXISTS idx_campaign_channels_channel ON campaign_channels(channel);
+"""
+
+CAMPAIGN_COLUMNS = [
+    'campaign_id', 'campaign_name', 'industry', 'target_audience', 'budget', 'duration_days',
+    'ctr', 'conversion_rate', 'roas', 'engagement_rate', 'brand_lift', 'success_score',
+    'creative_type', 'messaging_tone', 'launch_date', 'created_at'
+]
+
+_IMPORT_LOCK = threading.Lock()
+
+
+def default_db_path(excel_path: str) -> str:
+    """campaigns.xlsx -> campaigns.sqlite3 in the same directory"""
+    return os.path.splitext(excel_path)[0] + ".sqlite3"
+
+
+def _connect(db_path: str, read_only: bool = True) -> sqlite3.Connection:
+    if read_only:
+        conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    else:
+        conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def _source_version(db_path: str) -> Optional[str]:
+    try:
+        with closing(_connect(db_path)) as conn:
+            row = conn.execute("SELECT value FROM metadata WHERE key = 'source_version'").fetchone()
+    except sqlite3.Error:
+        return None
+    return row['value'] if row else None
+
+
+def import_workbook(source_path: str, db_path: str):
+    """Build an indexed SQLite database from a campaign workbook.
+
+    The database is written to a temporary file and moved into place, so readers
+    never see a half-imported file.
+    """
+    df = load_campaign_frame(source_path)
+    bridge = decode_channels(df['channels'])
+    print(f"🗄️ Importing {len(df)} campaigns into {os.path.basename(db_path)}...")
+
+    fd, tmp_path = tempfile.mkstemp(prefix=".import-", suffix=".sqlite3", dir=os.path.dirname(os.path.abspath(db_path)))
+    os.close(fd)
+    try:
+        conn = _connect(tmp_path, read_only=False)
+        try:
+            conn.executescript(SCHEMA_SQL)
+            rows = df.reindex(columns=CAMPAIGN_COLUMNS).astype(object)
+            for column in ['launch_date', 'created_at']:
+                rows[column] = rows[column].map(lambda x: x.isoformat() if hasattr(x, 'isoformat') else x)
+            rows = rows.where(rows.notna(), None)
+            conn.executemany(
+                f"INSERT INTO campaigns (id, {', '.join(CAMPAIGN_COLUMNS)}) "
+                f"VALUES (?, {', '.join('?' for _ in CAMPAIGN_COLUMNS)})",
+                ((i, *values) for i, values in enumerate(rows.itertuples(index=False, name=None)))
+            )
+            # Position of each channel within its campaign's list
+            positions = bridge.groupby('row').cumcount().to_numpy()
+            conn.executemany(
+                "INSERT INTO campaign_channels (campaign_row, position, channel) VALUES (?, ?, ?)",
+                zip(bridge['row'].tolist(), positions.tolist(), bridge['channel'].astype(str).tolist())
+            )
+            conn.execute("INSERT INTO industries (name) SELECT DISTINCT industry FROM campaigns")
+            conn.execute("INSERT INTO metadata (key, value) VALUES ('source_version', ?)", (data_version(source_path),))
+            conn.commit()
+            conn.execute("ANALYZE")
+        finally:
+            conn.close()
+        os.replace(tmp_path, db_path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    print(f"✅ Imported campaigns into {db_path}")
+
+
+def ensure_imported(excel_path: Optional[str], db_path: str):
+    """(Re)import the workbook when the database is missing or was built from an older file."""
+    if not excel_path or not os.path.exists(excel_path):
+        if not os.path.exists(db_path):
+            raise FileNotFoundError(f"No campaign database at {db_path} and no workbook to import")
+        return
+    version = data_version(excel_path)
+    if _source_version(db_path) == version:
+        return
+    with _IMPORT_LOCK:
+        if _source_version(db_path) != version:
+            import_workbook(excel_path, db_path)
+
+
+class SQLiteBackend(CampaignBackend):
+    """Campaign analytics from an indexed SQLite file; nothing is held in memory."""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+
+    def _query(self, sql: str, params=()) -> List[sqlite3.Row]:
+        # A connection per query keeps the backend safe to share across pool threads
+        conn = _connect(self.db_path)
+        try:
+            return conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+
+    def _channels_for(self, rows: List[int]) -> Dict[int, List[str]]:
+        channels = {row: [] for row in rows}
+        if rows:
+            for r in self._query(
+                f"SELECT campaign_row, channel FROM campaign_channels "
+                f"WHERE campaign_row IN ({', '.join('?' for _ in rows)}) ORDER BY campaign_row, position",
+                rows
+            ):
+                channels[r['campaign_row']].append(r['channel'])
+        return channels
+
+    def successful_campaigns(self, limit: int = 20) -> List[Dict]:
+        # Served by idx_campaigns_success_score: range scan in index order, stops after `limit`
+        rows = self._query(
+            "SELECT * FROM campaigns WHERE success_score >= ? "
+            "ORDER BY success_score DESC, roas DESC LIMIT ?",
+            (SUCCESS_THRESHOLD, limit)
+        )
+        channels = self._channels_for([r['id'] for r in rows])
+        campaigns = []
+        for r in rows:
+            record = {column: r[column] for column in CAMPAIGN_COLUMNS}
+            record['channels'] = channels[r['id']]
+            campaigns.append(record)
+        return campaigns
+
+    def channel_performance(self) -> Dict[str, Dict]:
+        rows = self._query(
+            """
+            SELECT ch.channel,
+                   AVG(c.success_score) AS avg_success_score,
+                   AVG(c.roas) AS avg_roas,
+                   AVG(c.ctr) AS avg_ctr,
+                   AVG(c.conversion_rate) AS avg_conversion_rate,
+                   COUNT(c.campaign_id) AS campaign_count
+            FROM campaign_channels ch
+            JOIN campaigns c ON c.id = ch.campaign_row
+            GROUP BY ch.channel
+            ORDER BY ch.channel
+            """
+        )
+        return {r['channel']: {k: r[k] for k in r.keys() if k != 'channel'} for r in rows}
+
+    def industry_insights(self, industry: Optional[str] = None) -> List[Dict]:
+        if industry:
+            # Case-insensitive substring match on the small industries table,
+            # then idx_campaigns_industry narrows the campaigns
+            pattern = '%' + industry.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+            names = [r['name'] for r in self._query("SELECT name FROM industries WHERE name LIKE ? ESCAPE '\\'", (pattern,))]
+            if not names:
+                return []
+            where = f"WHERE industry IN ({', '.join('?' for _ in names)})"
+            params = names
+        else:
+            where, params = "", []
+
+        insights = [dict(r) for r in self._query(
+            f"""
+            SELECT industry,
+                   AVG(success_score) AS avg_success_score,
+                   AVG(budget) AS avg_budget,
+                   AVG(duration_days) AS avg_duration,
+                   COUNT(campaign_id) AS campaign_count
+            FROM campaigns {where}
+            GROUP BY industry
+            ORDER BY industry
+            """, params
+        )]
+        for column, key in [('creative_type', 'popular_creative_types'), ('messaging_tone', 'popular_tones')]:
+            distinct = {}
+            for r in self._query(f"SELECT DISTINCT industry, {column} AS value FROM campaigns {where}", params):
+                if r['value'] is not None:
+                    distinct.setdefault(r['industry'], []).append(r['value'])
+            for insight in insights:
+                insight[key] = distinct.get(insight['industry'], [])
+        return insights
+
+
+if __name__ == "__main__":
+    # python -m database.sqlite_backend [campaigns.xlsx] [campaigns.sqlite3]
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    source = sys.argv[1] if len(sys.argv) > 1 else os.path.join(project_root, "campaigns.xlsx")
+    target = sys.argv[2] if len(sys.argv) > 2 else default_db_path(source)
+    import_workbook(source, target)
@@ -0,0 +1,119 @@
+# database/video_jobs.py
+import os
+import time
+import sqlite3
+import threading
+from contextlib import closing
+from dataclasses import dataclass
+from typing import List, Optional
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+VIDEO_JOB_STORE_PATH = os.getenv("VIDEO_JOB_STORE_PATH", os.path.join(PROJECT_ROOT, "video_jobs.sqlite3"))
+
+PROCESSING, READY, FAILED = "processing", "ready", "failed"
+
+SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS video_jobs (
+    video_id TEXT PRIMARY KEY,
+    prompt TEXT NOT NULL,
+    status TEXT NOT NULL,
+    video_url TEXT,
+    error TEXT,
+    polls INTEGER NOT NULL DEFAULT 0,
+    completed_by TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_video_jobs_status ON video_jobs(status, created_at);
+"""
+
+
+@dataclass
+class VideoJob:
+    video_id: str
+    prompt: str
+    status: str = PROCESSING
+    video_url: Optional[str] = None
+    error: Optional[str] = None
+    polls: int = 0
+    completed_by: Optional[str] = None  # "webhook", "poll" or "timeout" (the waiter gave up)
+    created_at: float = 0.0
+    updated_at: float = 0.0
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (READY, FAILED)
+
+
+class VideoJobStore:
+    """Submitted video renders and their outcome, so unfinished ones survive a restart."""
+
+    def __init__(self, path: str = VIDEO_JOB_STORE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.executescript(SCHEMA_SQL)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def add(self, video_id: str, prompt: str) -> VideoJob:
+        now = time.time()
+        with self._lock, closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO video_jobs (video_id, prompt, status, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (video_id, prompt, PROCESSING, now, now)
+            )
+        return VideoJob(video_id, prompt, created_at=now, updated_at=now)
+
+    def finish(self, video_id: str, status: str, video_url: Optional[str] = None, error: Optional[str] = None,
+               completed_by: Optional[str] = None) -> bool:
+        """Record a job's outcome; False if it was already finished (e.g. webhook and poll both answered)."""
+        with self._lock, closing(self._connect()) as conn, conn:
+            cursor = conn.execute(
+                "UPDATE video_jobs SET status = ?, video_url = ?, error = ?, completed_by = ?, updated_at = ? "
+                "WHERE video_id = ? AND status = ?",
+                (status, video_url, error, completed_by, time.time(), video_id, PROCESSING)
+            )
+        return cursor.rowcount > 0
+
+    def record_poll(self, video_id: str):
+        with self._lock, closing(self._connect()) as conn, conn:
+            conn.execute(
+                "UPDATE video_jobs SET polls = polls + 1, updated_at = ? WHERE video_id = ?", (time.time(), video_id)
+            )
+
+    def get(self, video_id: str) -> Optional[VideoJob]:
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT * FROM video_jobs WHERE video_id = ?", (video_id,)).fetchone()
+        return VideoJob(**dict(row)) if row else None
+
+    def pending(self) -> List[VideoJob]:
+        """Jobs still rendering, oldest first."""
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT * FROM video_jobs WHERE status = ? ORDER BY created_at", (PROCESSING,)
+            ).fetchall()
+        return [VideoJob(**dict(row)) for row in rows]
+
+    def recent(self, limit: int = 20) -> List[VideoJob]:
+        with closing(self._connect()) as conn:
+            rows = conn.execute("SELECT * FROM video_jobs ORDER BY created_at DESC LIMIT ?", (limit,)).fetchall()
+        return [VideoJob(**dict(row)) for row in rows]
+
+
+_STORE: Optional[VideoJobStore] = None
+_STORE_LOCK = threading.Lock()
+
+
+def get_video_job_store() -> VideoJobStore:
+    global _STORE
+    with _STORE_LOCK:
+        if _STORE is None:
+            _STORE = VideoJobStore()
+        return _STORE
@@ -0,0 +1,135 @@
+# services/agent_runner.py
+import os
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional
+
+from pydantic import BaseModel, TypeAdapter, ValidationError
+from pydantic_ai import Agent
+from pydantic_ai.messages import ModelResponse, ToolCallPart
+from pydantic_core import from_json
+
+from services.llm_cache import cache_key, cache_ttl, dump_output, get_llm_cache, load_output
+from services.telemetry import Span, span
+
+# Seconds to group streamed tokens before re-parsing the partial output
+STREAM_DEBOUNCE = float(os.getenv("AGENT_STREAM_DEBOUNCE", "0.2"))
+
+PartialCallback = Callable[[Dict[str, Any]], None]
+
+
+def model_name(model) -> str:
+    return getattr(model, "model_name", None) or str(model)
+
+
+@lru_cache(maxsize=None)
+def field_adapter(output_type, field: str) -> TypeAdapter:
+    return TypeAdapter(output_type.model_fields[field].annotation)
+
+
+def partial_fields(output_type, response: ModelResponse) -> Dict[str, Any]:
+    """Fields of a structured output that validate so far, parsed from a partial tool call."""
+    if not (isinstance(output_type, type) and issubclass(output_type, BaseModel)):
+        return {}
+    for part in response.parts:
+        if not isinstance(part, ToolCallPart):
+            continue
+        args = part.args
+        if isinstance(args, str):
+            try:
+                args = from_json(args, allow_partial="trailing-strings") if args else {}
+            except ValueError:
+                return {}
+        if not isinstance(args, dict):
+            return {}
+        fields = {}
+        for name, value in args.items():
+            if name not in output_type.model_fields:
+                continue
+            try:
+                fields[name] = field_adapter(output_type, name).validate_python(
+                    value, experimental_allow_partial="trailing-strings"
+                )
+            except ValidationError:
+                pass
+        return fields
+    return {}
+
+
+def record_usage(current: Span, usage):
+    """Token and request counts of one agent run; extra requests are output-validation retries."""
+    current.add("prompt_tokens", usage.input_tokens or 0)
+    current.add("completion_tokens", usage.output_tokens or 0)
+    current.add("llm_requests", usage.requests)
+    current.add("validation_retries", max(0, usage.requests - 1))
+
+
+async def stream_agent(agent: Agent, user_prompt: str, on_partial: PartialCallback, current: Span) -> Any:
+    """Run an agent with streamed output, reporting partially validated fields as tokens arrive."""
+    async with agent.run_stream(user_prompt) as result:
+        reported = None
+        async for response, is_last in result.stream_structured(debounce_by=STREAM_DEBOUNCE):
+            if is_last:
+                with span("agent.validate"):
+                    output = await result.validate_structured_output(response)
+                break
+            fields = partial_fields(agent.output_type, response)
+            if fields and fields != reported:
+                reported = fields
+                on_partial(fields)
+        record_usage(current, result.usage())
+    if output_fields(output) != reported:
+        on_partial(output_fields(output))
+    return output
+
+
+def output_fields(output: Any) -> Dict[str, Any]:
+    return dict(output) if isinstance(output, BaseModel) else {}
+
+
+async def run_agent(
+    agent: Agent,
+    user_prompt: str,
+    *,
+    name: str,
+    system_prompt: str,
+    ttl: Optional[float] = None,
+    on_partial: Optional[PartialCallback] = None
+) -> Any:
+    """Run a pydantic-ai agent and return its validated output.
+
+    Identical requests (same deployment, prompts and output schema) are served
+    from the LLM cache while fresh. `name` selects the per-agent cache TTL;
+    a TTL of 0 always calls the model. With `on_partial` the output is streamed
+    and the callback receives each new set of partially validated fields.
+    """
+    ttl = cache_ttl(name, ttl)
+    with span(f"agent.{name}", model=model_name(agent.model), streamed=on_partial is not None) as current:
+        if ttl > 0:
+            cache = get_llm_cache()
+            key = cache_key(model_name(agent.model), system_prompt, user_prompt, agent.output_type)
+            cached = cache.get(key)
+            if cached is not None:
+                print(f"⚡ LLM cache hit: {name}")
+                current.add("cache_hits")
+                output = load_output(agent.output_type, cached)
+                if on_partial:
+                    on_partial(output_fields(output))
+                return output
+            current.add("cache_misses")
+
+        output = None
+        if on_partial:
+            try:
+                output = await stream_agent(agent, user_prompt, on_partial, current)
+            except ValidationError as e:
+                # Streaming has no output retries; fall back to a regular run
+                print(f"⚠️ Streamed {name} output failed validation, retrying without streaming: {e}")
+                current.add("validation_retries")
+        if output is None:
+            result = await agent.run(user_prompt)
+            record_usage(current, result.usage())
+            output = result.output
+
+        if ttl > 0:
+            cache.put(key, dump_output(agent.output_type, output), ttl)
+        return output
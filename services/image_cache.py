@@ -0,0 +1,280 @@
+# services/image_cache.py
+import os
+import asyncio
+import hashlib
+import threading
+import weakref
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional
+from urllib.parse import quote
+
+import httpx
+
+from services.llm_cache import CACHE_DIR
+from services.telemetry import span
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+# Text-to-image endpoint; the prompt is appended, URL-encoded
+IMAGE_BASE_URL = os.getenv("IMAGE_BASE_URL", "https://image.pollinations.ai/prompt/")
+IMAGE_CACHE_DIR = os.getenv("IMAGE_CACHE_DIR", os.path.join(CACHE_DIR, "images"))
+# Oldest images are removed once the cache grows past this size; 0 keeps everything
+IMAGE_CACHE_MAX_MB = float(os.getenv("IMAGE_CACHE_MAX_MB", "500"))
+IMAGE_FETCH_CONCURRENCY = int(os.getenv("IMAGE_FETCH_CONCURRENCY", "6"))
+# Remote renders are slow; this bounds one attempt, not the whole prefetch
+IMAGE_FETCH_TIMEOUT = float(os.getenv("IMAGE_FETCH_TIMEOUT", "90"))
+IMAGE_FETCH_RETRIES = int(os.getenv("IMAGE_FETCH_RETRIES", "2"))
+IMAGE_THUMBNAIL_SIZE = int(os.getenv("IMAGE_THUMBNAIL_SIZE", "512"))
+
+RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+EXTENSIONS = {"image/jpeg": ".jpg", "image/png": ".png", "image/webp": ".webp", "image/gif": ".gif"}
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Prompts differing only in whitespace render the same image; used for both the URL and the cache key."""
+    return " ".join(prompt.split())
+
+
+def image_url(prompt: str, base_url: str = IMAGE_BASE_URL) -> str:
+    """Stable render URL for a prompt (no cache-buster, so browsers can cache it too)."""
+    return base_url + quote(normalize_prompt(prompt), safe="")
+
+
+def image_key(prompt: str) -> str:
+    return hashlib.sha256(normalize_prompt(prompt).encode("utf-8")).hexdigest()
+
+
+class DiskBudget:
+    """Keeps a cache directory under a size limit, removing the least recently used files.
+
+    The directory is scanned once to learn its size; after that writers report
+    the bytes they add, and the directory is only walked again (and pruned to
+    `low_water` of the limit) when that running total crosses the limit.
+    Readers touch a file's mtime to mark it as recently used.
+    """
+
+    def __init__(self, directory: str, max_bytes: float, low_water: float = 0.8):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.low_water = low_water
+        self._size: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def _scan(self):
+        files = []
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path))
+        return files
+
+    def added(self, nbytes: int):
+        """Record a write; prunes when the cache has grown past its limit."""
+        if not self.max_bytes:
+            return
+        with self._lock:
+            if self._size is None:
+                self._size = sum(size for _, size, _ in self._scan())
+            else:
+                self._size += nbytes
+            if self._size > self.max_bytes:
+                self._prune()
+
+    def prune(self):
+        """Scan the directory and remove the least recently used files until under the low-water mark."""
+        if not self.max_bytes:
+            return
+        with self._lock:
+            self._prune()
+
+    def _prune(self):
+        if not os.path.isdir(self.directory):
+            self._size = 0
+            return
+        files = self._scan()
+        total = sum(size for _, size, _ in files)
+        target = self.max_bytes * self.low_water if total > self.max_bytes else self.max_bytes
+        for _, size, path in sorted(files):
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+        self._size = total
+
+
+def touch(path: str):
+    """Mark a cached file as recently used for DiskBudget pruning."""
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+
+@dataclass
+class CachedImage:
+    prompt: str
+    url: str
+    path: str
+    thumbnail: str
+
+
+class ImageCache:
+    """Rendered images on disk, addressed by the hash of the normalized prompt, with Pillow thumbnails."""
+
+    def __init__(self, directory: str = IMAGE_CACHE_DIR, max_mb: float = IMAGE_CACHE_MAX_MB,
+                 thumbnail_size: int = IMAGE_THUMBNAIL_SIZE):
+        self.directory = directory
+        self.thumbnail_size = thumbnail_size
+        self.budget = DiskBudget(directory, max_mb * 1024 * 1024)
+
+    def _base(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key)
+
+    def get(self, prompt: str, base_url: str = IMAGE_BASE_URL) -> Optional[CachedImage]:
+        base = self._base(image_key(prompt))
+        thumbnail = base + ".thumb.jpg"
+        for extension in EXTENSIONS.values():
+            if os.path.exists(base + extension):
+                touch(base + extension)
+                touch(thumbnail)
+                return CachedImage(
+                    prompt, image_url(prompt, base_url), base + extension,
+                    thumbnail if os.path.exists(thumbnail) else base + extension
+                )
+        return None
+
+    def put(self, prompt: str, data: bytes, content_type: str, base_url: str = IMAGE_BASE_URL) -> CachedImage:
+        """Store an image and its thumbnail; files appear atomically, so readers never see partial ones."""
+        base = self._base(image_key(prompt))
+        extension = EXTENSIONS.get(content_type.split(";")[0].strip().lower(), ".jpg")
+        os.makedirs(os.path.dirname(base), exist_ok=True)
+        path = base + extension
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+        thumbnail = self._thumbnail(path, base + ".thumb.jpg")
+        self.budget.added(len(data) + (os.path.getsize(thumbnail) if thumbnail else 0))
+        return CachedImage(prompt, image_url(prompt, base_url), path, thumbnail or path)
+
+    def _thumbnail(self, path: str, thumbnail: str) -> Optional[str]:
+        if Image is None:
+            return None
+        tmp = f"{thumbnail}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with Image.open(path) as image:
+                image.draft("RGB", (self.thumbnail_size, self.thumbnail_size))
+                image = image.convert("RGB")
+                image.thumbnail((self.thumbnail_size, self.thumbnail_size))
+                image.save(tmp, "JPEG", quality=85)
+            os.replace(tmp, thumbnail)
+            return thumbnail
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Could not make a thumbnail for {path}: {e}")
+            return None
+
+    def prune(self):
+        """Remove the least recently used images while the cache is over its size limit."""
+        self.budget.prune()
+
+
+class ImagePrefetcher:
+    """Downloads images for many prompts at once into an ImageCache.
+
+    Downloads run with bounded concurrency over one pooled HTTP client, and a
+    prompt already being fetched (e.g. by another session on the same loop)
+    is awaited rather than requested twice.
+    """
+
+    def __init__(self, cache: Optional[ImageCache] = None, base_url: str = IMAGE_BASE_URL,
+                 concurrency: int = IMAGE_FETCH_CONCURRENCY, timeout: float = IMAGE_FETCH_TIMEOUT,
+                 retries: int = IMAGE_FETCH_RETRIES):
+        self.cache = cache or ImageCache()
+        self.base_url = base_url
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.retries = retries
+        self._clients = weakref.WeakKeyDictionary()  # loop -> httpx.AsyncClient
+        self._slots = weakref.WeakKeyDictionary()  # loop -> asyncio.Semaphore
+        self._inflight: Dict[tuple, asyncio.Task] = {}
+
+    def _loop_state(self):
+        # httpx pools and semaphores belong to one event loop
+        loop = asyncio.get_running_loop()
+        if loop not in self._clients:
+            self._clients[loop] = httpx.AsyncClient(
+                timeout=self.timeout, follow_redirects=True,
+                limits=httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency)
+            )
+            self._slots[loop] = asyncio.Semaphore(self.concurrency)
+        return loop, self._clients[loop], self._slots[loop]
+
+    async def _download(self, prompt: str) -> Optional[CachedImage]:
+        _, client, slots = self._loop_state()
+        url = image_url(prompt, self.base_url)
+        async with slots:
+            for attempt in range(self.retries + 1):
+                with span("image.fetch", attempt=attempt + 1) as current:
+                    try:
+                        response = await client.get(url)
+                        current.set("status", response.status_code)
+                        if response.status_code == 200:
+                            current.add("image_bytes", len(response.content))
+                            return await asyncio.to_thread(
+                                self.cache.put, prompt, response.content,
+                                response.headers.get("content-type", "image/jpeg"), self.base_url
+                            )
+                        if response.status_code not in RETRYABLE_STATUS:
+                            print(f"⚠️ Image request failed with HTTP {response.status_code}: {url}")
+                            return None
+                    except (httpx.TimeoutException, httpx.NetworkError) as e:
+                        current.set("error", type(e).__name__)
+                if attempt < self.retries:
+                    await asyncio.sleep(0.5 * 2 ** attempt)
+        print(f"⚠️ Image not available after {self.retries + 1} attempts: {url}")
+        return None
+
+    async def fetch(self, prompt: str) -> Optional[CachedImage]:
+        """The cached image for a prompt, downloading it first if needed; None if it can't be fetched."""
+        cached = await asyncio.to_thread(self.cache.get, prompt, self.base_url)
+        if cached is not None:
+            return cached
+        loop, _, _ = self._loop_state()
+        key = (loop, image_key(prompt))
+        task = self._inflight.get(key)
+        if task is None:
+            task = loop.create_task(self._download(prompt))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def prefetch(self, prompts: Iterable[str]) -> Dict[str, Optional[CachedImage]]:
+        """Fetch every prompt's image in parallel; maps each prompt to its cached image (or None)."""
+        prompts = list(dict.fromkeys(prompts))
+        with span("image.prefetch", images=len(prompts)) as current:
+            images = await asyncio.gather(*(self.fetch(prompt) for prompt in prompts))
+            current.set("missing", sum(image is None for image in images))
+        return dict(zip(prompts, images))
+
+
+_PREFETCHER: Optional[ImagePrefetcher] = None
+_PREFETCHER_LOCK = threading.Lock()
+
+
+def get_image_prefetcher() -> ImagePrefetcher:
+    """Process-wide prefetcher over the shared on-disk image cache."""
+    global _PREFETCHER
+    with _PREFETCHER_LOCK:
+        if _PREFETCHER is None:
+            _PREFETCHER = ImagePrefetcher()
+        return _PREFETCHER
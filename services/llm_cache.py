@@ -0,0 +1,161 @@
+# services/llm_cache.py
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from contextlib import closing
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Optional
+
+from pydantic import TypeAdapter
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CACHE_DIR = os.getenv("CAMPAIGN_CACHE_DIR", os.path.join(PROJECT_ROOT, ".cache"))
+
+# Freshness window for cached agent outputs, in seconds; 0 disables caching.
+# Only the agents in LLM_CACHE_AGENTS are cached by default: creative ones are
+# expected to vary between runs and opt in with LLM_CACHE_TTL_<NAME>, e.g.
+# LLM_CACHE_TTL_CREATIVE=3600 (or opt out the same way with 0).
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", "86400"))
+LLM_CACHE_AGENTS = {
+    name.strip() for name in os.getenv("LLM_CACHE_AGENTS", "analyst,strategy,orchestrator,section_detection").split(",")
+    if name.strip()
+}
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "256"))
+# Rows kept in the SQLite file; the oldest writes are evicted beyond this
+LLM_CACHE_MAX_DISK_ENTRIES = int(os.getenv("LLM_CACHE_MAX_DISK_ENTRIES", "5000"))
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", os.path.join(CACHE_DIR, "llm_cache.sqlite3"))
+
+
+def cache_ttl(name: str, override: Optional[float] = None) -> float:
+    """Effective TTL for one agent: explicit override, then env override, then the default.
+
+    The default applies only to agents listed in LLM_CACHE_AGENTS; others are not cached.
+    """
+    if override is not None:
+        return override
+    value = os.getenv(f"LLM_CACHE_TTL_{name.upper()}")
+    if value is not None:
+        return float(value)
+    return LLM_CACHE_TTL if name in LLM_CACHE_AGENTS else 0.0
+
+
+@lru_cache(maxsize=None)
+def output_adapter(output_type) -> TypeAdapter:
+    return TypeAdapter(output_type)
+
+
+def cache_key(deployment: str, system_prompt: str, user_prompt: str, output_type) -> str:
+    """Content address of one agent call: (deployment, system prompt, user prompt, output schema)"""
+    schema = output_adapter(output_type).json_schema()
+    payload = json.dumps([deployment, system_prompt, user_prompt, schema], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """Validated agent outputs, kept in an in-memory LRU backed by a SQLite file."""
+
+    def __init__(self, path: Optional[str] = LLM_CACHE_PATH, max_entries: int = LLM_CACHE_MAX_ENTRIES,
+                 max_disk_entries: int = LLM_CACHE_MAX_DISK_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self._memory = OrderedDict()  # key -> (expires_at, output JSON)
+        self._lock = threading.Lock()
+        if self.path:
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                with closing(self._connect()) as conn, conn:
+                    conn.execute(
+                        "CREATE TABLE IF NOT EXISTS llm_cache ("
+                        "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+                    )
+            except (OSError, sqlite3.Error) as e:
+                print(f"⚠️ LLM disk cache unavailable, using memory only: {e}")
+                self.path = None
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=5)
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._memory.move_to_end(key)
+                    return entry[1]
+                del self._memory[key]
+        if not self.path:
+            return None
+        try:
+            with closing(self._connect()) as conn:
+                row = conn.execute(
+                    "SELECT value, expires_at FROM llm_cache WHERE key = ? AND expires_at > ?", (key, now)
+                ).fetchone()
+        except sqlite3.Error as e:
+            print(f"⚠️ LLM disk cache read failed: {e}")
+            return None
+        if row is None:
+            return None
+        self._remember(key, row[1], row[0])
+        return row[0]
+
+    def put(self, key: str, value: str, ttl: float):
+        expires_at = time.time() + ttl
+        self._remember(key, expires_at, value)
+        if not self.path:
+            return
+        try:
+            with closing(self._connect()) as conn, conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO llm_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                    (key, value, expires_at)
+                )
+                conn.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (time.time(),))
+                # A replaced row gets a new rowid, so rowid order is write order
+                conn.execute(
+                    "DELETE FROM llm_cache WHERE rowid <= "
+                    "(SELECT rowid FROM llm_cache ORDER BY rowid DESC LIMIT 1 OFFSET ?)",
+                    (self.max_disk_entries,)
+                )
+        except sqlite3.Error as e:
+            print(f"⚠️ LLM disk cache write failed: {e}")
+
+    def _remember(self, key: str, expires_at: float, value: str):
+        with self._lock:
+            self._memory[key] = (expires_at, value)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+        if self.path:
+            with closing(self._connect()) as conn, conn:
+                conn.execute("DELETE FROM llm_cache")
+
+
+_CACHE = None
+_CACHE_LOCK = threading.Lock()
+
+
+def get_llm_cache() -> LLMCache:
+    """Process-wide cache shared by every agent"""
+    global _CACHE
+    with _CACHE_LOCK:
+        if _CACHE is None:
+            _CACHE = LLMCache()
+        return _CACHE
+
+
+def load_output(output_type, value: str) -> Any:
+    return output_adapter(output_type).validate_json(value)
+
+
+def dump_output(output_type, output: Any) -> str:
+    return output_adapter(output_type).dump_json(output).decode("utf-8")
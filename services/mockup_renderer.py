@@ -0,0 +1,259 @@
+# services/mockup_renderer.py
+import os
+import json
+import hashlib
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from PIL import Image, ImageDraw, ImageFont
+
+from services.image_cache import DiskBudget, touch
+from services.llm_cache import CACHE_DIR
+from services.telemetry import span
+
+MOCKUP_CACHE_DIR = os.getenv("MOCKUP_CACHE_DIR", os.path.join(CACHE_DIR, "mockups"))
+# Least recently used mockups are removed once the cache grows past this size; 0 keeps everything
+MOCKUP_CACHE_MAX_MB = float(os.getenv("MOCKUP_CACHE_MAX_MB", "200"))
+# Worker processes for batch renders; batches smaller than MOCKUP_POOL_MIN_BATCH render in-process
+MOCKUP_WORKERS = int(os.getenv("MOCKUP_WORKERS", str(min(8, os.cpu_count() or 1))))
+MOCKUP_POOL_MIN_BATCH = int(os.getenv("MOCKUP_POOL_MIN_BATCH", "8"))
+# Bump when the templates change so stale cached renders are not reused
+RENDERER_VERSION = 1
+
+# Pixel size of each format the Creative Asset Generator offers
+FORMAT_SIZES: Dict[str, Tuple[int, int]] = {
+    "Banner": (970, 250),
+    "Poster": (1240, 1754),
+    "Social Media Post": (1080, 1080),
+    "Email Header": (600, 200),
+    "Landing Page": (1440, 810),
+    "Carousel": (1080, 1080),
+    "Story": (1080, 1920),
+    "Video Thumbnail": (1280, 720),
+    "Infographic": (800, 2000),
+    "Brochure": (1275, 1650),
+    "Flyer": (1275, 1650),
+    "Newsletter": (600, 300),
+    "Push Notification": (1024, 512),
+    "Ad Copy": (1200, 628),
+    "Billboard": (1680, 490),
+    "Popup": (800, 600),
+    "Podcast Cover": (1400, 1400),
+    "YouTube Ad": (1280, 720),
+    "Facebook Ad": (1200, 628),
+    "Instagram Story": (1080, 1920),
+}
+
+BOLD_FONTS = ("DejaVuSans-Bold.ttf", "Arial Bold.ttf", "arialbd.ttf")
+REGULAR_FONTS = ("DejaVuSans.ttf", "Arial.ttf", "arial.ttf")
+
+
+@dataclass(frozen=True)
+class MockupSpec:
+    """Everything that determines one rendered mockup (and so its cache key)."""
+    format: str
+    headline: str
+    body: str
+    cta: str = "Learn More"
+    primary_color: str = "#1f4e79"
+    secondary_color: str = "#f39c12"
+
+    def key(self) -> str:
+        payload = json.dumps([RENDERER_VERSION, asdict(self)], sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+@lru_cache(maxsize=256)
+def _font(size: int, bold: bool) -> ImageFont.FreeTypeFont:
+    for name in BOLD_FONTS if bold else REGULAR_FONTS:
+        try:
+            return ImageFont.truetype(name, size)
+        except OSError:
+            continue
+    return ImageFont.load_default(size=size)
+
+
+def _rgb(color: str) -> Tuple[int, int, int]:
+    color = color.lstrip("#")
+    if len(color) == 3:
+        color = "".join(c * 2 for c in color)
+    try:
+        return tuple(int(color[i:i + 2], 16) for i in (0, 2, 4))
+    except ValueError:
+        return (31, 78, 121)
+
+
+def _text_color(background: Tuple[int, int, int]) -> Tuple[int, int, int]:
+    luminance = 0.299 * background[0] + 0.587 * background[1] + 0.114 * background[2]
+    return (20, 20, 20) if luminance > 150 else (255, 255, 255)
+
+
+def _wrap(text: str, font, width: int) -> List[str]:
+    # Words are measured once; a line's width is the sum of its words and spaces
+    space = font.getlength(" ")
+    lines, line, line_width = [], [], 0.0
+    for word in text.split():
+        word_width = font.getlength(word)
+        if line and line_width + space + word_width > width:
+            lines.append(" ".join(line))
+            line, line_width = [word], word_width
+        else:
+            line_width += (space if line else 0) + word_width
+            line.append(word)
+    return lines + [" ".join(line)] if line else lines
+
+
+def _fit_text(text: str, box: Tuple[int, int], bold: bool, max_size: int, min_size: int = 10):
+    """Largest font (and its wrapped lines) for which `text` fits in a (width, height) box."""
+    width, height = box
+    low, high, best = min_size, max(min_size, max_size), None
+    while low <= high:
+        size = (low + high) // 2
+        font = _font(size, bold)
+        lines = _wrap(text, font, width)
+        if len(lines) * size * 1.25 <= height and all(font.getlength(l) <= width for l in lines):
+            best, low = (font, lines, size), size + 1
+        else:
+            high = size - 1
+    if best is None:
+        font = _font(min_size, bold)
+        lines = _wrap(text, font, width)[:max(1, int(height // (min_size * 1.25)))]
+        best = (font, lines, min_size)
+    return best
+
+
+def _draw_lines(draw, lines, font, size: int, origin: Tuple[int, int], fill):
+    x, y = origin
+    for line in lines:
+        draw.text((x, y), line, font=font, fill=fill)
+        y += int(size * 1.25)
+    return y
+
+
+def render_mockup(spec: MockupSpec) -> Image.Image:
+    """Composite headline, copy and CTA over a brand-colour background at the format's pixel size."""
+    width, height = FORMAT_SIZES.get(spec.format, (1080, 1080))
+    primary, secondary = _rgb(spec.primary_color), _rgb(spec.secondary_color)
+    # Vertical gradient from the primary colour to a darker shade of it, built as one column and stretched
+    column = Image.linear_gradient("L").resize((1, height))
+    image = Image.merge("RGB", [
+        column.point(lambda v, c=c: int(c * (1 - 0.4 * v / 255))) for c in primary
+    ]).resize((width, height), Image.NEAREST)
+    draw = ImageDraw.Draw(image)
+    text_color = _text_color(primary)
+    margin = int(min(width, height) * 0.08)
+    wide = width / height >= 2
+
+    if wide:
+        # Copy on the left, CTA button on the right
+        cta_width = int(width * 0.22)
+        text_box = (width - 3 * margin - cta_width, height - 2 * margin)
+        headline_box = (text_box[0], int(text_box[1] * 0.55))
+        body_box = (text_box[0], text_box[1] - headline_box[1])
+        cta_box = (width - margin - cta_width, (height - int(height * 0.3)) // 2, cta_width, int(height * 0.3))
+    else:
+        # Headline, copy and CTA stacked top to bottom, with a brand stripe along the top
+        draw.rectangle((0, 0, width, max(4, height // 60)), fill=secondary)
+        text_box = (width - 2 * margin, height - 2 * margin)
+        headline_box = (text_box[0], int(text_box[1] * 0.3))
+        body_box = (text_box[0], int(text_box[1] * 0.4))
+        cta_height = int(min(height * 0.13, width * 0.12))
+        cta_box = (margin, height - margin - cta_height, int(min(width * 0.5, cta_height * 4)), cta_height)
+
+    font, lines, size = _fit_text(spec.headline, headline_box, True, max_size=headline_box[1])
+    y = _draw_lines(draw, lines, font, size, (margin, margin), text_color)
+    font, lines, size = _fit_text(spec.body, body_box, False, max_size=max(12, size * 2 // 3))
+    _draw_lines(draw, lines, font, size, (margin, y + size // 2), text_color)
+
+    x, y, w, h = cta_box
+    draw.rounded_rectangle((x, y, x + w, y + h), radius=h // 3, fill=secondary)
+    font, lines, size = _fit_text(spec.cta, (int(w * 0.8), int(h * 0.6)), True, max_size=int(h * 0.5))
+    label = " ".join(lines)
+    draw.text((x + w / 2, y + h / 2), label, font=font, fill=_text_color(secondary), anchor="mm")
+    return image
+
+
+class MockupCache:
+    """Rendered mockups on disk, addressed by the hash of their spec, within a size limit."""
+
+    def __init__(self, directory: str = MOCKUP_CACHE_DIR, max_mb: float = MOCKUP_CACHE_MAX_MB):
+        self.directory = directory
+        self.budget = DiskBudget(directory, max_mb * 1024 * 1024)
+
+    def path(self, spec: MockupSpec) -> str:
+        key = spec.key()
+        return os.path.join(self.directory, key[:2], f"{key}.png")
+
+    def get(self, spec: MockupSpec) -> Optional[str]:
+        path = self.path(spec)
+        if not os.path.exists(path):
+            return None
+        touch(path)
+        return path
+
+    def added(self, paths: List[str]):
+        """Account for newly rendered files, pruning the oldest if the cache is over its limit."""
+        self.budget.added(sum(os.path.getsize(path) for path in paths if os.path.exists(path)))
+
+
+_CACHE: Optional[MockupCache] = None
+_CACHE_LOCK = threading.Lock()
+
+
+def get_mockup_cache() -> MockupCache:
+    """Process-wide mockup cache, so its size is tracked across batches."""
+    global _CACHE
+    with _CACHE_LOCK:
+        if _CACHE is None:
+            _CACHE = MockupCache()
+        return _CACHE
+
+
+def render_to_file(spec: MockupSpec, path: str) -> str:
+    """Render one mockup to `path`; module-level so pool workers can run it."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    # Fast zlib level: these are previews, and encoding dominated render time at the default level
+    render_mockup(spec).save(tmp, "PNG", compress_level=1)
+    os.replace(tmp, path)
+    return path
+
+
+_POOL: Optional[ProcessPoolExecutor] = None
+_POOL_LOCK = threading.Lock()
+
+
+def get_mockup_pool() -> ProcessPoolExecutor:
+    """Process-wide worker pool; spawned, since the app process runs threads and event loops."""
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = ProcessPoolExecutor(MOCKUP_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        return _POOL
+
+
+def render_batch(specs: List[MockupSpec], cache: Optional[MockupCache] = None,
+                 pool: Optional[ProcessPoolExecutor] = None) -> List[str]:
+    """Paths of rendered mockups for `specs`, in order; only specs missing from the cache are rendered."""
+    cache = cache or get_mockup_cache()
+    paths = [cache.get(spec) for spec in specs]
+    missing = {}
+    for spec, path in zip(specs, paths):
+        if path is None:
+            missing.setdefault(spec, cache.path(spec))
+    with span("mockup.render_batch", mockups=len(specs), rendered=len(missing)):
+        if pool is None and len(missing) >= MOCKUP_POOL_MIN_BATCH and MOCKUP_WORKERS > 1:
+            pool = get_mockup_pool()
+        if pool is not None and missing:
+            list(pool.map(render_to_file, missing, missing.values(),
+                          chunksize=max(1, len(missing) // (MOCKUP_WORKERS * 4))))
+        else:
+            for spec, path in missing.items():
+                render_to_file(spec, path)
+    if missing:
+        cache.added(list(missing.values()))
+    return [path or cache.path(spec) for spec, path in zip(specs, paths)]
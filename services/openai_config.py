@@ -1,104 +1,206 @@
 # services/openai_config.py
 import os
+import asyncio
+import importlib.util
+import threading
+import weakref
+import httpx
 from pydantic_ai.models.openai import OpenAIModel #Integrates pydantic-ai with OpenAI
 from pydantic_ai.providers.openai import OpenAIProvider #Provider for OpenAI models
-from openai import AsyncAzureOpenAI #SDK to connect to Azure
+from openai import AsyncAzureOpenAI, DefaultAsyncHttpxClient #SDK to connect to Azure
+from services.rate_limiter import RateLimitedTransport
+
+# Connection pool settings for the shared Azure OpenAI HTTP client
+AZURE_MAX_CONNECTIONS = int(os.getenv("AZURE_MAX_CONNECTIONS", "20"))
+AZURE_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("AZURE_MAX_KEEPALIVE_CONNECTIONS", "10"))
+AZURE_KEEPALIVE_EXPIRY = float(os.getenv("AZURE_KEEPALIVE_EXPIRY", "60"))
+# HTTP/2 needs the optional `h2` package (pip install httpx[http2])
+AZURE_HTTP2 = os.getenv("AZURE_HTTP2", "1") == "1" and importlib.util.find_spec("h2") is not None
+AZURE_TIMEOUT = float(os.getenv("AZURE_TIMEOUT", "120"))
+
+AZURE_CLIENT = None
+
+# Process-wide registry: one client and one model per Azure configuration
+_REGISTRY_LOCK = threading.Lock()
+_CLIENTS = {}
+_MODELS = {}
+# Event loop -> ids of the clients whose pool on that loop has been warmed
+_WARMED_LOOPS = weakref.WeakKeyDictionary()
+_WARMUP_TASKS = set()
+
+
+class LoopLocalTransport(httpx.AsyncBaseTransport):
+    """Keeps one keep-alive connection pool per event loop.
+
+    httpx pools can't be used from a loop other than the one that opened the
+    connections, so a shared client dispatches each request to its loop's pool.
+    Threads running their own loops therefore share the client safely, and
+    everything on a long-lived loop shares one pool.
+
+    A pool is closed when its loop shuts down its async generators, which
+    asyncio.run does on exit, so short-lived loops don't leave sockets open.
+    A loop closed without that step is dropped when the next pool is created,
+    leaving its sockets to the garbage collector.
+    """
+
+    def __init__(self, **transport_kwargs):
+        self._transport_kwargs = transport_kwargs
+        self._transports = weakref.WeakKeyDictionary()  # loop -> (transport, closer)
+        self._lock = threading.Lock()
+
+    async def _close_on_shutdown(self, transport: httpx.AsyncHTTPTransport):
+        # Suspended until the loop finalizes it (or aclose() does), then closes the pool on that loop
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._transports.pop(asyncio.get_running_loop(), None)
+            await transport.aclose()
+
+    async def _transport(self) -> httpx.AsyncHTTPTransport:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            entry = self._transports.get(loop)
+            created = entry is None
+            if created:
+                for stale in [other for other in self._transports if other.is_closed()]:
+                    del self._transports[stale]
+                transport = httpx.AsyncHTTPTransport(**self._transport_kwargs)
+                entry = self._transports[loop] = (transport, self._close_on_shutdown(transport))
+        if created:
+            # Starting the generator registers it with this loop for shutdown_asyncgens()
+            await entry[1].asend(None)
+        return entry[0]
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await (await self._transport()).handle_async_request(request)
+
+    async def aclose(self):
+        with self._lock:
+            entry = self._transports.get(asyncio.get_running_loop())
+        if entry is not None:
+            await entry[1].aclose()
+
+
+def _azure_settings():
+    # Load environment variables (ensure python-dotenv is installed and .env file exists)
+    return (
+        os.getenv("AZURE_ENDPOINT"),
+        os.getenv("AZURE_API_VERSION"),
+        os.getenv("AZURE_API_KEY"),
+    )
+
+
+def get_azure_openai_client() -> AsyncAzureOpenAI:
+    """Shared Azure OpenAI client with a pooled, keep-alive HTTP transport"""
+    settings = _azure_settings()
+    if not all(settings):
+        raise ValueError("Missing Azure OpenAI credentials for client creation.")
+
+    with _REGISTRY_LOCK:
+        client = _CLIENTS.get(settings)
+        if client is None:
+            azure_endpoint, api_version, api_key = settings
+            transport = RateLimitedTransport(LoopLocalTransport(
+                http2=AZURE_HTTP2,
+                limits=httpx.Limits(
+                    max_connections=AZURE_MAX_CONNECTIONS,
+                    max_keepalive_connections=AZURE_MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=AZURE_KEEPALIVE_EXPIRY,
+                ),
+            ))
+            client = AsyncAzureOpenAI(
+                azure_endpoint=azure_endpoint,
+                api_version=api_version,
+                api_key=api_key,
+                timeout=AZURE_TIMEOUT,
+                # Retries happen in the rate-limited transport, which shares backoff across callers
+                max_retries=0,
+                http_client=DefaultAsyncHttpxClient(transport=transport, timeout=AZURE_TIMEOUT),
+            )
+            _CLIENTS[settings] = client
+            print(f"✅ Shared Azure OpenAI client created (HTTP/2: {AZURE_HTTP2}, max connections: {AZURE_MAX_CONNECTIONS})")
+        return client
 
 
 def get_azure_openai_model():
+    """Get or create the shared Azure OpenAI model instance"""
+    return create_azure_openai_model()
 
-    """Get or create Azure OpenAI model instance"""
-
-    # global AZURE_CLIENT, OPENAI_MODEL
-
-    return AZURE_CLIENT
 
 def create_azure_openai_model():
-    """Create Azure OpenAI model using proper pydantic-ai configuration"""
-    print("🔧 Setting up Azure OpenAI with pydantic-ai...")
-
+    """Return the shared pydantic-ai model for the configured Azure deployment"""
     try:
-        # Load environment variables (ensure python-dotenv is installed and .env file exists)
-        AZURE_ENDPOINT = os.getenv("AZURE_ENDPOINT")
         AZURE_DEPLOYMENT = os.getenv("AZURE_DEPLOYMENT")
-        AZURE_API_KEY = os.getenv("AZURE_API_KEY")
-        AZURE_API_VERSION = os.getenv("AZURE_API_VERSION")
-
-        if not all([AZURE_ENDPOINT, AZURE_DEPLOYMENT, AZURE_API_KEY, AZURE_API_VERSION]):
+        if not AZURE_DEPLOYMENT or not all(_azure_settings()):
             raise ValueError("One or more Azure OpenAI environment variables are not set.")
 
-        azure_client = AsyncAzureOpenAI(
-            azure_endpoint=AZURE_ENDPOINT,
-            api_version=AZURE_API_VERSION,
-            api_key=AZURE_API_KEY,
-            timeout = 120.0
-        )
-
-        provider = OpenAIProvider(openai_client=azure_client)
-        model = OpenAIModel(
-            model_name=AZURE_DEPLOYMENT,
-            provider=provider
-        )
-
-        print("✅ Model created successfully!")
+        key = (AZURE_DEPLOYMENT, *_azure_settings())
+        model = _MODELS.get(key)
+        if model is not None:
+            return model
+
+        client = get_azure_openai_client()
+        with _REGISTRY_LOCK:
+            model = _MODELS.get(key)
+            if model is None:
+                print("🔧 Setting up Azure OpenAI with pydantic-ai...")
+                provider = OpenAIProvider(openai_client=client)
+                model = OpenAIModel(
+                    model_name=AZURE_DEPLOYMENT,
+                    provider=provider
+                )
+                _MODELS[key] = model
+                print("✅ Model created successfully!")
         return model
 
     except Exception as e:
         print(f"❌ Model creation failed: {e}")
         return None
-    
 
 
-async def create_azure_openai_client():
+async def warm_up_model(model, timeout: float = 5.0):
+    """Open the model's HTTP connection ahead of the first LLM call (best effort)."""
+    client = getattr(model, "client", None)
+    if client is None:
+        return False
+    try:
+        await asyncio.wait_for(client.models.list(), timeout=timeout)
+        return True
+    except Exception as e:
+        print(f"⚠️ Model warm-up skipped: {e}")
+        return False
 
-    """Create and return a raw Azure OpenAI async client"""
 
-    print("🔧 Creating raw Azure OpenAI client...")
+def start_model_warmup(model):
+    """Warm the model's connection pool in the background, once per client and event loop.
 
+    Each loop keeps its own pool, so this costs one request the first time a
+    loop uses the model and nothing afterwards. Callers don't wait for it.
+    """
+    client = getattr(model, "client", None)
+    if client is None:
+        return None
+    loop = asyncio.get_running_loop()
+    with _REGISTRY_LOCK:
+        warmed = _WARMED_LOOPS.setdefault(loop, set())
+        if id(client) in warmed:
+            return None
+        warmed.add(id(client))
+    task = loop.create_task(warm_up_model(model))
+    _WARMUP_TASKS.add(task)
+    task.add_done_callback(_WARMUP_TASKS.discard)
+    return task
 
 
+async def create_azure_openai_client():
+    """Return the shared raw Azure OpenAI async client"""
     global AZURE_CLIENT
 
-
-
     try:
-
-        AZURE_ENDPOINT = os.getenv("AZURE_ENDPOINT")
-
-        AZURE_API_VERSION = os.getenv("AZURE_API_VERSION")
-
-        AZURE_API_KEY = os.getenv("AZURE_API_KEY")
-
-
-
-        if not all([AZURE_ENDPOINT, AZURE_API_VERSION, AZURE_API_KEY]):
-
-            raise ValueError("Missing Azure OpenAI credentials for client creation.")
-
-
-
-        AZURE_CLIENT = AsyncAzureOpenAI(
-
-            azure_endpoint=AZURE_ENDPOINT,
-
-            api_version=AZURE_API_VERSION,
-
-            api_key=AZURE_API_KEY,
-
-            timeout=120.0
-
-        )
-
-
-
-        print("✅ Raw Azure OpenAI client created successfully!")
-
+        AZURE_CLIENT = get_azure_openai_client()
         return AZURE_CLIENT
 
-
-
     except Exception as e:
-
         print(f"❌ Failed to create Azure OpenAI client: {e}")
-
-        return None
\ No newline at end of file
+        return None
@@ -0,0 +1,277 @@
+# services/rate_limiter.py
+import os
+import json
+import time
+import random
+import asyncio
+import threading
+import contextvars
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+import httpx
+
+from services.telemetry import add_to_current, span
+
+# Priority classes; lower values are served first when capacity is short
+INTERACTIVE, PIPELINE, BATCH = 0, 1, 2
+PRIORITY_NAMES = {INTERACTIVE: "interactive", PIPELINE: "pipeline", BATCH: "batch"}
+
+# Deployment quota per minute; 0 means "learn it from the x-ratelimit-* response headers"
+AZURE_RPM = float(os.getenv("AZURE_RPM", "0"))
+AZURE_TPM = float(os.getenv("AZURE_TPM", "0"))
+# Share of each bucket a class may not dip into, keeping headroom for the classes above it
+PRIORITY_RESERVE = {INTERACTIVE: 0.0, PIPELINE: 0.1, BATCH: 0.3}
+# Completion tokens assumed when a request does not set max_tokens
+AZURE_COMPLETION_ESTIMATE = int(os.getenv("AZURE_COMPLETION_ESTIMATE", "1000"))
+# Retries on 429, 5xx and connection errors, with full-jitter exponential backoff
+AZURE_MAX_RETRIES = int(os.getenv("AZURE_MAX_RETRIES", "4"))
+# A read timeout has already cost the full client timeout, so it is retried at most this often
+AZURE_TIMEOUT_RETRIES = int(os.getenv("AZURE_TIMEOUT_RETRIES", "1"))
+# No retry is started once it would end more than this many seconds after the first attempt
+AZURE_RETRY_BUDGET = float(os.getenv("AZURE_RETRY_BUDGET", "180"))
+AZURE_BACKOFF_BASE = float(os.getenv("AZURE_BACKOFF_BASE", "1.0"))
+AZURE_BACKOFF_MAX = float(os.getenv("AZURE_BACKOFF_MAX", "60.0"))
+
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+_WAIT_STEP = 0.25
+
+_PRIORITY: contextvars.ContextVar[int] = contextvars.ContextVar("request_priority", default=PIPELINE)
+
+
+@contextmanager
+def request_priority(priority: int):
+    """Run the enclosed LLM calls (and tasks started inside) in the given priority class."""
+    token = _PRIORITY.set(priority)
+    try:
+        yield
+    finally:
+        _PRIORITY.reset(token)
+
+
+def current_priority() -> int:
+    return _PRIORITY.get()
+
+
+class TokenBucket:
+    """Per-minute quota refilled continuously; capacity 0 means unlimited until learned."""
+
+    def __init__(self, per_minute: float = 0.0):
+        self.capacity = per_minute
+        self.level = per_minute
+        self._updated = time.monotonic()
+
+    def refill(self, now: float):
+        if self.capacity:
+            self.level = min(self.capacity, self.level + (now - self._updated) * self.capacity / 60.0)
+        self._updated = now
+
+    def wait_time(self, amount: float, reserve: float) -> float:
+        """Seconds until `amount` can be taken without going below the reserved share."""
+        if not self.capacity:
+            return 0.0
+        floor = self.capacity * reserve
+        amount = min(amount, self.capacity - floor)
+        missing = floor + amount - self.level
+        return max(0.0, missing * 60.0 / self.capacity)
+
+    def observe(self, limit: Optional[float], remaining: Optional[float]):
+        learned = not self.capacity
+        if limit:
+            self.capacity = limit
+        if remaining is None:
+            if learned and self.capacity:
+                self.level = self.capacity
+            return
+        if learned:
+            # Without a limit header, assume the first response came at the start of the window
+            self.capacity = self.capacity or remaining
+            self.level = remaining
+        else:
+            self.level = min(self.level, remaining)
+
+
+def _header_number(headers: httpx.Headers, name: str) -> Optional[float]:
+    try:
+        return float(headers[name])
+    except (KeyError, ValueError):
+        return None
+
+
+def retry_after(headers: httpx.Headers) -> Optional[float]:
+    """Server-requested delay from retry-after-ms / retry-after, in seconds."""
+    value = _header_number(headers, "retry-after-ms")
+    if value is not None:
+        return value / 1000.0
+    return _header_number(headers, "retry-after")
+
+
+def estimate_request_tokens(request: httpx.Request) -> int:
+    """Tokens the request counts against the TPM quota: prompt (by size) plus the completion allowance."""
+    if request.method != "POST":
+        return 0
+    try:
+        body = request.content or b""
+    except httpx.RequestNotRead:
+        body = b""
+    completion = AZURE_COMPLETION_ESTIMATE
+    try:
+        payload = json.loads(body)
+        completion = payload.get("max_completion_tokens") or payload.get("max_tokens") or completion
+    except (ValueError, AttributeError):
+        pass
+    return len(body) // 4 + int(completion)
+
+
+class RateLimiter:
+    """Process-wide request/token buckets shared by every event loop using the Azure client.
+
+    Buckets start from AZURE_RPM/AZURE_TPM (when set) and follow the x-ratelimit-*
+    headers of each response. A 429 pauses all callers until its retry-after has
+    passed; while a class is waiting, lower classes do not start new requests.
+    """
+
+    def __init__(self, rpm: float = AZURE_RPM, tpm: float = AZURE_TPM):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self._paused_until = 0.0
+        self._waiting: Dict[int, int] = dict.fromkeys(PRIORITY_NAMES, 0)
+        self._lock = threading.Lock()
+        self.stats = {"requests": 0, "throttled": 0, "retries": 0, "waited": 0.0}
+
+    def _try_acquire(self, priority: int, tokens: int) -> float:
+        """Take capacity and return 0, or return how long to wait before trying again."""
+        with self._lock:
+            now = time.monotonic()
+            if now < self._paused_until:
+                return self._paused_until - now
+            if any(self._waiting[p] for p in self._waiting if p < priority):
+                return _WAIT_STEP
+            self.requests.refill(now)
+            self.tokens.refill(now)
+            reserve = PRIORITY_RESERVE.get(priority, 0.0)
+            wait = max(self.requests.wait_time(1, reserve), self.tokens.wait_time(tokens, reserve))
+            if wait > 0:
+                return wait
+            if self.requests.capacity:
+                self.requests.level -= 1
+            if self.tokens.capacity:
+                self.tokens.level -= tokens
+            self.stats["requests"] += 1
+            return 0.0
+
+    async def acquire(self, priority: int, tokens: int):
+        wait = self._try_acquire(priority, tokens)
+        if not wait:
+            return
+        start = time.monotonic()
+        with self._lock:
+            self._waiting[priority] += 1
+            self.stats["throttled"] += 1
+        try:
+            while wait:
+                await asyncio.sleep(min(wait, _WAIT_STEP))
+                wait = self._try_acquire(priority, tokens)
+        finally:
+            with self._lock:
+                self._waiting[priority] -= 1
+                self.stats["waited"] += time.monotonic() - start
+
+    def observe(self, response: httpx.Response):
+        """Sync the buckets with the quota the service reports."""
+        headers = response.headers
+        with self._lock:
+            self.requests.observe(
+                _header_number(headers, "x-ratelimit-limit-requests"),
+                _header_number(headers, "x-ratelimit-remaining-requests"),
+            )
+            self.tokens.observe(
+                _header_number(headers, "x-ratelimit-limit-tokens"),
+                _header_number(headers, "x-ratelimit-remaining-tokens"),
+            )
+
+    def pause(self, seconds: float):
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+def backoff_delay(attempt: int) -> float:
+    """Full-jitter exponential backoff for the given (1-based) retry."""
+    return random.uniform(0, min(AZURE_BACKOFF_MAX, AZURE_BACKOFF_BASE * 2 ** attempt))
+
+
+class RateLimitedTransport(httpx.AsyncBaseTransport):
+    """Waits for rate-limit capacity before each request and retries throttled or failed ones.
+
+    Retries stop after `max_retries`, after `timeout_retries` read timeouts or
+    when the next one would start past `retry_budget` seconds; the last
+    response (or error) is then passed on to the caller.
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, limiter: Optional[RateLimiter] = None,
+                 max_retries: int = AZURE_MAX_RETRIES, timeout_retries: int = AZURE_TIMEOUT_RETRIES,
+                 retry_budget: float = AZURE_RETRY_BUDGET):
+        self._transport = transport
+        self.limiter = limiter or get_rate_limiter()
+        self.max_retries = max_retries
+        self.timeout_retries = timeout_retries
+        self.retry_budget = retry_budget
+
+    def _over_budget(self, started: float, delay: float) -> bool:
+        if time.monotonic() - started + delay <= self.retry_budget:
+            return False
+        print(f"⚠️ Azure OpenAI retry budget of {self.retry_budget:.0f}s spent, giving up")
+        return True
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        priority = current_priority()
+        tokens = estimate_request_tokens(request)
+        started = time.monotonic()
+        read_timeouts = 0
+        for attempt in range(self.max_retries + 1):
+            waited = time.perf_counter()
+            await self.limiter.acquire(priority, tokens)
+            add_to_current("rate_limit_wait_seconds", time.perf_counter() - waited)
+            try:
+                with span("llm.request", attempt=attempt + 1, priority=PRIORITY_NAMES.get(priority)) as current:
+                    response = await self._transport.handle_async_request(request)
+                    current.set("http_status", response.status_code)
+            except (httpx.TimeoutException, httpx.NetworkError) as e:
+                read_timeouts += isinstance(e, httpx.ReadTimeout)
+                if attempt == self.max_retries or read_timeouts > self.timeout_retries:
+                    raise
+                delay = backoff_delay(attempt + 1)
+                if self._over_budget(started, delay):
+                    raise
+                print(f"⚠️ Azure OpenAI {type(e).__name__}, retrying in {delay:.1f}s")
+            else:
+                self.limiter.observe(response)
+                if response.status_code not in RETRYABLE_STATUS or attempt == self.max_retries:
+                    return response
+                delay = retry_after(response.headers) or backoff_delay(attempt + 1)
+                if response.status_code == 429:
+                    self.limiter.pause(delay)
+                if self._over_budget(started, delay):
+                    return response
+                await response.aclose()
+                print(f"⚠️ Azure OpenAI {response.status_code} ({PRIORITY_NAMES.get(priority)}), "
+                      f"retry {attempt + 1}/{self.max_retries} in {delay:.1f}s")
+            self.limiter.stats["retries"] += 1
+            add_to_current("http_retries")
+            await asyncio.sleep(delay)
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+_LIMITER: Optional[RateLimiter] = None
+_LIMITER_LOCK = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Process-wide limiter shared by every Azure OpenAI client."""
+    global _LIMITER
+    with _LIMITER_LOCK:
+        if _LIMITER is None:
+            _LIMITER = RateLimiter()
+        return _LIMITER
@@ -0,0 +1,250 @@
+# services/telemetry.py
+import os
+import json
+import time
+import uuid
+import threading
+import contextvars
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+try:
+    from opentelemetry import trace
+except ImportError:
+    trace = None
+
+# Port of the local /metrics (Prometheus text) and /traces (JSON) endpoint; 0 disables it
+METRICS_PORT = int(os.getenv("CAMPAIGN_METRICS_PORT", "9464"))
+METRICS_HOST = os.getenv("CAMPAIGN_METRICS_HOST", "127.0.0.1")
+# Finished spans kept in memory for /traces
+TRACE_BUFFER_SIZE = int(os.getenv("CAMPAIGN_TRACE_BUFFER", "2000"))
+# Span duration histogram buckets, in seconds
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+_TRACER = trace.get_tracer("campaign_studio") if trace is not None else None
+_CURRENT: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("current_span", default=None)
+
+
+class Span:
+    """One timed unit of work with attributes and counters (tokens, retries, cache hits).
+
+    Counters added to a span are also summed into its ancestors when it ends, so a
+    pipeline span reports the tokens and retries of every agent call beneath it.
+    """
+
+    def __init__(self, name: str, attributes: Dict[str, Any], parent: Optional["Span"]):
+        self.name = name
+        self.parent = parent
+        self.trace_id = parent.trace_id if parent else uuid.uuid4().hex
+        self.span_id = uuid.uuid4().hex[:16]
+        self.attributes = dict(attributes)
+        self.counters: Dict[str, float] = {}
+        self.rollup: Dict[str, float] = {}
+        self.start = time.time()
+        self.duration: Optional[float] = None
+        # Process CPU time while the span was open; includes overlapping spans on other tasks/threads
+        self.cpu: Optional[float] = None
+        self.error: Optional[str] = None
+        self._otel = None
+
+    def set(self, key: str, value: Any):
+        self.attributes[key] = value
+        if self._otel is not None and value is not None:
+            self._otel.set_attribute(key, value)
+
+    def add(self, key: str, amount: float = 1):
+        self.counters[key] = self.counters.get(key, 0) + amount
+
+    def totals(self) -> Dict[str, float]:
+        totals = dict(self.rollup)
+        for key, value in self.counters.items():
+            totals[key] = totals.get(key, 0) + value
+        return totals
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent.span_id if self.parent else None,
+            "start": self.start,
+            "duration": self.duration,
+            "cpu": self.cpu,
+            "attributes": {**self.attributes, **self.totals()},
+            "error": self.error,
+        }
+
+
+class Metrics:
+    """Span duration histograms and counters, rendered in the Prometheus text format."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.durations: Dict[str, List[float]] = {}  # span -> [bucket counts..., count, sum]
+        self.counters: Dict[Tuple[str, str], float] = {}  # (counter, span) -> total
+        self.errors: Dict[str, int] = {}
+
+    def record(self, span: Span):
+        with self._lock:
+            histogram = self.durations.setdefault(span.name, [0] * (len(DURATION_BUCKETS) + 2))
+            for i, bound in enumerate(DURATION_BUCKETS):
+                if span.duration <= bound:
+                    histogram[i] += 1
+            histogram[-2] += 1
+            histogram[-1] += span.duration
+            for key, value in span.counters.items():
+                self.counters[(key, span.name)] = self.counters.get((key, span.name), 0) + value
+            if span.error:
+                self.errors[span.name] = self.errors.get(span.name, 0) + 1
+
+    def render(self) -> str:
+        lines = [
+            "# HELP campaign_span_seconds Duration of instrumented pipeline steps and calls",
+            "# TYPE campaign_span_seconds histogram",
+        ]
+        with self._lock:
+            for name, histogram in sorted(self.durations.items()):
+                for bound, count in zip(DURATION_BUCKETS, histogram):
+                    lines.append(f'campaign_span_seconds_bucket{{span="{name}",le="{bound}"}} {count}')
+                lines.append(f'campaign_span_seconds_bucket{{span="{name}",le="+Inf"}} {histogram[-2]}')
+                lines.append(f'campaign_span_seconds_count{{span="{name}"}} {histogram[-2]}')
+                lines.append(f'campaign_span_seconds_sum{{span="{name}"}} {histogram[-1]:.6f}')
+            lines += ["# TYPE campaign_span_errors_total counter"]
+            lines += [f'campaign_span_errors_total{{span="{name}"}} {count}' for name, count in sorted(self.errors.items())]
+            for key in sorted({key for key, _ in self.counters}):
+                lines.append(f"# TYPE campaign_{key}_total counter")
+                lines += [
+                    f'campaign_{key}_total{{span="{name}"}} {value:g}'
+                    for (counter, name), value in sorted(self.counters.items()) if counter == key
+                ]
+        return "\n".join(lines) + "\n"
+
+
+METRICS = Metrics()
+RECENT_SPANS: deque = deque(maxlen=TRACE_BUFFER_SIZE)
+
+
+def current_span() -> Optional[Span]:
+    return _CURRENT.get()
+
+
+def add_to_current(key: str, amount: float = 1):
+    """Count something (a retry, a cache hit) on the enclosing span, if there is one."""
+    active = _CURRENT.get()
+    if active is not None:
+        active.add(key, amount)
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Span]:
+    """Time the enclosed block as a child of the current span (and of the current OpenTelemetry span)."""
+    parent = _CURRENT.get()
+    attributes = {key: value for key, value in attributes.items() if value is not None}
+    current = Span(name, attributes, parent)
+    token = _CURRENT.set(current)
+    otel_context = _TRACER.start_as_current_span(name, attributes=attributes) if _TRACER else nullcontext()
+    started, cpu_started = time.perf_counter(), time.process_time()
+    with otel_context as otel_span:
+        current._otel = otel_span
+        try:
+            yield current
+        except BaseException as e:
+            current.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            current.duration = time.perf_counter() - started
+            current.cpu = time.process_time() - cpu_started
+            _CURRENT.reset(token)
+            totals = current.totals()
+            if otel_span is not None:
+                for key, value in totals.items():
+                    otel_span.set_attribute(key, value)
+            if parent is not None:
+                for key, value in totals.items():
+                    parent.rollup[key] = parent.rollup.get(key, 0) + value
+            METRICS.record(current)
+            RECENT_SPANS.append(current.to_dict())
+
+def recent_traces(limit: int = 50) -> List[Dict[str, Any]]:
+    """The latest finished traces, newest first, each with its spans in start order."""
+    traces: Dict[str, List[Dict[str, Any]]] = {}
+    for record in reversed(RECENT_SPANS):
+        if record["trace_id"] not in traces and len(traces) >= limit:
+            continue
+        traces.setdefault(record["trace_id"], []).append(record)
+    return [
+        {"trace_id": trace_id, "spans": sorted(spans, key=lambda s: s["start"])}
+        for trace_id, spans in traces.items()
+    ]
+
+
+def configure_tracing() -> bool:
+    """Export spans over OTLP when OTEL_EXPORTER_OTLP_ENDPOINT is set and the OpenTelemetry SDK is installed."""
+    if trace is None or not os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT"):
+        return False
+    try:
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+    except ImportError:
+        print("⚠️ OTEL_EXPORTER_OTLP_ENDPOINT is set but opentelemetry-sdk/exporter is not installed")
+        return False
+    provider = TracerProvider(resource=Resource.create({
+        "service.name": os.getenv("OTEL_SERVICE_NAME", "campaign-studio")
+    }))
+    provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter()))
+    trace.set_tracer_provider(provider)
+    print("✅ OpenTelemetry trace export enabled")
+    return True
+
+
+class _TelemetryHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.startswith("/metrics"):
+            body, content_type = METRICS.render(), "text/plain; version=0.0.4"
+        elif self.path.startswith("/traces"):
+            body, content_type = json.dumps(recent_traces(), default=str), "application/json"
+        else:
+            self.send_error(404)
+            return
+        payload = body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_SERVER: Optional[ThreadingHTTPServer] = None
+_SERVER_LOCK = threading.Lock()
+_STARTED = False
+
+
+def start_telemetry(port: int = METRICS_PORT) -> Optional[ThreadingHTTPServer]:
+    """Set up trace export and serve /metrics and /traces once per process.
+
+    Only the first call does anything, so a port that can't be bound is not
+    retried (and tracing not set up again) on every Streamlit rerun.
+    """
+    global _SERVER, _STARTED
+    with _SERVER_LOCK:
+        if _STARTED:
+            return _SERVER
+        _STARTED = True
+        configure_tracing()
+        if not port:
+            return None
+        try:
+            _SERVER = ThreadingHTTPServer((METRICS_HOST, port), _TelemetryHandler)
+        except OSError as e:
+            print(f"⚠️ Metrics endpoint not started on port {port}: {e}")
+            return None
+        threading.Thread(target=_SERVER.serve_forever, name="campaign-metrics", daemon=True).start()
+        print(f"📈 Metrics at http://{METRICS_HOST}:{port}/metrics, traces at /traces")
+        return _SERVER
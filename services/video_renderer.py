@@ -0,0 +1,341 @@
+# services/video_renderer.py
+import os
+import json
+import time
+import random
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs, urlencode, urlparse
+
+import httpx
+
+from database.video_jobs import FAILED, READY, VideoJob, VideoJobStore, get_video_job_store
+from services.telemetry import span
+
+# Elai.io video API: POST <url>render starts a render, GET <url><video id> reports its status
+ELAI_API_URL = os.getenv("ELAI_API_URL", "https://api.elai.io/api/video/")
+ELAI_API_TOKEN = os.getenv("ELAI_API_TOKEN", "")
+VIDEO_TEMPLATE_ID = os.getenv("VIDEO_TEMPLATE_ID", "default")
+# Public URL the render service calls when a video is done; it must reach the local receiver below
+VIDEO_WEBHOOK_URL = os.getenv("VIDEO_WEBHOOK_URL", "")
+VIDEO_WEBHOOK_SECRET = os.getenv("VIDEO_WEBHOOK_SECRET", "")
+VIDEO_WEBHOOK_HOST = os.getenv("VIDEO_WEBHOOK_HOST", "127.0.0.1")
+VIDEO_WEBHOOK_PORT = int(os.getenv("VIDEO_WEBHOOK_PORT", "8788"))
+VIDEO_WEBHOOK_PATH = "/video-webhook"
+# Fallback polling: first interval, growth per unanswered poll and cap, in seconds
+VIDEO_POLL_INTERVAL = float(os.getenv("VIDEO_POLL_INTERVAL", "5"))
+VIDEO_POLL_BACKOFF = float(os.getenv("VIDEO_POLL_BACKOFF", "1.5"))
+VIDEO_POLL_MAX_INTERVAL = float(os.getenv("VIDEO_POLL_MAX_INTERVAL", "60"))
+VIDEO_POLL_CONCURRENCY = int(os.getenv("VIDEO_POLL_CONCURRENCY", "10"))
+# While webhooks are being received, the first poll of a video waits this long
+VIDEO_WEBHOOK_GRACE = float(os.getenv("VIDEO_WEBHOOK_GRACE", "60"))
+# A render that hasn't finished after this many seconds is failed
+VIDEO_TIMEOUT = float(os.getenv("VIDEO_TIMEOUT", "900"))
+VIDEO_MAX_CONNECTIONS = int(os.getenv("VIDEO_MAX_CONNECTIONS", "20"))
+VIDEO_REQUEST_TIMEOUT = float(os.getenv("VIDEO_REQUEST_TIMEOUT", "30"))
+
+READY_STATUSES = {"ready", "rendered", "done", "completed"}
+FAILED_STATUSES = {"error", "failed"}
+TIMEOUT_ERROR = "⏰ Timeout: Video was not generated within the expected time."
+
+
+def parse_status(data: Dict[str, Any]):
+    """(status, video URL, error) from a status response or webhook body; status None while rendering."""
+    if not isinstance(data, dict):
+        return None, None, None
+    status = str(data.get("status", "")).lower()
+    if status in READY_STATUSES:
+        return READY, data.get("videoUrl") or data.get("url"), None
+    if status in FAILED_STATUSES:
+        return FAILED, None, data.get("error") or data.get("message") or "Video generation failed on server."
+    return None, None, None
+
+
+class VideoRenderService:
+    """Renders many videos at once from one event loop, without a thread per video.
+
+    Submissions share one pooled HTTP client. A video finishes when the render
+    service calls the webhook receiver or, failing that, when the poller sees
+    it done: one task polls every unfinished video, each on its own growing
+    interval. Jobs are kept in a VideoJobStore, and unfinished ones are picked up
+    again when the service starts.
+    """
+
+    def __init__(self, api_url: str = ELAI_API_URL, token: str = ELAI_API_TOKEN,
+                 template_id: str = VIDEO_TEMPLATE_ID, webhook_url: str = VIDEO_WEBHOOK_URL,
+                 webhook_secret: str = VIDEO_WEBHOOK_SECRET, store: Optional[VideoJobStore] = None,
+                 poll_interval: float = VIDEO_POLL_INTERVAL, max_poll_interval: float = VIDEO_POLL_MAX_INTERVAL,
+                 webhook_grace: float = VIDEO_WEBHOOK_GRACE, timeout: float = VIDEO_TIMEOUT):
+        self.api_url = api_url
+        self.token = token
+        self.template_id = template_id
+        self.webhook_url = webhook_url
+        self.webhook_secret = webhook_secret
+        self.store = store or get_video_job_store()
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.webhook_grace = webhook_grace
+        self.timeout = timeout
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.webhook_server: Optional[ThreadingHTTPServer] = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._poller: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._poll_slots: Optional[asyncio.Semaphore] = None
+        self._waiters: Dict[str, asyncio.Future] = {}
+        self._next_poll: Dict[str, float] = {}  # video id -> monotonic time of its next poll
+        self._intervals: Dict[str, float] = {}
+        self._deadlines: Dict[str, float] = {}
+        # Callbacks that beat the submission's own bookkeeping, replayed once the job is stored
+        self._early_webhooks: Dict[str, Dict[str, Any]] = {}
+        self._early_lock = threading.Lock()
+
+    @property
+    def expects_webhooks(self) -> bool:
+        return bool(self.webhook_url) and self.webhook_server is not None
+
+    def _start(self):
+        """Bind to the running loop on first use and resume polling unfinished jobs."""
+        if self.loop is not None:
+            return
+        self.loop = asyncio.get_running_loop()
+        self._client = httpx.AsyncClient(
+            base_url=self.api_url,
+            headers={"Authorization": f"Bearer {self.token}"},
+            timeout=VIDEO_REQUEST_TIMEOUT,
+            limits=httpx.Limits(max_connections=VIDEO_MAX_CONNECTIONS, max_keepalive_connections=VIDEO_MAX_CONNECTIONS)
+        )
+        self._wake = asyncio.Event()
+        self._poll_slots = asyncio.Semaphore(VIDEO_POLL_CONCURRENCY)
+        self._poller = self.loop.create_task(self._poll_forever())
+        pending = self.store.pending()
+        for job in pending:
+            self._track(job.video_id, first_poll=0.0, started=job.created_at)
+        if pending:
+            print(f"🔄 Resuming {len(pending)} unfinished video render(s)")
+
+    def _track(self, video_id: str, first_poll: float, started: Optional[float] = None):
+        now = time.monotonic()
+        self._waiters.setdefault(video_id, self.loop.create_future())
+        self._intervals[video_id] = self.poll_interval
+        self._next_poll[video_id] = now + first_poll
+        elapsed = time.time() - started if started else 0.0
+        self._deadlines[video_id] = now + max(0.0, self.timeout - elapsed)
+        self._wake.set()
+
+    def _payload(self, prompt: str) -> Dict[str, Any]:
+        payload = {"template_id": self.template_id, "presentation_data": {"slides": [{"text": prompt}]}}
+        if self.webhook_url:
+            query = f"?{urlencode({'token': self.webhook_secret})}" if self.webhook_secret else ""
+            payload["webhook"] = self.webhook_url + query
+        return payload
+
+    async def submit(self, prompt: str) -> str:
+        """Start rendering a video and return its id."""
+        self._start()
+        with span("video.submit"):
+            response = await self._client.post("render", json=self._payload(prompt))
+        if response.status_code != 200:
+            raise RuntimeError(
+                f"❌ Failed to start video generation. Status code: {response.status_code}, Response: {response.text}"
+            )
+        body = response.json()
+        video_id = body.get("videoId") if isinstance(body, dict) else None
+        if not video_id:
+            raise RuntimeError(f"❌ Video generation started without a video ID. Response: {response.text}")
+        await asyncio.to_thread(self.store.add, video_id, prompt)
+        self._track(video_id, first_poll=self.webhook_grace if self.expects_webhooks else self.poll_interval)
+        with self._early_lock:
+            early = self._early_webhooks.pop(video_id, None)
+        if early is not None:
+            await asyncio.to_thread(self.handle_webhook, early)
+        print(f"🎥 Video ID received: {video_id}")
+        return video_id
+
+    async def wait(self, video_id: str, timeout: Optional[float] = None) -> VideoJob:
+        """The finished job (ready or failed) once its render completes.
+
+        Without `timeout`, waits until the job's render deadline plus one maximum
+        poll interval, so a stalled poller can't block the caller forever. A job
+        still unfinished after the wait is failed.
+        """
+        self._start()
+        job = await asyncio.to_thread(self.store.get, video_id)
+        if job is None:
+            raise KeyError(f"Unknown video {video_id}")
+        if job.finished:
+            return job
+        if video_id not in self._waiters:
+            self._track(video_id, first_poll=0.0, started=job.created_at)
+        if timeout is None:
+            deadline = self._deadlines.get(video_id, time.monotonic() + self.timeout)
+            timeout = max(0.0, deadline - time.monotonic()) + self.max_poll_interval
+        try:
+            return await asyncio.wait_for(asyncio.shield(self._waiters[video_id]), timeout)
+        except asyncio.TimeoutError:
+            job = await asyncio.to_thread(self._finish, video_id, FAILED, None, TIMEOUT_ERROR, "timeout")
+            if job is not None:
+                self._resolve(job)
+            return job
+
+    async def render(self, prompt: str) -> VideoJob:
+        return await self.wait(await self.submit(prompt))
+
+    async def render_many(self, prompts: List[str]) -> List[VideoJob]:
+        """Render all prompts concurrently; a failed submission is returned as a failed job."""
+        async def one(prompt: str) -> VideoJob:
+            try:
+                return await self.render(prompt)
+            except Exception as e:
+                return VideoJob(video_id="", prompt=prompt, status=FAILED, error=str(e))
+        return await asyncio.gather(*(one(prompt) for prompt in prompts))
+
+    def _finish(self, video_id: str, status: str, video_url: Optional[str], error: Optional[str],
+                completed_by: str) -> Optional[VideoJob]:
+        """Store the outcome unless the job already has one, and return the stored job (None if unknown)."""
+        self.store.finish(video_id, status, video_url, error, completed_by)
+        return self.store.get(video_id)
+
+    def _resolve(self, job: VideoJob):
+        """Stop polling a finished job and wake whoever waits for it (runs on the service's loop)."""
+        self._next_poll.pop(job.video_id, None)
+        self._intervals.pop(job.video_id, None)
+        self._deadlines.pop(job.video_id, None)
+        waiter = self._waiters.pop(job.video_id, None)
+        if waiter is not None and not waiter.done():
+            waiter.set_result(job)
+            print(f"{'✅' if job.status == READY else '❌'} Video {job.video_id} {job.status} ({job.completed_by})")
+
+    def handle_webhook(self, data: Dict[str, Any]) -> bool:
+        """Complete a job from a render-service callback; safe to call from any thread."""
+        video_id = data.get("videoId") or data.get("_id") or data.get("id")
+        status, video_url, error = parse_status(data)
+        if not video_id or status is None:
+            return False
+        job = self._finish(video_id, status, video_url, error, "webhook")
+        if job is None:
+            with self._early_lock:
+                self._early_webhooks[video_id] = data
+        elif self.loop is not None:
+            self.loop.call_soon_threadsafe(self._resolve, job)
+        return True
+
+    async def _poll_forever(self):
+        while True:
+            try:
+                await self._poll_due()
+            except Exception as e:
+                # Keep polling (and enforcing deadlines) whatever went wrong in one round
+                print(f"⚠️ Video poller error, restarting: {e}")
+                await asyncio.sleep(self.poll_interval)
+
+    async def _poll_due(self):
+        now = time.monotonic()
+        due = [video_id for video_id, at in self._next_poll.items() if at <= now]
+        if due:
+            await asyncio.gather(*(self._poll(video_id) for video_id in due))
+            return
+        self._wake.clear()
+        delay = min(self._next_poll.values()) - now if self._next_poll else None
+        try:
+            await asyncio.wait_for(self._wake.wait(), delay)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _poll(self, video_id: str):
+        if video_id not in self._next_poll:
+            return
+        try:
+            await self._poll_once(video_id)
+        except Exception as e:
+            # One video's failure (a store error, an odd response) must not stop the others
+            print(f"⚠️ Polling video {video_id} failed: {e}")
+            self._back_off(video_id)
+
+    def _back_off(self, video_id: str):
+        # Still rendering: back off, with jitter so videos submitted together spread out
+        if video_id in self._next_poll:
+            interval = min(self.max_poll_interval, self._intervals[video_id] * VIDEO_POLL_BACKOFF)
+            self._intervals[video_id] = interval
+            self._next_poll[video_id] = time.monotonic() + interval * random.uniform(0.8, 1.2)
+
+    async def _poll_once(self, video_id: str):
+        if time.monotonic() >= self._deadlines[video_id]:
+            job = await asyncio.to_thread(self._finish, video_id, FAILED, None, TIMEOUT_ERROR, "poll")
+            if job is not None:
+                self._resolve(job)
+            return
+        status = video_url = error = None
+        async with self._poll_slots:
+            with span("video.poll") as current:
+                try:
+                    response = await self._client.get(video_id)
+                    current.set("status_code", response.status_code)
+                    if response.status_code == 200:
+                        status, video_url, error = parse_status(response.json())
+                except (httpx.HTTPError, ValueError) as e:
+                    current.set("error", type(e).__name__)
+        await asyncio.to_thread(self.store.record_poll, video_id)
+        if status is not None:
+            job = await asyncio.to_thread(self._finish, video_id, status, video_url, error, "poll")
+            if job is not None:
+                self._resolve(job)
+            return
+        self._back_off(video_id)
+
+    def start_webhook_receiver(self, port: int = VIDEO_WEBHOOK_PORT,
+                               host: str = VIDEO_WEBHOOK_HOST) -> Optional[ThreadingHTTPServer]:
+        """Serve POST /video-webhook on a background thread; port 0 picks a free port."""
+        if self.webhook_server is not None:
+            return self.webhook_server
+        try:
+            server = ThreadingHTTPServer((host, port), _WebhookHandler)
+        except OSError as e:
+            print(f"⚠️ Video webhook receiver not started on port {port}: {e}")
+            return None
+        server.daemon_threads = True
+        server.service = self
+        threading.Thread(target=server.serve_forever, name="video-webhook", daemon=True).start()
+        self.webhook_server = server
+        print(f"📬 Video webhooks at http://{host}:{server.server_address[1]}{VIDEO_WEBHOOK_PATH}")
+        return server
+
+    async def close(self):
+        if self._poller is not None:
+            self._poller.cancel()
+        if self._client is not None:
+            await self._client.aclose()
+        if self.webhook_server is not None:
+            self.webhook_server.shutdown()
+            self.webhook_server.server_close()
+            self.webhook_server = None
+        self.loop = None
+
+
+class _WebhookHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path != VIDEO_WEBHOOK_PATH:
+            self.send_error(404)
+            return
+        service: VideoRenderService = self.server.service
+        if service.webhook_secret and parse_qs(url.query).get("token", [""])[0] != service.webhook_secret:
+            self.send_error(403)
+            return
+        try:
+            data = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        except ValueError:
+            self.send_error(400)
+            return
+        accepted = service.handle_webhook(data) if isinstance(data, dict) else False
+        payload = json.dumps({"accepted": accepted}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
@@ -1,10 +1,21 @@
 import streamlit as st
+import os
+import json
 import asyncio
-import time
+import threading
 from services.openai_config import create_azure_openai_model
 from pydantic_ai import Agent
-from pydantic import BaseModel
-from typing import List
+from services.agent_runner import run_agent
+from services.telemetry import span
+from services.image_cache import get_image_prefetcher, image_url
+from services.mockup_renderer import MockupSpec, render_batch
+from core.events import EventBus
+from core.jobs import Job, JobQueueFull, get_job_runner
+from pydantic import BaseModel, Field, ValidationError
+from typing import Any, Dict, List, Optional, Tuple
+
+# Default of the page's "single call" toggle: one bundled request instead of three
+CREATIVE_BUNDLE_MODE = os.getenv("CREATIVE_BUNDLE_MODE", "0").lower() in ("1", "true", "yes")
 
 class CreativeVariation(BaseModel):
     name: str
@@ -20,23 +31,96 @@ class SocialPost(BaseModel):
     hashtags: List[str]
     social_post: str
 
+class CreativeBundleItem(BaseModel):
+    """One variation with its A/B test and social post, as returned by the bundled call."""
+    name: str = Field(min_length=1)
+    text: str = Field(min_length=1)
+    hypothesis: str = Field(min_length=1)
+    metric: str = Field(min_length=1)
+    hashtags: List[str] = Field(min_length=1)
+    social_post: str = Field(min_length=1)
+
+class RepairedBundleItem(CreativeBundleItem):
+    """A completed variation from the repair call, tagged with the index of the draft it replaces."""
+    index: int
+
+class DraftBundleItem(BaseModel):
+    """Lenient shape of a bundled item, so one malformed item doesn't fail the whole response."""
+    name: Optional[str] = None
+    text: Optional[str] = None
+    hypothesis: Optional[str] = None
+    metric: Optional[str] = None
+    hashtags: Optional[List[str]] = None
+    social_post: Optional[str] = None
+
+VARIATIONS_PROMPT = (
+    "You are a creative marketing copywriter. "
+    "Given a campaign brief, tone, and format, generate a list of creative ad copy variations. "
+    "For each, provide a meaningful, catchy name and the ad copy text. "
+    "Return a list of dicts: [{'name': ..., 'text': ...}]"
+)
+AB_TESTS_PROMPT = (
+    "You are a digital marketing strategist. "
+    "Given a campaign brief and a list of creative variations, "
+    "suggest A/B testing hypotheses and what to measure for each variation. "
+    "Return a list of dicts: [{'variation_name': ..., 'hypothesis': ..., 'metric': ...}]"
+)
+SOCIAL_POSTS_PROMPT = (
+    "You are a social media marketer. "
+    "Given a campaign brief and a list of creative variations, "
+    "generate for each: 3-5 relevant hashtags and a short social post (max 120 chars). "
+    "Return a list of dicts: [{'variation_name': ..., 'hashtags': [...], 'social_post': ...}]"
+)
+
+BUNDLE_PROMPT = (
+    "You are a creative marketing copywriter, digital marketing strategist and social media marketer. "
+    "Given a campaign brief, tone, and format, generate a list of creative ad copy variations. "
+    "For each, provide a meaningful, catchy name, the ad copy text, an A/B testing hypothesis, "
+    "the key metric to measure, 3-5 relevant hashtags and a short social post (max 120 chars)."
+)
+BUNDLE_REPAIR_PROMPT = (
+    "You are a creative marketing copywriter. "
+    "Some creative variations came back incomplete. Complete each one, keeping the fields it already has: "
+    "name, ad copy text, A/B testing hypothesis, key metric, 3-5 hashtags and a short social post (max 120 chars). "
+    "Return every completed variation with the index it was given."
+)
+
+# Agent name -> (system prompt, output type); the agents are built once per process
+AGENT_SPECS = {
+    "creative_variations": (VARIATIONS_PROMPT, List[CreativeVariation]),
+    "ab_tests": (AB_TESTS_PROMPT, List[ABTestSuggestion]),
+    "social_posts": (SOCIAL_POSTS_PROMPT, List[SocialPost]),
+    "creative_bundle": (BUNDLE_PROMPT, List[DraftBundleItem]),
+    "creative_bundle_repair": (BUNDLE_REPAIR_PROMPT, List[RepairedBundleItem]),
+}
+
+_AGENTS: Dict[Tuple[str, int], Agent] = {}  # (agent name, id of the shared model) -> agent
+_AGENTS_LOCK = threading.Lock()
+
 def get_azure_model():
-    if "creative_azure_model" not in st.session_state:
-        st.session_state.creative_azure_model = create_azure_openai_model()
-    return st.session_state.creative_azure_model
+    # Shared process-wide, so sessions reuse one pooled Azure connection
+    return create_azure_openai_model()
+
+def get_agent(name: str) -> Agent:
+    """Prebuilt agent for one generation step, shared by every session.
+
+    Raises RuntimeError while the Azure model can't be created; nothing is cached
+    then, so the agent is built once the configuration is fixed.
+    """
+    model = get_azure_model()
+    if model is None:
+        raise RuntimeError("Azure OpenAI model not initialized. Check your Azure OpenAI configuration.")
+    key = (name, id(model))
+    with _AGENTS_LOCK:
+        if key not in _AGENTS:
+            system_prompt, output_type = AGENT_SPECS[name]
+            _AGENTS[key] = Agent(model=model, output_type=output_type, system_prompt=system_prompt)
+        return _AGENTS[key]
+
+async def run_step(name: str, user_prompt: str):
+    return await run_agent(get_agent(name), user_prompt, name=name, system_prompt=AGENT_SPECS[name][0])
 
 async def generate_creative_variations(prompt, tone, format_type, num_variations):
-    azure_model = get_azure_model()
-    agent = Agent(
-        model=azure_model,
-        result_type=List[CreativeVariation],
-        system_prompt=(
-            "You are a creative marketing copywriter. "
-            "Given a campaign brief, tone, and format, generate a list of creative ad copy variations. "
-            "For each, provide a meaningful, catchy name and the ad copy text. "
-            "Return a list of dicts: [{'name': ..., 'text': ...}]"
-        )
-    )
     user_prompt = (
         f"CAMPAIGN BRIEF: {prompt}\n"
         f"TONE: {tone or 'Any'}\n"
@@ -45,56 +129,246 @@ async def generate_creative_variations(prompt, tone, format_type, num_variations
         "Each should have a unique, catchy name and the ad copy text. "
         "Return as a list of dicts: [{'name': ..., 'text': ...}]"
     )
-    result = await agent.run(user_prompt)
-    return result.output
+    return await run_step("creative_variations", user_prompt)
 
 async def generate_ab_testing_suggestions(prompt, variations):
-    azure_model = get_azure_model()
-    agent = Agent(
-        model=azure_model,
-        result_type=List[ABTestSuggestion],
-        system_prompt=(
-            "You are a digital marketing strategist. "
-            "Given a campaign brief and a list of creative variations, "
-            "suggest A/B testing hypotheses and what to measure for each variation. "
-            "Return a list of dicts: [{'variation_name': ..., 'hypothesis': ..., 'metric': ...}]"
-        )
-    )
     user_prompt = (
         f"CAMPAIGN BRIEF: {prompt}\n"
         f"CREATIVE VARIATIONS: {', '.join([v.name for v in variations])}\n"
         "For each variation, suggest a hypothesis for A/B testing and the key metric to measure. "
         "Return as a list of dicts: [{'variation_name': ..., 'hypothesis': ..., 'metric': ...}]"
     )
-    result = await agent.run(user_prompt)
-    return result.output
+    return await run_step("ab_tests", user_prompt)
 
 async def generate_hashtags_and_social_posts(prompt, variations):
-    azure_model = get_azure_model()
-    agent = Agent(
-        model=azure_model,
-        result_type=List[SocialPost],
-        system_prompt=(
-            "You are a social media marketer. "
-            "Given a campaign brief and a list of creative variations, "
-            "generate for each: 3-5 relevant hashtags and a short social post (max 120 chars). "
-            "Return a list of dicts: [{'variation_name': ..., 'hashtags': [...], 'social_post': ...}]"
-        )
-    )
     user_prompt = (
         f"CAMPAIGN BRIEF: {prompt}\n"
         f"CREATIVE VARIATIONS: {', '.join([v.name for v in variations])}\n"
         "For each variation, generate 3-5 hashtags and a short social post (max 120 chars). "
         "Return as a list of dicts: [{'variation_name': ..., 'hashtags': [...], 'social_post': ...}]"
     )
-    result = await agent.run(user_prompt)
-    return result.output
+    return await run_step("social_posts", user_prompt)
+
+def validate_bundle(drafts: List[DraftBundleItem]):
+    """Split drafts into complete items and the indexes of the malformed ones."""
+    items, malformed = {}, []
+    for i, draft in enumerate(drafts):
+        try:
+            items[i] = CreativeBundleItem.model_validate(draft.model_dump())
+        except ValidationError:
+            malformed.append(i)
+    return items, malformed
+
+async def generate_creative_bundle(
+    prompt, tone, format_type, num_variations
+) -> Tuple[List[CreativeBundleItem], List[str]]:
+    """Variations, A/B tests and social posts in one call; only malformed items are re-requested.
+
+    Returns the complete items and the names of the variations the repair call
+    did not complete.
+    """
+    user_prompt = (
+        f"CAMPAIGN BRIEF: {prompt}\n"
+        f"TONE: {tone or 'Any'}\n"
+        f"FORMAT: {format_type or 'Any'}\n"
+        f"Generate {num_variations} creative ad copy variations. "
+        "Each should have a unique, catchy name, the ad copy text, an A/B testing hypothesis, "
+        "the key metric to measure, 3-5 hashtags and a short social post (max 120 chars)."
+    )
+    drafts = await run_step("creative_bundle", user_prompt)
+    items, malformed = validate_bundle(drafts)
+    if malformed:
+        print(f"🔁 Re-requesting {len(malformed)} incomplete creative variation(s)")
+        repair_prompt = (
+            f"CAMPAIGN BRIEF: {prompt}\n"
+            f"TONE: {tone or 'Any'}\n"
+            f"FORMAT: {format_type or 'Any'}\n"
+            f"INCOMPLETE VARIATIONS: "
+            f"{json.dumps([{'index': i, **drafts[i].model_dump(exclude_none=True)} for i in malformed])}\n"
+            f"Return the {len(malformed)} completed variations, each with its index."
+        )
+        repaired = await run_step("creative_bundle_repair", repair_prompt)
+        # Matched on the echoed index, so a short or reordered answer can't land on the wrong variation
+        for item in repaired:
+            if item.index in malformed and item.index not in items:
+                items[item.index] = CreativeBundleItem(**item.model_dump(exclude={"index"}))
+    failed = [drafts[i].name or f"Variation {i + 1}" for i in malformed if i not in items]
+    if failed:
+        print(f"⚠️ {len(failed)} creative variation(s) could not be completed")
+    return [items[i] for i in sorted(items)], failed
+
+def split_bundle(bundle: List[CreativeBundleItem]) -> Dict[str, list]:
+    """The bundled items as the three sections the page renders."""
+    return {
+        "variations": [CreativeVariation(name=b.name, text=b.text) for b in bundle],
+        "ab_tests": [ABTestSuggestion(variation_name=b.name, hypothesis=b.hypothesis, metric=b.metric) for b in bundle],
+        "social_posts": [
+            SocialPost(variation_name=b.name, hashtags=b.hashtags, social_post=b.social_post) for b in bundle
+        ],
+    }
+
+def mockup_specs(variations, mockups: Dict[str, Any]) -> List[MockupSpec]:
+    """One mockup per variation and format, in the page's brand settings."""
+    return [
+        MockupSpec(
+            format=fmt, headline=v.name, body=v.text, cta=mockups["cta"],
+            primary_color=mockups["primary_color"], secondary_color=mockups["secondary_color"]
+        )
+        for v in variations for fmt in mockups["formats"]
+    ]
+
+async def generate_creative_assets(
+    bus: EventBus, prompt, tone, format_type, num_variations, bundle: bool = CREATIVE_BUNDLE_MODE,
+    mockups: Optional[Dict[str, Any]] = None
+) -> Dict[str, list]:
+    """Variations first, then the A/B tests and social posts concurrently.
+
+    Each section is published on `bus` as {"section": (name, items)} as soon as it
+    is ready; a failing follow-up step is published as {"section_error": ...}
+    without holding back the other one. With `bundle`, all three sections come
+    from a single call instead. `mockups` (formats, cta and brand colours) adds
+    locally rendered previews of every variation in every format.
+    """
+    results = {}
+
+    async def prefetch_images(variations):
+        # Every variation's image downloads in parallel into the local image cache
+        try:
+            images = await get_image_prefetcher().prefetch(v.text for v in variations)
+        except Exception as e:
+            print(f"⚠️ Image prefetch failed: {e}")
+            images = {}
+        bus.publish({"section": ("images", images)})
+
+    async def render_mockups(variations):
+        if not mockups or not mockups.get("formats"):
+            return
+        specs = mockup_specs(variations, mockups)
+        try:
+            paths = await asyncio.to_thread(render_batch, specs)
+        except Exception as e:
+            bus.publish({"section_error": ("mockups", str(e))})
+            return
+        results["mockups"] = [(spec.headline, spec.format, path) for spec, path in zip(specs, paths)]
+        bus.publish({"section": ("mockups", results["mockups"])})
+
+    with span("creative.assets", variations=num_variations, bundle=bundle):
+        if bundle:
+            bundle_items, failed = await generate_creative_bundle(prompt, tone, format_type, num_variations)
+            results = split_bundle(bundle_items)
+            for name, items in results.items():
+                bus.publish({"section": (name, items)})
+            if failed:
+                bus.publish({"incomplete": failed})
+            await asyncio.gather(prefetch_images(results["variations"]), render_mockups(results["variations"]))
+            return results
+
+        variations = await generate_creative_variations(prompt, tone, format_type, num_variations)
+        results["variations"] = variations
+        bus.publish({"section": ("variations", variations)})
+
+        async def follow_up(name, generate):
+            try:
+                results[name] = await generate(prompt, variations)
+                bus.publish({"section": (name, results[name])})
+            except Exception as e:
+                bus.publish({"section_error": (name, str(e))})
+
+        await asyncio.gather(
+            follow_up("ab_tests", generate_ab_testing_suggestions),
+            follow_up("social_posts", generate_hashtags_and_social_posts),
+            prefetch_images(variations),
+            render_mockups(variations),
+        )
+    return results
 
 def generate_image(prompt):
-    base_url = "https://image.pollinations.ai/prompt/"
-    encoded_prompt = prompt.replace(" ", "%20")
-    cache_buster = str(int(time.time() * 1000))
-    return f"{base_url}{encoded_prompt}?cb={cache_buster}"
+    # Stable per prompt, so reruns and repeated prompts hit the browser and image caches
+    return image_url(prompt)
+
+def show_variations(placeholder, variations):
+    with placeholder.container():
+        st.markdown("### ✅ Generated Creative Variations:")
+        for i, v in enumerate(variations, start=1):
+            st.markdown(f"**{i}. {v.name}**")
+            st.markdown(f"`{v.text}`")
+
+def show_images(placeholder, variations, images=None):
+    """Cached thumbnails once `images` (prompt -> CachedImage) has arrived; a loading note until then."""
+    with placeholder.container():
+        st.markdown("### 🖼️ Generated Images for Each Variation:")
+        if images is None:
+            st.info("Rendering images...")
+            return
+        for i, v in enumerate(variations, start=1):
+            cached = images.get(v.text)
+            url = cached.url if cached else generate_image(v.text)
+            st.markdown(f"**{v.name} Image:**")
+            st.image(cached.thumbnail if cached else url, caption=v.text)
+            st.markdown(f"[Open Image in New Tab]({url})")
+
+def show_ab_tests(placeholder, ab_tests):
+    with placeholder.container():
+        st.markdown("### 🧪 Dynamic A/B Testing Suggestions:")
+        for ab in ab_tests:
+            st.markdown(f"**{ab.variation_name}**")
+            st.markdown(f"- Hypothesis: {ab.hypothesis}")
+            st.markdown(f"- Metric: {ab.metric}")
+
+def show_social_posts(placeholder, posts):
+    with placeholder.container():
+        st.markdown("### 🔖 Hashtags & Social Posts:")
+        for post in posts:
+            st.markdown(f"**{post.variation_name}**")
+            st.markdown(f"- Hashtags: {' '.join(post.hashtags)}")
+            st.markdown(f"- Social Post: {post.social_post}")
+
+def show_mockups(placeholder, mockups):
+    with placeholder.container():
+        st.markdown("### 🎨 Format Mockups:")
+        by_format = {}
+        for name, fmt, path in mockups:
+            by_format.setdefault(fmt, []).append((name, path))
+        for fmt, items in by_format.items():
+            st.markdown(f"**{fmt}**")
+            columns = st.columns(min(3, len(items)))
+            for i, (name, path) in enumerate(items):
+                columns[i % len(columns)].image(path, caption=name)
+
+def follow_creative_events(job: Job, placeholders: dict):
+    """Render each section into its placeholder as the job publishes it."""
+    runner = get_job_runner()
+    cursor = 0
+    variations = []
+    while True:
+        events, cursor = job.bus.wait(cursor, timeout=1.0)
+        runner.heartbeat(job.id)
+        for event in events:
+            if "section" in event:
+                name, items = event["section"]
+                if name == "variations":
+                    variations = items
+                    show_variations(placeholders["variations"], items)
+                    show_images(placeholders["images"], items)
+                elif name == "images":
+                    show_images(placeholders["images"], variations, items)
+                elif name == "ab_tests":
+                    show_ab_tests(placeholders["ab_tests"], items)
+                elif name == "social_posts":
+                    show_social_posts(placeholders["social_posts"], items)
+                elif name == "mockups":
+                    show_mockups(placeholders["mockups"], items)
+            elif "incomplete" in event:
+                placeholders["incomplete"].error(
+                    f"Could not complete {len(event['incomplete'])} variation(s): {', '.join(event['incomplete'])}"
+                )
+            elif "section_error" in event:
+                name, message = event["section_error"]
+                placeholders[name].error(f"Could not generate {name.replace('_', ' ')}: {message}")
+            elif "error" in event:
+                st.error(f"Error generating creative assets: {event['error']}")
+            elif "done" in event:
+                return
 
 def show_creative_asset_generator():
     st.markdown("## 📝 Creative Asset Generator")
@@ -137,71 +411,72 @@ def show_creative_asset_generator():
                 min_value=1, max_value=10, value=3,
                 key="creative_num_variations"
             )
+            mockup_formats = st.multiselect(
+                "Mockup Formats (rendered locally)",
+                options=format_options,
+                default=[],
+                key="creative_mockup_formats"
+            )
+            cta_col, primary_col, secondary_col = st.columns([2, 1, 1])
+            mockup_cta = cta_col.text_input("Call to Action", value="Learn More", key="creative_mockup_cta")
+            primary_color = primary_col.color_picker("Brand Colour", value="#1f4e79", key="creative_primary_color")
+            secondary_color = secondary_col.color_picker("Accent Colour", value="#f39c12", key="creative_secondary_color")
+            bundle_mode = st.checkbox(
+                "Single call (variations, A/B tests and social posts together)",
+                value=CREATIVE_BUNDLE_MODE,
+                key="creative_bundle_mode"
+            )
             submitted = st.form_submit_button("Generate Creative Assets")
 
         # Placeholders for each result section
-        variations_placeholder = st.empty()
-        images_placeholder = st.empty()
-        abtest_placeholder = st.empty()
-        social_placeholder = st.empty()
+        placeholders = {
+            "variations": st.empty(),
+            "incomplete": st.empty(),
+            "images": st.empty(),
+            "ab_tests": st.empty(),
+            "social_posts": st.empty(),
+            "mockups": st.empty(),
+        }
         tips_placeholder = st.empty()
 
         if submitted:
             # Immediately clear previous results
-            variations_placeholder.empty()
-            images_placeholder.empty()
-            abtest_placeholder.empty()
-            social_placeholder.empty()
+            for placeholder in placeholders.values():
+                placeholder.empty()
             tips_placeholder.empty()
 
             if not campaign_brief:
                 st.error("Please enter a campaign brief or prompt.")
                 return
 
-            with st.spinner("Generating creative assets..."):
-                variations = asyncio.run(
-                    generate_creative_variations(
-                        campaign_brief, tone_preference, format_type, num_variations
+            mockups = {
+                "formats": mockup_formats,
+                "cta": mockup_cta or "Learn More",
+                "primary_color": primary_color,
+                "secondary_color": secondary_color,
+            }
+            try:
+                # One run on the shared job loop; the A/B tests and social posts are generated side by side
+                job = get_job_runner().submit(
+                    "creative_assets",
+                    lambda job: generate_creative_assets(
+                        job.bus, campaign_brief, tone_preference, format_type, num_variations, bundle_mode, mockups
                     )
                 )
+            except JobQueueFull as e:
+                st.error(f"The campaign service is busy: {str(e)}")
+                return
 
-                with variations_placeholder.container():
-                    st.markdown("### ✅ Generated Creative Variations:")
-                    for i, v in enumerate(variations, start=1):
-                        st.markdown(f"**{i}. {v.name}**")
-                        st.markdown(f"`{v.text}`")
-
-                with images_placeholder.container():
-                    st.markdown("### 🖼️ Generated Images for Each Variation:")
-                    for i, v in enumerate(variations, start=1):
-                        image_url = generate_image(v.text)
-                        st.markdown(f"**{v.name} Image:**")
-                        st.image(image_url, caption=v.text)
-                        st.markdown(f"[Open Image in New Tab]({image_url})")
-
-                ab_tests = asyncio.run(generate_ab_testing_suggestions(campaign_brief, variations))
-                with abtest_placeholder.container():
-                    st.markdown("### 🧪 Dynamic A/B Testing Suggestions:")
-                    for ab in ab_tests:
-                        st.markdown(f"**{ab.variation_name}**")
-                        st.markdown(f"- Hypothesis: {ab.hypothesis}")
-                        st.markdown(f"- Metric: {ab.metric}")
-
-                posts = asyncio.run(generate_hashtags_and_social_posts(campaign_brief, variations))
-                with social_placeholder.container():
-                    st.markdown("### 🔖 Hashtags & Social Posts:")
-                    for post in posts:
-                        st.markdown(f"**{post.variation_name}**")
-                        st.markdown(f"- Hashtags: {' '.join(post.hashtags)}")
-                        st.markdown(f"- Social Post: {post.social_post}")
-
-                with tips_placeholder.container():
-                    st.markdown("### 💡 Additional Tips:")
-                    st.markdown("""
-                    - Use the generated variations and images for A/B testing across your channels.
-                    - Try the suggested hashtags and social posts for organic reach.
-                    - Monitor the suggested metrics to determine the most effective creative assets.
-                    """)
+            with st.spinner("Generating creative assets..."):
+                follow_creative_events(job, placeholders)
+
+            with tips_placeholder.container():
+                st.markdown("### 💡 Additional Tips:")
+                st.markdown("""
+                - Use the generated variations and images for A/B testing across your channels.
+                - Try the suggested hashtags and social posts for organic reach.
+                - Monitor the suggested metrics to determine the most effective creative assets.
+                """)
 
 
 ######### Without dropdowns #############
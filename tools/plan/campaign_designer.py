@@ -337,23 +337,63 @@
 
 
 import streamlit as st
+import os
 import asyncio
-import threading
-import queue
-import time
-from core.pipeline import run_pipeline_from_ui, detect_sections_to_update
-from agents.orchestrator_agent import OrchestratorAgent
+from core.jobs import Job, JobQueueFull, get_job_runner
+from database.result_store import get_result_store
+from core.pipeline import run_pipeline_from_ui, revise_campaign_from_ui, detect_sections_to_update_async
+from core.section_classifier import classify_sections
 from services.openai_config import create_azure_openai_model
 
+# Serve a stored brief when the same inputs were already generated
+REUSE_STORED_RESULTS = os.getenv("CAMPAIGN_REUSE_RESULTS", "1") != "0"
+
+# Longest a waiting page blocks on the run's event bus before checking in with the browser
+EVENT_WAIT_TIMEOUT = float(os.getenv("CAMPAIGN_EVENT_WAIT_TIMEOUT", "2.0"))
+
+# Streamed pipeline output, rendered as each agent's fields arrive: step -> (title, [(field, label)])
+STREAMED_SECTIONS = {
+    "analysis_result": ("📊 Analysis", [
+        ("executive_summary", "Summary"),
+        ("successful_patterns", "Successful Patterns"),
+        ("audience_insights", "Audience Insights"),
+        ("recommendations", "Recommendations"),
+    ]),
+    "strategy_result": ("🎯 Strategy", [
+        ("overall_strategy", "Overall Strategy"),
+        ("target_audience_deep_dive", "Target Audience"),
+        ("key_messaging_pillars", "Messaging Pillars"),
+        ("recommended_channels_and_tactics", "Channels & Tactics"),
+        ("measurement_kpis", "KPIs"),
+    ]),
+    "creative_result": ("🎨 Creative", [
+        ("creative_concept", "Creative Concept"),
+        ("visual_direction", "Visual Direction"),
+        ("messaging_themes", "Messaging Themes"),
+        ("call_to_action_examples", "Calls to Action"),
+        ("tone_of_voice", "Tone of Voice"),
+    ]),
+    "final_campaign": ("📋 Campaign Brief (in progress)", [
+        ("executive_summary", "📊 Executive Summary"),
+        ("strategy_overview", "🎯 Strategy Overview"),
+        ("creative_direction", "🎨 Creative Direction"),
+        ("implementation_plan", "🚀 Implementation Plan"),
+        ("success_metrics", "📈 Success Metrics"),
+        ("analyst_insights", "📊 Analyst Insights"),
+        ("next_steps", "⏭ Next Steps"),
+    ]),
+}
+
 def show_campaign_designer():
     st.markdown("## Campaign Designer")
 
     default_values = {
-        'pipeline_thread': None,
+        'pipeline_job_id': None,
         'pipeline_running': False,
         'pipeline_result': None,
         'pipeline_error': None,
-        'status_queue': queue.Queue(),
+        'event_cursor': 0,
+        'partial_results': {},
         'analysis_result': None,
         'strategy_result': None,
         'creative_result': None,
@@ -363,7 +403,10 @@ def show_campaign_designer():
         'chat_history': [],
         'azure_model': None,
         'current_status': None,
-        'revision_in_progress': False
+        'revision_in_progress': False,
+        'revision_job_id': None,
+        'revision_cursor': 0,
+        'revision_messages': []
     }
 
     for key, default in default_values.items():
@@ -377,6 +420,11 @@ def show_campaign_designer():
             else:
                 st.session_state[key] = default
 
+    # ?job=<id> reopens a run after a reload, in a new tab or on another session
+    requested_job = st.query_params.get("job")
+    if requested_job and requested_job != st.session_state.pipeline_job_id and not st.session_state.pipeline_running:
+        open_job(requested_job)
+
     with st.form("campaign_form"):
         st.markdown('<div class="section">', unsafe_allow_html=True)
 
@@ -431,6 +479,14 @@ def show_campaign_designer():
             key="media_target_input"
         )
 
+        # A stored brief may be a revised one; this runs every agent again, bypassing the LLM cache too
+        regenerate = st.checkbox(
+            "🔄 Regenerate instead of loading a stored brief for the same inputs",
+            value=not REUSE_STORED_RESULTS,
+            disabled=not REUSE_STORED_RESULTS,
+            key="regenerate_input"
+        )
+
         submitted = st.form_submit_button("Generate Campaign Brief",
                                           disabled=st.session_state.pipeline_running or st.session_state.revision_in_progress)
 
@@ -438,18 +494,6 @@ def show_campaign_designer():
             if not campaign_objective:
                 st.error("Please enter a Campaign Objective.")
             else:
-                st.session_state.pipeline_running = True
-                st.session_state.pipeline_result = None
-                st.session_state.pipeline_error = None
-                st.session_state.current_status = None
-                st.session_state.chat_history = []
-
-                while not st.session_state.status_queue.empty():
-                    try:
-                        st.session_state.status_queue.get_nowait()
-                    except queue.Empty:
-                        break
-
                 campaign_details = {
                     "campaign_objective": campaign_objective,
                     "media_objective": media_objective,
@@ -464,47 +508,29 @@ def show_campaign_designer():
                 st.session_state.target_industry = target_industry.strip() if target_industry else None
                 st.session_state.campaign_details = campaign_details
 
-                st.session_state.pipeline_thread = threading.Thread(
-                    target=run_pipeline_in_thread,
-                    args=(campaign_details, st.session_state.status_queue)
-                )
-                st.session_state.pipeline_thread.start()
-                st.rerun()
+                try:
+                    job = get_job_runner().submit(
+                        "campaign_pipeline",
+                        lambda job: run_pipeline_job(campaign_details, job, reuse_stored=not regenerate)
+                    )
+                except JobQueueFull as e:
+                    st.error(f"The campaign service is busy: {str(e)}")
+                else:
+                    st.session_state.pipeline_job_id = job.id
+                    st.session_state.pipeline_running = True
+                    st.session_state.pipeline_result = None
+                    st.session_state.pipeline_error = None
+                    st.session_state.current_status = None
+                    st.session_state.partial_results = {}
+                    st.session_state.chat_history = []
+                    st.session_state.event_cursor = 0
+                    st.query_params["job"] = job.id
+                    st.rerun()
 
         st.markdown('</div>', unsafe_allow_html=True)
 
-    if st.session_state.pipeline_running:
-        status_placeholder = st.empty()
-        messages_processed = 0
-        while not st.session_state.status_queue.empty() and messages_processed < 10:
-            try:
-                message = st.session_state.status_queue.get_nowait()
-                messages_processed += 1
-                if isinstance(message, dict):
-                    if "status" in message:
-                        st.session_state.current_status = message["status"]
-                    elif "result" in message:
-                        st.session_state.pipeline_result = message["result"]
-                        st.session_state.pipeline_running = False
-                        break
-                    elif "error" in message:
-                        st.session_state.pipeline_error = message["error"]
-                        st.session_state.pipeline_running = False
-                        break
-                    elif "done" in message:
-                        st.session_state.pipeline_running = False
-                        break
-            except queue.Empty:
-                break
-
-        if st.session_state.current_status:
-            status_placeholder.info(st.session_state.current_status)
-        else:
-            status_placeholder.info("Initializing pipeline...")
-
-        if st.session_state.pipeline_running:
-            time.sleep(1)
-            st.rerun()
+    # Filled in by follow_pipeline_events once the rest of the page has rendered
+    progress_area = st.container() if st.session_state.pipeline_running else None
 
     if st.session_state.pipeline_result:
         campaign_brief = st.session_state.pipeline_result
@@ -574,8 +600,12 @@ def show_campaign_designer():
             st.markdown(f'<div class="user-msg">👤 <b>You: </b> {entry["user"]}</div>', unsafe_allow_html=True)
             st.markdown(f'<div class="ai-msg">🧠 <b>CampAIgn: </b> {entry["ai"]}</div>', unsafe_allow_html=True)
 
-    if st.session_state.revision_in_progress:
-        st.info("🔄 Processing your revision request... Please wait.")
+    for message in st.session_state.revision_messages:
+        st.error(message)
+    st.session_state.revision_messages = []
+
+    # Filled in by follow_revision_events once the rest of the page has rendered
+    revision_area = st.container() if st.session_state.revision_in_progress else None
 
     with st.form("feedback_form", clear_on_submit=True):
         user_feedback = st.text_input(
@@ -587,43 +617,28 @@ def show_campaign_designer():
         submit_feedback = st.form_submit_button("Submit Revision Request",
                                                 disabled=st.session_state.revision_in_progress)
 
-        if submit_feedback and user_feedback:
-            st.session_state.revision_in_progress = True
-            st.session_state.feedback_text = user_feedback
-            st.rerun()
-
-        if st.session_state.revision_in_progress and user_feedback:
+        if submit_feedback and user_feedback and not st.session_state.revision_in_progress:
+            # Only the flagged agents re-run; the other outputs are reused as they are
+            current_results = {
+                "analysis_result": st.session_state.analysis_result,
+                "strategy_result": st.session_state.strategy_result,
+                "creative_result": st.session_state.creative_result,
+                "final_campaign": st.session_state.pipeline_result,
+            }
+            campaign_details = st.session_state.campaign_details
+            pipeline_job_id = st.session_state.pipeline_job_id
             try:
-                campaign_brief = st.session_state.pipeline_result
-                sections = detect_sections_to_update(user_feedback, campaign_brief)
-                if not any(sections.values()):
-                    st.error("Couldn't detect specific sections to update. Please clarify your request.")
-                    st.session_state.revision_in_progress = False
-                    st.rerun()
-
-                model = st.session_state.azure_model
-                if not model:
-                    raise Exception("Azure OpenAI model not initialized")
-                orchestrator = OrchestratorAgent(model)
-                updated_brief = asyncio.run(
-                    orchestrator.handle_revision(
-                        current_brief=campaign_brief,
-                        feedback=user_feedback,
-                        sections_to_update=sections
-                    )
+                job = get_job_runner().submit(
+                    "campaign_revision",
+                    lambda job: run_revision_job(user_feedback, current_results, campaign_details, pipeline_job_id, job)
                 )
-
-                st.session_state.pipeline_result = updated_brief
-                st.session_state.chat_history.append({
-                    "user": user_feedback,
-                    "ai": f"Successfully updated the following sections: {', '.join([k for k, v in sections.items() if v])}"
-                })
-
-            except Exception as e:
-                st.error(f"Revision failed: {str(e)}")
-                print(f"Revision error: {str(e)}")
-            finally:
-                st.session_state.revision_in_progress = False
+            except JobQueueFull as e:
+                st.error(f"The campaign service is busy: {str(e)}")
+            else:
+                st.session_state.revision_job_id = job.id
+                st.session_state.revision_cursor = 0
+                st.session_state.revision_in_progress = True
+                st.session_state.feedback_text = user_feedback
                 st.rerun()
 
     if st.session_state.pipeline_error:
@@ -634,21 +649,208 @@ def show_campaign_designer():
         st.session_state.current_section = "Plan"
         st.rerun()
 
-def run_pipeline_in_thread(campaign_details: dict, q: queue.Queue):
-    def thread_status_callback(message: str):
-        q.put({"status": message})
+    if progress_area is not None:
+        follow_pipeline_events(progress_area)
+    elif revision_area is not None:
+        follow_revision_events(revision_area)
+
+def apply_pipeline_events(events: list):
+    for event in events:
+        if "status" in event:
+            st.session_state.current_status = event["status"]
+        elif "partial" in event:
+            step, fields = event["partial"]
+            st.session_state.partial_results[step] = fields
+        elif "result" in event:
+            job = get_job_runner().get(event["result"])
+            show_results(job.result if job else None)
+            st.session_state.pipeline_running = False
+        elif "error" in event:
+            st.session_state.pipeline_error = event["error"]
+            st.session_state.pipeline_running = False
+        elif "done" in event:
+            st.session_state.pipeline_running = False
+
+def show_results(results: dict):
+    """Put a pipeline results dict (fresh or from the result store) on the page."""
+    if not results:
+        return
+    st.session_state.analysis_result = results.get("analysis_result")
+    st.session_state.strategy_result = results.get("strategy_result")
+    st.session_state.creative_result = results.get("creative_result")
+    st.session_state.pipeline_result = results.get("final_campaign")
+    if results.get("campaign_details"):
+        st.session_state.campaign_details = results["campaign_details"]
+        st.session_state.campaign_objective = results["campaign_details"].get("campaign_objective")
+        st.session_state.target_industry = results["campaign_details"].get("target_industry")
+    if results.get("job_id"):
+        st.session_state.pipeline_job_id = results["job_id"]
+        st.query_params["job"] = results["job_id"]
+
+def open_job(job_id: str):
+    """Resume following a job that is still running, or load its stored results."""
+    st.session_state.pipeline_job_id = job_id
+    job = get_job_runner().get(job_id)
+    if job and job.active:
+        st.session_state.pipeline_running = True
+        st.session_state.pipeline_result = None
+        st.session_state.partial_results = {}
+        st.session_state.event_cursor = 0
+        return
+    stored = get_result_store().load(job_id)
+    if stored:
+        show_results(stored)
+    else:
+        st.session_state.pipeline_error = f"No stored campaign brief found for job {job_id}."
+
+def follow_pipeline_events(container):
+    """Update the progress area in place as the run publishes events, instead of rerunning the page.
+
+    Between events the script thread sleeps on the run's event bus; the timeout
+    only bounds how long a click elsewhere on the page waits to be handled.
+    """
+    runner = get_job_runner()
+    job = runner.get(st.session_state.pipeline_job_id)
+    with container:
+        status_placeholder = st.empty()
+        partial_placeholder = st.empty()
+        if job and st.button("✖ Cancel generation"):
+            runner.cancel(job.id)
+
+    changed = True
+    while st.session_state.pipeline_running:
+        status_placeholder.info(st.session_state.current_status or "Waiting for a free pipeline slot...")
+        if changed:
+            with partial_placeholder.container():
+                render_partial_results(st.session_state.partial_results)
+        if job is None:
+            st.session_state.pipeline_error = "The campaign job is no longer available."
+            st.session_state.pipeline_running = False
+            break
+        # Pages that stop checking in (closed tabs) get their job cancelled by the runner
+        runner.heartbeat(job.id)
+        events, st.session_state.event_cursor = job.bus.wait(st.session_state.event_cursor, timeout=EVENT_WAIT_TIMEOUT)
+        apply_pipeline_events(events)
+        changed = bool(events)
+
+    # The run finished: render the brief with the full page
+    st.rerun()
+
+def render_partial_results(partial_results: dict):
+    """Render streamed agent output section by section while the pipeline is running."""
+    for step, (title, fields) in STREAMED_SECTIONS.items():
+        output = partial_results.get(step)
+        if not output:
+            continue
+        with st.expander(title, expanded=step == "final_campaign"):
+            for field, label in fields:
+                value = output.get(field)
+                if not value:
+                    continue
+                st.markdown(f"**{label}**")
+                if isinstance(value, dict):
+                    for key, item in value.items():
+                        st.markdown(f"- {key}: {', '.join(item) if isinstance(item, list) else item}")
+                elif isinstance(value, list):
+                    for item in value:
+                        st.markdown(f"- {item}")
+                else:
+                    st.markdown(value)
+
+async def run_pipeline_job(campaign_details: dict, job: Job, reuse_stored: bool = REUSE_STORED_RESULTS):
+    """Pipeline job body: run on the job runner's loop, publishing progress on the job's bus.
+
+    Without `reuse_stored` the brief is regenerated: neither the result store
+    nor the LLM cache is consulted.
+    """
+    def publish_status(message: str):
+        job.bus.publish({"status": message})
+
+    def publish_partial(step: str, fields: dict):
+        job.bus.publish({"partial": (step, fields)})
+
+    store = get_result_store()
+    if reuse_stored:
+        stored = await asyncio.to_thread(store.find_by_inputs, campaign_details)
+        if stored and stored.get("final_campaign"):
+            publish_status("♻️ Loaded the stored brief for these inputs")
+            return stored
+
+    results = await run_pipeline_from_ui(
+        campaign_details,
+        status_callback=publish_status,
+        partial_callback=publish_partial,
+        cache_ttl=None if reuse_stored else 0
+    )
+    await asyncio.to_thread(store.save, job.id, campaign_details, results)
+    results["job_id"] = job.id
+    results["campaign_details"] = campaign_details
+    return results
+
+def follow_revision_events(container):
+    """Show a revision job's progress in place, then rerun the page with the revised brief."""
+    runner = get_job_runner()
+    job = runner.get(st.session_state.revision_job_id)
+    with container:
+        status_placeholder = st.empty()
+
+    status = "🔄 Processing your revision request... Please wait."
+    while st.session_state.revision_in_progress:
+        status_placeholder.info(status)
+        if job is None:
+            st.session_state.revision_messages.append("The revision job is no longer available.")
+            st.session_state.revision_in_progress = False
+            break
+        runner.heartbeat(job.id)
+        events, st.session_state.revision_cursor = job.bus.wait(st.session_state.revision_cursor, timeout=EVENT_WAIT_TIMEOUT)
+        for event in events:
+            if "status" in event:
+                status = event["status"]
+            elif "warning" in event:
+                st.session_state.revision_messages.append(event["warning"])
+            elif "result" in event:
+                apply_revision(job.result)
+            elif "error" in event:
+                st.session_state.revision_messages.append(f"Revision failed: {event['error']}")
+                print(f"Revision error: {event['error']}")
+            elif "done" in event:
+                st.session_state.revision_in_progress = False
+
+    st.rerun()
+
+def apply_revision(outcome: dict):
+    sections = outcome["sections"]
+    revised = outcome["results"]
+    if revised is None:
+        st.session_state.revision_messages.append(
+            "Couldn't detect specific sections to update. Please clarify your request."
+        )
+        return
+    st.session_state.analysis_result = revised["analysis_result"]
+    st.session_state.strategy_result = revised["strategy_result"]
+    st.session_state.creative_result = revised["creative_result"]
+    st.session_state.pipeline_result = revised["final_campaign"]
+    st.session_state.chat_history.append({
+        "user": st.session_state.feedback_text,
+        "ai": f"Successfully updated the following sections: {', '.join([k for k, v in sections.items() if v])}"
+    })
+
+async def run_revision_job(feedback: str, current_results: dict, campaign_details: dict, pipeline_job_id: str, job: Job):
+    """Revision job body: detect the flagged sections, re-run their agents and store the revised brief."""
+    def publish_status(message: str):
+        job.bus.publish({"status": message})
 
     try:
-        result = asyncio.run(run_pipeline_from_ui(campaign_details, status_callback=thread_status_callback))
-        if isinstance(result, dict) and "analysis_result" in result:
-            st.session_state.analysis_result = result.get("analysis_result")
-            st.session_state.strategy_result = result.get("strategy_result")
-            st.session_state.creative_result = result.get("creative_result")
-            final_result = result.get("final_campaign")
-        else:
-            final_result = result
-        q.put({"result": final_result})
+        sections = await detect_sections_to_update_async(feedback, current_results["final_campaign"])
     except Exception as e:
-        q.put({"error": str(e)})
-    finally:
-        q.put({"done": True})
\ No newline at end of file
+        job.bus.publish({"warning": f"Error in section detection: {str(e)}"})
+        sections = classify_sections(feedback).flags
+    if not any(sections.values()):
+        return {"sections": sections, "results": None}
+
+    revised = await revise_campaign_from_ui(
+        current_results, feedback, sections, campaign_details, status_callback=publish_status
+    )
+    if pipeline_job_id:
+        await asyncio.to_thread(get_result_store().update_results, pipeline_job_id, revised)
+    return {"sections": sections, "results": revised}
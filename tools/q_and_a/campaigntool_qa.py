@@ -6,6 +6,7 @@ import asyncio
 # services/chat_service.py
 from services.openai_config import get_azure_openai_model
 from services.openai_config import create_azure_openai_client
+from services.rate_limiter import INTERACTIVE, request_priority
 
 class ChatService:
     def __init__(self, azure_client = None):
@@ -16,15 +17,17 @@ class ChatService:
         
     async def generate_response(self, user_input: str) -> str:
         try:
-            response = await self.azure_client.chat.completions.create(
-                model="o4-mini-global",  # Make sure this is the correct deployment name
-                messages=[
-                    {"role": "system", "content": "You are a helpful assistant for marketing campaign planning."},
-                    {"role": "user", "content": user_input}
-                ],
-                max_completion_tokens=8192,
-                temperature=1
-            )
+            # Chat answers go ahead of pipeline and batch requests when the quota runs short
+            with request_priority(INTERACTIVE):
+                response = await self.azure_client.chat.completions.create(
+                    model="o4-mini-global",  # Make sure this is the correct deployment name
+                    messages=[
+                        {"role": "system", "content": "You are a helpful assistant for marketing campaign planning."},
+                        {"role": "user", "content": user_input}
+                    ],
+                    max_completion_tokens=8192,
+                    temperature=1
+                )
             # print("🤖 Raw LLM Response:", response)
 
             if not response.choices or not response.choices[0].message.content: